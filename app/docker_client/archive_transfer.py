@@ -0,0 +1,350 @@
+import os
+import posixpath
+import queue
+import socket
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import anyio
+
+# zstd is optional; gzip is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+BLOCK_SIZE = tarfile.BLOCKSIZE
+# Threads for long-lived daemon streams (downloads, followed logs)
+STREAM_THREADS = 64
+
+COMPRESSIONS = {
+    "none": ("application/x-tar", ".tar"),
+    "gzip": ("application/gzip", ".tar.gz"),
+    "zstd": ("application/zstd", ".tar.zst"),
+}
+
+
+def compressor(compression: str):
+    """Return a compressobj-like object for `compression`, or None for a plain tar."""
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the optional `zstandard` package")
+        return zstandard.ZstdCompressor().compressobj()
+    if compression == "none":
+        return None
+    raise ValueError(f"Unknown compression {compression}. Use one of {', '.join(COMPRESSIONS)}.")
+
+
+def get_stream_limiter() -> anyio.CapacityLimiter:
+    """
+    Limiter for threads that block on a daemon stream.
+
+    Such a thread can wait indefinitely (a followed log of a quiet
+    container), so these run on their own pool instead of anyio's default
+    one, which they would otherwise exhaust for every other `to_thread` call.
+    """
+    global _stream_limiter
+    if _stream_limiter is None:
+        _stream_limiter = anyio.CapacityLimiter(STREAM_THREADS)
+    return _stream_limiter
+
+
+def abort_response(client, response):
+    """
+    Close a streaming daemon response, waking a thread blocked reading it.
+
+    Closing the socket alone does not interrupt a pending recv on Linux;
+    shutting it down does, and the read then returns or raises.
+    """
+    try:
+        client.api._get_raw_response_socket(response).shutdown(socket.SHUT_RDWR)
+    except (OSError, AttributeError):
+        pass
+    response.close()
+
+
+async def iterate_blocking(iterator: Iterator[bytes], on_close=None) -> AsyncIterator[bytes]:
+    """
+    Drive a blocking iterator from async code one item at a time.
+
+    The next chunk is only read once the previous one was sent, so a slow
+    client slows the daemon read instead of growing a buffer. On client
+    disconnect the pending read is abandoned and `on_close` runs (also on
+    completion); it must close the underlying stream, e.g. with
+    `abort_response`, so the abandoned thread returns.
+    """
+    try:
+        while True:
+            chunk = await anyio.to_thread.run_sync(next, iterator, None, abandon_on_cancel=True, limiter=get_stream_limiter())
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        if on_close is not None:
+            on_close()
+
+
+def open_archive(client, container_id: str, path: str):
+    """
+    Open `GET /containers/{id}/archive` as a raw streaming response.
+
+    docker-py's get_archive wraps the body in a generator that cannot close
+    the connection, so an abandoned download would keep the daemon sending.
+    """
+    api = client.api
+    response = api._get(api._url("/containers/{0}/archive", container_id), params={"path": path}, stream=True)
+    api._raise_for_status(response)
+    return response
+
+
+def compressed_chunks(response, compression: str) -> Iterator[bytes]:
+    compress = compressor(compression)
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if compress is None:
+            yield chunk
+            continue
+        data = compress.compress(chunk)
+        if data:
+            yield data
+    if compress is not None:
+        yield compress.flush()
+
+
+def tar_wrap(chunks: Iterator[bytes], name: str, size: int, mode: int = 0o644) -> Iterator[bytes]:
+    """Wrap a single file's bytes in a tar stream on the fly; `size` must be known up front."""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = mode
+    info.mtime = int(time.time())
+    yield info.tobuf(format=tarfile.PAX_FORMAT)
+    written = 0
+    for chunk in chunks:
+        written += len(chunk)
+        yield chunk
+    if written != size:
+        raise ValueError(f"Expected {size} bytes for {name}, got {written}")
+    remainder = size % BLOCK_SIZE
+    if remainder:
+        yield b"\0" * (BLOCK_SIZE - remainder)
+    yield b"\0" * (BLOCK_SIZE * 2)
+
+
+def put_archive(client, container_id: str, path: str, chunks: Iterator[bytes]):
+    """Upload a (possibly compressed) tar stream; a generator body is sent chunked, never joined."""
+    client.api.put_archive(container_id, path, chunks)
+
+
+class UploadAborted(Exception):
+    pass
+
+
+# Queue sentinels: end of body, and body failed part way (e.g. client disconnect)
+_END = object()
+_ABORT = object()
+
+
+async def put_archive_from_stream(client, container_id: str, path: str, body: AsyncIterator[bytes], max_pending: int = 8,
+                                  filename: Optional[str] = None, size: Optional[int] = None):
+    """
+    Upload an async byte stream (e.g. a request body) without buffering it.
+
+    The upload runs in a worker thread fed through a bounded queue, so at
+    most `max_pending` chunks are held in memory while the daemon catches up.
+    If the body breaks off, the request to the daemon is aborted so it
+    fails instead of completing. The daemon extracts while it reads,
+    though, so entries received before that point stay in the container;
+    use an `UploadStore` session when a complete-or-nothing upload matters.
+    With `filename`, the bytes are a single file of `size` bytes and are
+    tar-wrapped on the way.
+    """
+    chunks: "queue.Queue" = queue.Queue(maxsize=max_pending)
+    errors = []
+
+    def drain() -> Iterator[bytes]:
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                return
+            if chunk is _ABORT:
+                raise UploadAborted("Upload body ended early")
+            yield chunk
+
+    def upload():
+        try:
+            data = drain()
+            if filename:
+                data = tar_wrap(data, filename, size)
+            put_archive(client, container_id, path, data)
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=upload, daemon=True)
+    worker.start()
+
+    def feed(item) -> bool:
+        # Poll so a failed upload cannot leave the producer blocked on a full queue
+        while worker.is_alive():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        async for chunk in body:
+            if chunk and not await anyio.to_thread.run_sync(feed, chunk):
+                break
+    except BaseException:
+        await anyio.to_thread.run_sync(feed, _ABORT)
+        raise
+    await anyio.to_thread.run_sync(feed, _END)
+    await anyio.to_thread.run_sync(worker.join)
+    if errors:
+        raise errors[0]
+
+
+class UploadSession:
+    """A resumable upload staged in a temp file until it is committed to the container."""
+
+    def __init__(self, folder: str, container_id: str, path: str, filename: Optional[str], size: Optional[int]):
+        self.id = uuid.uuid4().hex
+        self.container_id = container_id
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.created = time.time()
+        self.updated = self.created
+        self.file_path = os.path.join(folder, self.id)
+        self.lock = threading.Lock()
+        open(self.file_path, "wb").close()
+
+    @property
+    def offset(self) -> int:
+        return os.path.getsize(self.file_path)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "containerId": self.container_id,
+            "path": self.path,
+            "filename": self.filename,
+            "size": self.size,
+            "offset": self.offset,
+            "created": self.created,
+            "updated": self.updated,
+        }
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadStore:
+    """
+    Resumable chunked uploads.
+
+    Chunks are appended to a temp file on disk at an explicit offset, so a
+    client can resume after a dropped connection by asking for the current
+    offset. Committing streams the staged file into the container.
+    """
+
+    def __init__(self, client, folder: Optional[str] = None, ttl: int = 24 * 3600):
+        self.client = client
+        self.folder = folder or os.path.join(tempfile.gettempdir(), "container_uploads")
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, UploadSession] = {}
+        os.makedirs(self.folder, exist_ok=True)
+
+    def create(self, container_id: str, path: str, filename: Optional[str] = None, size: Optional[int] = None) -> UploadSession:
+        if filename and (posixpath.basename(filename) != filename or filename in (".", "..")):
+            raise ValueError("filename must be a plain file name")
+        # Fail early for unknown containers instead of at commit time
+        self.client.api.inspect_container(container_id)
+        session = UploadSession(self.folder, container_id, path, filename, size)
+        with self.lock:
+            self._expire()
+            self.sessions[session.id] = session
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        with self.lock:
+            return self.sessions.get(upload_id)
+
+    async def append(self, session: UploadSession, offset: int, body: AsyncIterator[bytes]) -> int:
+        """
+        Append a chunk written at `offset`.
+
+        Raises UploadOffsetMismatch if it does not line up or another chunk
+        is still being written. Bytes that arrived before a dropped
+        connection are kept, so the client resumes from the new offset.
+        """
+        # Never wait on the lock here: that would block the event loop
+        if not session.lock.acquire(blocking=False):
+            raise UploadOffsetMismatch(session.offset)
+        try:
+            if offset != session.offset:
+                raise UploadOffsetMismatch(session.offset)
+            with open(session.file_path, "ab") as f:
+                async for chunk in body:
+                    await anyio.to_thread.run_sync(f.write, chunk)
+            session.updated = time.time()
+            return session.offset
+        finally:
+            session.lock.release()
+
+    def _file_chunks(self, session: UploadSession) -> Iterator[bytes]:
+        with open(session.file_path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def commit(self, session: UploadSession):
+        """Stream the staged upload into the container and discard it."""
+        with session.lock:
+            if session.size is not None and session.offset != session.size:
+                raise UploadOffsetMismatch(session.offset)
+            chunks = self._file_chunks(session)
+            if session.filename:
+                chunks = tar_wrap(chunks, session.filename, session.offset)
+            put_archive(self.client, session.container_id, session.path, chunks)
+        self.abort(session)
+
+    def abort(self, session: UploadSession):
+        with self.lock:
+            self.sessions.pop(session.id, None)
+        if os.path.exists(session.file_path):
+            os.remove(session.file_path)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for session in [session for session in self.sessions.values() if session.updated < cutoff]:
+            self.sessions.pop(session.id, None)
+            if os.path.exists(session.file_path):
+                os.remove(session.file_path)
+
+
+def get_upload_store() -> UploadStore:
+    """Process-wide upload store bound to the default Docker client."""
+    global _upload_store
+    if _upload_store is None:
+        from app.docker_client import clientContext
+        _upload_store = UploadStore(clientContext.client)
+    return _upload_store
+
+
+_upload_store: Optional[UploadStore] = None
+_stream_limiter: Optional[anyio.CapacityLimiter] = None
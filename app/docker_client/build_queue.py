@@ -0,0 +1,155 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from docker.utils import mkbuildcontext
+
+from app.docker_client.archive_transfer import abort_response
+from app.docker_client.operations import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    Operation,
+    OperationCancelled,
+    operation_store,
+)
+
+
+class BuildQueueFull(Exception):
+    pass
+
+
+class BuildQueue:
+    """
+    Runs image builds in the background with bounded concurrency.
+
+    At most `max_concurrent` builds talk to the daemon at once; up to
+    `max_queued` more wait their turn, and anything beyond that is rejected
+    so a burst of requests cannot pile up unbounded work.
+    """
+
+    def __init__(self, client, max_concurrent: int = 2, max_queued: int = 20):
+        self.client = client
+        self.max_queued = max_queued
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="image-build")
+        self.lock = threading.Lock()
+        self.futures = {}
+        # Daemon responses of running builds, so a cancel can drop the connection
+        self.responses = {}
+
+    def submit(self, dockerfile: str, tag: Optional[str] = None, labels: Optional[dict] = None) -> Operation:
+        with self.lock:
+            queued = sum(1 for operation in operation_store.list("build") if operation.status == QUEUED)
+            if queued >= self.max_queued:
+                raise BuildQueueFull(f"Build queue is full ({queued} builds waiting). Try again later.")
+            operation = Operation("build", {"tag": tag})
+            operation_store.add(operation)
+            self.futures[operation.id] = self.executor.submit(self._run, operation, dockerfile, tag, labels)
+        return operation
+
+    def cancel(self, operation_id: str) -> Optional[Operation]:
+        """Cancel a queued or running build. Returns None if the build is unknown."""
+        operation = operation_store.get(operation_id)
+        if operation is None or operation.kind != "build":
+            return None
+        operation.cancel_event.set()
+        with self.lock:
+            future = self.futures.get(operation_id)
+        # A build still waiting for a worker never reaches the daemon
+        if future is not None and future.cancel():
+            with self.lock:
+                self.futures.pop(operation_id, None)
+            operation.set_status(CANCELLED)
+            return operation
+        # A running build may sit in a silent RUN step for minutes; dropping
+        # its connection makes the daemon abort it and ends the read in _run
+        with self.lock:
+            response = self.responses.get(operation_id)
+        if response is not None:
+            abort_response(self.client, response)
+        return operation
+
+    def _start(self, dockerfile: str, tag: Optional[str], labels: Optional[dict]):
+        # As api.build, but keeping the response: its generator cannot be
+        # closed from another thread while a read is blocked
+        api = self.client.api
+        params = {"t": tag, "q": False, "nocache": False, "rm": True, "forcerm": True, "pull": False}
+        if labels:
+            params["labels"] = json.dumps(labels)
+        headers = {"Content-Type": "application/tar"}
+        api._set_auth_headers(headers)
+        context = mkbuildcontext(BytesIO(dockerfile.encode("utf-8")))
+        try:
+            response = api._post(api._url("/build"), data=context, params=params, headers=headers, stream=True, timeout=None)
+        finally:
+            context.close()
+        api._raise_for_status(response)
+        return response
+
+    def _run(self, operation: Operation, dockerfile: str, tag: Optional[str], labels: Optional[dict]):
+        response = None
+        try:
+            operation.check_cancelled()
+            operation.set_status(RUNNING)
+            response = self._start(dockerfile, tag, labels)
+            with self.lock:
+                self.responses[operation.id] = response
+            # A cancel that came in while the build was starting
+            operation.check_cancelled()
+            image_id = None
+            for chunk in self.client.api._stream_helper(response, decode=True):
+                operation.check_cancelled()
+                if "stream" in chunk:
+                    for line in chunk["stream"].splitlines():
+                        if line.strip():
+                            operation.emit("log", line)
+                elif "status" in chunk:
+                    operation.emit("progress", chunk)
+                elif "aux" in chunk and "ID" in chunk["aux"]:
+                    image_id = chunk["aux"]["ID"]
+                elif "error" in chunk:
+                    operation.set_status(FAILED, error=chunk.get("errorDetail", {}).get("message", chunk["error"]))
+                    return
+            # The stream also just ends when cancel() dropped the connection
+            operation.check_cancelled()
+            if image_id is None:
+                operation.set_status(FAILED, error="Build finished without producing an image")
+                return
+            operation.set_status(SUCCEEDED, result={"id": image_id, "tags": [tag] if tag else []})
+        except OperationCancelled:
+            operation.set_status(CANCELLED)
+        except Exception as e:
+            # Reading a connection dropped by cancel() fails too
+            if operation.cancel_event.is_set():
+                operation.set_status(CANCELLED)
+            else:
+                operation.set_status(FAILED, error=str(e))
+        finally:
+            # Closing the response drops the connection, which makes the daemon abort the build
+            if response is not None:
+                response.close()
+            with self.lock:
+                self.futures.pop(operation.id, None)
+                self.responses.pop(operation.id, None)
+
+    def shutdown(self):
+        for operation in operation_store.list("build"):
+            if not operation.done:
+                self.cancel(operation.id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_build_queue() -> BuildQueue:
+    """Process-wide build queue bound to the default Docker client."""
+    global _build_queue
+    if _build_queue is None:
+        from app.docker_client import clientContext
+        _build_queue = BuildQueue(clientContext.client)
+    return _build_queue
+
+
+_build_queue: Optional[BuildQueue] = None
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+import requests
+from docker.errors import APIError
+from docker.utils import parse_bytes
+
+ACTIONS = ["start", "stop", "restart", "pause", "unpause", "kill", "remove", "update"]
+
+
+def resolve_targets(client, container_ids: List[str], labels: List[str], name: Optional[str] = None,
+                    status: Optional[str] = None) -> List[dict]:
+    """
+    Expand explicit IDs and/or a label/name filter into `{id, name}` targets.
+
+    Filters are applied by the daemon in a single list call. Explicit IDs
+    are passed through as given, so an unknown ID fails as its own item
+    instead of failing the whole request.
+    """
+    targets = {container_id: {"id": container_id, "name": container_id} for container_id in container_ids}
+    if labels or name or status:
+        filters: Dict[str, list] = {}
+        if labels:
+            filters["label"] = labels
+        if name:
+            filters["name"] = [name]
+        if status:
+            filters["status"] = [status]
+        for container in client.api.containers(all=True, filters=filters):
+            targets[container["Id"]] = {"id": container["Id"], "name": container["Names"][0].lstrip("/") if container.get("Names") else container["Id"][:12]}
+    return list(targets.values())
+
+
+def update_body(config: dict) -> dict:
+    """Translate the UI's update config (as in the single-container UPDATE action) to the API body."""
+    body = {}
+    if config.get("cpuShares"):
+        body["CpuShares"] = int(config["cpuShares"])
+    if config.get("memory"):
+        body["Memory"] = parse_bytes(config["memory"])
+    if config.get("memoryReservation"):
+        body["MemoryReservation"] = parse_bytes(config["memoryReservation"])
+    if config.get("memorySwap"):
+        body["MemorySwap"] = parse_bytes(config["memorySwap"])
+    return body
+
+
+def run_action(client, action: str, container_id: str, timeout: float, stop_timeout: int = 10, force: bool = False,
+               signal: str = "SIGKILL", update: Optional[dict] = None) -> str:
+    """
+    Run one action against the daemon with a request timeout of `timeout` seconds.
+
+    The raw endpoints are used because docker-py's helpers only know the
+    client-wide timeout. Returns "unchanged" when the daemon reports the
+    container was already in the requested state (304).
+    """
+    api = client.api
+    url = lambda path: api._url("/containers/{0}" + path, container_id)  # noqa: E731
+    if action == "start":
+        response = api._post(url("/start"), timeout=timeout)
+    elif action in ("stop", "restart"):
+        # Leave the daemon time to escalate to SIGKILL before our timeout fires
+        grace = max(0, min(stop_timeout, int(timeout) - 5))
+        response = api._post(url(f"/{action}"), params={"t": grace}, timeout=timeout)
+    elif action in ("pause", "unpause"):
+        response = api._post(url(f"/{action}"), timeout=timeout)
+    elif action == "kill":
+        response = api._post(url("/kill"), params={"signal": signal}, timeout=timeout)
+    elif action == "remove":
+        response = api._delete(url(""), params={"force": force, "v": False}, timeout=timeout)
+    elif action == "update":
+        response = api._post_json(url("/update"), data=update or {}, timeout=timeout)
+    else:
+        raise ValueError(f"Unknown action {action}")
+    api._raise_for_status(response)
+    return "unchanged" if response.status_code == 304 else "done"
+
+
+async def run_bulk(client, action: str, targets: List[dict], parallelism: int = 8, timeout: float = 30,
+                   **options) -> AsyncIterator[dict]:
+    """
+    Run `action` on every target, at most `parallelism` at a time, yielding each result as it completes.
+
+    Every item reports its own outcome (`done`, `unchanged`, `failed` or
+    `timeout`), so one stuck or missing container does not hold back or fail
+    the rest. A final item carries the totals.
+    """
+    limiter = anyio.CapacityLimiter(max(1, parallelism))
+    summary = {"done": 0, "unchanged": 0, "failed": 0, "timeout": 0}
+    started = time.time()
+
+    async def run_one(target: dict) -> dict:
+        began = time.time()
+        result = {"id": target["id"], "name": target["name"], "action": action}
+        try:
+            result["status"] = await anyio.to_thread.run_sync(
+                lambda: run_action(client, action, target["id"], timeout, **options), limiter=limiter
+            )
+            result["error"] = False
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            result.update(status="timeout", error=True, message=f"No answer from the daemon within {timeout}s: {e}")
+        except APIError as e:
+            result.update(status="failed", error=True, message=f"Error: {e.explanation}")
+        except Exception as e:
+            result.update(status="failed", error=True, message=f"Error: {e}")
+        result["elapsed"] = round(time.time() - began, 3)
+        return result
+
+    tasks = [asyncio.ensure_future(run_one(target)) for target in targets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            summary[result["status"]] += 1
+            yield result
+    finally:
+        # The client went away: drop items that have not started yet
+        for task in tasks:
+            task.cancel()
+    yield {"summary": {**summary, "total": len(targets), "elapsed": round(time.time() - started, 3)}}
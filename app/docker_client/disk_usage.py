@@ -0,0 +1,233 @@
+import threading
+import time
+from typing import Optional
+
+# Daemon events after which `docker system df` output is known to change
+REFRESH_EVENTS = {
+    "image": ["pull", "delete", "untag", "tag", "import", "load", "prune"],
+    "volume": ["create", "destroy", "prune"],
+    "container": ["destroy", "prune"],
+    "builder": ["prune"],
+}
+
+
+def _is_dangling(image: dict) -> bool:
+    tags = image.get("RepoTags") or []
+    return not tags or tags == ["<none>:<none>"]
+
+
+def summarize(df: dict) -> dict:
+    """
+    Reduce a `docker system df` result to per-category totals and reclaimable space.
+
+    Follows the accounting of the docker CLI: an image only counts as used
+    through its unique (non-shared) bytes, and build cache shared with
+    images is left out of the totals.
+    """
+    images = df.get("Images") or []
+    containers = df.get("Containers") or []
+    volumes = df.get("Volumes") or []
+    build_cache = df.get("BuildCache") or []
+
+    images_total = df.get("LayersSize", 0)
+    images_used = 0
+    dangling_reclaimable = 0
+    for image in images:
+        size, shared = image.get("Size", -1), image.get("SharedSize", -1)
+        if size == -1 or shared == -1:
+            continue
+        if image.get("Containers", 0) > 0:
+            images_used += size - shared
+        elif _is_dangling(image):
+            dangling_reclaimable += size - shared
+
+    containers_total = sum(container.get("SizeRw", 0) or 0 for container in containers)
+    containers_reclaimable = sum(container.get("SizeRw", 0) or 0 for container in containers if container.get("State") != "running")
+
+    volumes_total = 0
+    volumes_reclaimable = 0
+    for volume in volumes:
+        usage = volume.get("UsageData") or {}
+        if usage.get("Size", -1) <= 0:
+            continue
+        volumes_total += usage["Size"]
+        if usage.get("RefCount", 0) == 0:
+            volumes_reclaimable += usage["Size"]
+
+    build_cache_total = 0
+    build_cache_reclaimable = 0
+    for record in build_cache:
+        if record.get("Shared"):
+            continue
+        build_cache_total += record.get("Size", 0)
+        if not record.get("InUse"):
+            build_cache_reclaimable += record.get("Size", 0)
+
+    return {
+        "images": {
+            "count": len(images),
+            "active": sum(1 for image in images if image.get("Containers", 0) > 0),
+            "size": images_total,
+            "reclaimable": max(images_total - images_used, 0),
+        },
+        "containers": {
+            "count": len(containers),
+            "active": sum(1 for container in containers if container.get("State") == "running"),
+            "size": containers_total,
+            "reclaimable": containers_reclaimable,
+        },
+        "volumes": {
+            "count": len(volumes),
+            "active": sum(1 for volume in volumes if (volume.get("UsageData") or {}).get("RefCount", 0) > 0),
+            "size": volumes_total,
+            "reclaimable": volumes_reclaimable,
+        },
+        "buildCache": {
+            "count": len(build_cache),
+            "active": sum(1 for record in build_cache if record.get("InUse")),
+            "size": build_cache_total,
+            "reclaimable": build_cache_reclaimable,
+        },
+        # Estimated bytes freed by each prune action
+        "prune": {
+            "containers": containers_reclaimable,
+            "images": dangling_reclaimable,
+            "imagesAll": max(images_total - images_used, 0),
+            "volumes": volumes_reclaimable,
+            "buildCache": build_cache_reclaimable,
+        },
+    }
+
+
+class DiskUsageCache:
+    """
+    Caches the result of `docker system df`.
+
+    `client.df()` walks every layer and volume on the host, so callers share
+    one cached copy. Once started, a background thread refreshes it every
+    `interval` seconds and shortly after daemon events that change disk
+    usage; until then `get` falls back to refreshing once per `ttl` seconds.
+    After `invalidate` (e.g. a prune done through this app), `get` refreshes
+    before answering, so the change is visible right away.
+    """
+
+    def __init__(self, client, ttl: int = 60, interval: int = 300, debounce: int = 5):
+        self.client = client
+        self.ttl = ttl
+        self.interval = interval
+        self.debounce = debounce  # minimum seconds between event-driven refreshes
+        self.lock = threading.Lock()
+        self.data: Optional[dict] = None
+        self.summary: Optional[dict] = None
+        self.updated_at = 0.0
+        self.refresh_duration = 0.0
+        # When the cached df call started, and when the cache was last invalidated
+        self.data_started = 0.0
+        self.invalidated_at = 0.0
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.refresher: Optional[threading.Thread] = None
+        self.watcher: Optional[threading.Thread] = None
+        self.events = None
+
+    def refresh(self) -> dict:
+        started = time.time()
+        data = self.client.df()
+        summary = summarize(data)
+        with self.lock:
+            # A slower refresh that started earlier must not replace newer data
+            if started >= self.data_started:
+                self.data = data
+                self.summary = summary
+                self.data_started = started
+                self.updated_at = time.time()
+                self.refresh_duration = self.updated_at - started
+        return data
+
+    @property
+    def running(self) -> bool:
+        return bool(self.refresher and self.refresher.is_alive())
+
+    def get(self) -> dict:
+        """Return the cached df result, refreshing it if it is missing, invalidated or stale."""
+        with self.lock:
+            invalidated = self.invalidated_at >= self.data_started
+            if self.data is not None and not invalidated and (self.running or time.time() - self.updated_at < self.ttl):
+                return self.data
+        return self.refresh()
+
+    def get_summary(self) -> dict:
+        self.get()
+        with self.lock:
+            return {
+                **self.summary,
+                "updatedAt": self.updated_at,
+                "refreshDuration": self.refresh_duration,
+            }
+
+    def invalidate(self):
+        """Mark the cached data stale: the next `get` refreshes, and the background refresher is woken."""
+        with self.lock:
+            self.invalidated_at = time.time()
+        self.wake_event.set()
+
+    def volume_sizes(self) -> dict:
+        """Map volume name to its size in bytes (-1 when the daemon did not compute it)."""
+        # Sizes are best effort; a failing `docker system df` must not break volume listings
+        try:
+            volumes = self.get().get("Volumes") or []
+        except Exception as e:
+            print(f"Error retrieving volume sizes: {e}")
+            return {}
+        return {volume["Name"]: (volume.get("UsageData") or {}).get("Size", -1) for volume in volumes}
+
+    def start(self):
+        """Start the background refresher and event watcher if not already running."""
+        with self.lock:
+            if self.refresher and self.refresher.is_alive():
+                return
+            self.stop_event.clear()
+            self.refresher = threading.Thread(target=self._refresh_loop, name="disk-usage-refresh", daemon=True)
+            self.watcher = threading.Thread(target=self._watch_events, name="disk-usage-events", daemon=True)
+        self.refresher.start()
+        self.watcher.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.events is not None:
+            self.events.close()
+
+    def _refresh_loop(self):
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing disk usage: {e}")
+            # Coalesce bursts of events (e.g. a prune removing many images) into one refresh
+            self.stop_event.wait(self.debounce)
+            self.wake_event.wait(max(self.interval - self.debounce, 0))
+
+    def _watch_events(self):
+        while not self.stop_event.is_set():
+            try:
+                self.events = self.client.events(decode=True, filters={"type": list(REFRESH_EVENTS)})
+                for event in self.events:
+                    if event.get("Action") in REFRESH_EVENTS.get(event.get("Type"), []):
+                        self.wake_event.set()
+            except Exception as e:
+                print(f"Disk usage event stream ended: {e}")
+            self.stop_event.wait(self.debounce)
+
+
+def get_disk_usage() -> DiskUsageCache:
+    """Process-wide df cache bound to the default Docker client."""
+    global _disk_usage
+    if _disk_usage is None:
+        from app.docker_client import clientContext
+        _disk_usage = DiskUsageCache(clientContext.client)
+    return _disk_usage
+
+
+_disk_usage: Optional[DiskUsageCache] = None
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import shlex
+import socket
+import ssl
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import anyio
+import docker
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+READ_SIZE = 16 * 1024
+# Extra origins (scheme://host[:port], comma separated) allowed to open terminals besides the app's own
+EXEC_ALLOWED_ORIGINS = [origin.strip().rstrip("/") for origin in os.environ.get("EXEC_ALLOWED_ORIGINS", "").split(",") if origin.strip()]
+
+
+def origin_allowed(websocket: WebSocket) -> bool:
+    """
+    Whether the page opening the WebSocket may use it.
+
+    Browsers send WebSockets cross-origin without any CORS check, so
+    without this any site a user visits could open a shell in a container.
+    Requests without an Origin do not come from a browser page.
+    """
+    origin = websocket.headers.get("origin")
+    if origin is None:
+        return True
+    if origin.rstrip("/") in EXEC_ALLOWED_ORIGINS:
+        return True
+    return urlsplit(origin).netloc == websocket.headers.get("host")
+
+
+class ExecSession:
+    """
+    An interactive exec instance with a TTY, attached through its raw socket.
+
+    With a TTY the daemon sends the terminal output unframed, so bytes are
+    relayed as they arrive and only one read buffer exists per direction,
+    however long the session runs.
+    """
+
+    def __init__(self, client, container_id: str, cmd: List[str], user: str = "", workdir: Optional[str] = None,
+                 env: Optional[List[str]] = None):
+        self.client = client
+        self.exec_id = client.api.exec_create(
+            container_id, cmd, stdin=True, tty=True, user=user, workdir=workdir, environment=env,
+        )["Id"]
+        self.socket = None
+        self.response_socket = None
+        # Threads for blocking transports get their own limiter so that open
+        # terminals cannot use up the shared worker thread pool
+        self.limiter = anyio.CapacityLimiter(2)
+
+    def start(self):
+        # Keep the wrapper referenced: it owns the HTTP response holding the connection
+        self.response_socket = self.client.api.exec_start(self.exec_id, tty=True, socket=True)
+        self.socket = getattr(self.response_socket, "_sock", self.response_socket)
+
+    @property
+    def selectable(self) -> bool:
+        # Plain unix/tcp sockets can be driven by the event loop; TLS and ssh transports cannot
+        return isinstance(self.socket, socket.socket) and not isinstance(self.socket, ssl.SSLSocket)
+
+    def resize(self, rows: int, cols: int):
+        self.client.api.exec_resize(self.exec_id, height=rows, width=cols)
+
+    def exit_code(self) -> Optional[int]:
+        return self.client.api.exec_inspect(self.exec_id).get("ExitCode")
+
+    async def read(self) -> bytes:
+        if self.selectable:
+            return await asyncio.get_running_loop().sock_recv(self.socket, READ_SIZE)
+        return await anyio.to_thread.run_sync(self.socket.recv, READ_SIZE, limiter=self.limiter)
+
+    async def write(self, data: bytes):
+        if self.selectable:
+            await asyncio.get_running_loop().sock_sendall(self.socket, data)
+        else:
+            await anyio.to_thread.run_sync(self.socket.sendall, data, limiter=self.limiter)
+
+    def close(self):
+        if self.socket is None:
+            return
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except (OSError, AttributeError):
+            pass
+        self.socket.close()
+
+
+async def bridge(websocket: WebSocket, session: ExecSession):
+    """
+    Relay between the WebSocket and the exec socket until either side ends.
+
+    Binary frames (or `{"type": "input", "data": ...}`) are keystrokes;
+    `{"type": "resize", "rows": ..., "cols": ...}` resizes the TTY. Output
+    is sent as binary frames, and a final `{"type": "exit"}` message carries
+    the exit code.
+    """
+    if session.selectable:
+        session.socket.setblocking(False)
+
+    async def output():
+        while True:
+            data = await session.read()
+            if not data:
+                return
+            # Awaiting the send gives backpressure: nothing is read while the client is slow
+            await websocket.send_bytes(data)
+
+    async def keystrokes():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                await session.write(message["bytes"])
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "resize":
+                    await anyio.to_thread.run_sync(session.resize, int(control["rows"]), int(control["cols"]))
+                elif control.get("type") == "input":
+                    await session.write(control["data"].encode())
+
+    async def run(task, group):
+        try:
+            await task()
+        except (OSError, WebSocketDisconnect, ValueError, KeyError, docker.errors.APIError):
+            pass
+        # Whichever side finishes first ends the session
+        group.cancel_scope.cancel()
+
+    try:
+        async with anyio.create_task_group() as group:
+            group.start_soon(run, output, group)
+            group.start_soon(run, keystrokes, group)
+    finally:
+        session.close()
+
+
+async def exec_websocket(websocket: WebSocket, container_id: str, cmd: str = "/bin/sh", user: str = "",
+                         workdir: Optional[str] = None, rows: int = 24, cols: int = 80):
+    """`/api/containers/exec/{container_id}`: an interactive terminal in a running container."""
+    from app.docker_client import clientContext
+    if not origin_allowed(websocket):
+        # Closing before accept rejects the handshake with a 403
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        session = ExecSession(clientContext.client, container_id, shlex.split(cmd), user=user, workdir=workdir or None)
+        await anyio.to_thread.run_sync(session.start)
+        await anyio.to_thread.run_sync(session.resize, rows, cols)
+    except (docker.errors.APIError, ValueError) as e:
+        await websocket.send_text(json.dumps({"type": "error", "message": f"Error: {e}"}))
+        await websocket.close(code=1011)
+        return
+
+    await bridge(websocket, session)
+    try:
+        exit_code = await anyio.to_thread.run_sync(session.exit_code)
+        await websocket.send_text(json.dumps({"type": "exit", "exitCode": exit_code}))
+        await websocket.close()
+    except (RuntimeError, WebSocketDisconnect, docker.errors.APIError):
+        # The client already went away
+        pass
+
+
+def add_exec_routes(app):
+    app.add_api_websocket_route("/api/containers/exec/{container_id}", exec_websocket)
@@ -0,0 +1,306 @@
+import base64
+import json
+import posixpath
+import re
+import stat
+import tarfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from docker.errors import APIError
+
+# Go os.FileMode bits reported in the archive stat header
+GO_MODE_DIR = 1 << 31
+GO_MODE_SYMLINK = 1 << 27
+
+MAX_SYMLINK_HOPS = 8
+
+
+# lstat of each entry as `<raw mode in hex> <size> <mtime> <name>`; GNU and busybox stat agree on these
+STAT_FORMAT = "%f %s %Y %n"
+
+
+class StreamReader:
+    """File-like wrapper so tarfile can read the archive stream without buffering it."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def make_entry(name: str, parent: str, mode: int, size: int, mtime: int) -> dict:
+    if stat.S_ISDIR(mode):
+        entry_type = "directory"
+    elif stat.S_ISLNK(mode):
+        entry_type = "symlink"
+    elif stat.S_ISREG(mode):
+        entry_type = "file"
+    else:
+        entry_type = "other"
+    return {
+        "name": name,
+        "path": posixpath.join(parent, name),
+        "type": entry_type,
+        "size": size,
+        "mode": stat.S_IMODE(mode),
+        "permissions": stat.filemode(mode),
+        "mtime": mtime,
+        # Filled in for the page being returned (see FsBrowser.list)
+        "target": None,
+    }
+
+
+def entry_from_tarinfo(member: tarfile.TarInfo, name: str, parent: str) -> dict:
+    if member.isdir():
+        type_bits = stat.S_IFDIR
+    elif member.issym():
+        type_bits = stat.S_IFLNK
+    elif member.isreg() or member.islnk():
+        type_bits = stat.S_IFREG
+    else:
+        type_bits = 0
+    entry = make_entry(name, parent, type_bits | member.mode, member.size, int(member.mtime))
+    entry["target"] = member.linkname or None
+    return entry
+
+
+def entries_from_stat(output: str, parent: str) -> Optional[List[dict]]:
+    """
+    Parse `find <parent> ... -exec stat -c STAT_FORMAT` output.
+
+    Every record starts with `<hex> <size> <mtime> <parent>/`, so a line
+    that does not is the continuation of a name containing a newline.
+    Returns None when the output cannot be read that way.
+    """
+    prefix = parent.rstrip("/") + "/"
+    record = re.compile(r"([0-9a-f]+) (\d+) (\d+) " + re.escape(prefix))
+    records: List[list] = []
+    for line in output.split("\n"):
+        match = record.match(line)
+        if match:
+            records.append([int(match.group(1), 16), int(match.group(2)), int(match.group(3)), line[match.end():]])
+        elif records:
+            records[-1][3] += "\n" + line
+        elif line:
+            return None
+    if records and records[-1][3].endswith("\n"):
+        # The output's own trailing newline
+        records[-1][3] = records[-1][3][:-1]
+    return [make_entry(name, parent, mode, size, mtime) for mode, size, mtime, name in records if name and "/" not in name]
+
+
+class ContainerListings:
+    """Cached directory listings for one container start."""
+
+    def __init__(self, started_at: str):
+        self.started_at = started_at
+        self.listings: Dict[str, dict] = {}
+
+
+class FsBrowser:
+    """
+    Browses container filesystems one directory level at a time.
+
+    Paths are resolved with `HEAD /containers/{id}/archive`, which
+    transfers no file data. A directory is read from the tar headers of
+    `GET /containers/{id}/archive`, which runs nothing inside the container
+    and so also works for distroless and stopped containers. The daemon
+    writes the archive depth-first, so the stream is read to its end (or
+    `max_scan_entries`) to see every entry of the first level; deeper
+    entries are skipped without being kept. For a running container, a
+    single `find <dir> -mindepth 1 -maxdepth 1 -exec stat` exec (argv, no
+    shell) is tried first when `exec_listing` is set, as it reads only
+    that level's inodes; any failure falls back to the archive. Listings
+    are cached per container and dropped when it restarts or after `ttl`
+    seconds.
+    """
+
+    def __init__(self, client, ttl: int = 30, max_entries: int = 100000, max_scan_entries: int = 200000,
+                 max_containers: int = 16, exec_listing: bool = True):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_scan_entries = max_scan_entries
+        self.exec_listing = exec_listing
+        self.max_containers = max_containers
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[str, ContainerListings]" = OrderedDict()
+
+    def stat(self, container_id: str, path: str) -> dict:
+        """Stat a path with `HEAD /containers/{id}/archive`, which transfers no file data."""
+        api = self.client.api
+        response = api._head(api._url("/containers/{0}/archive", container_id), params={"path": path})
+        api._raise_for_status(response)
+        header = response.headers.get("x-docker-container-path-stat")
+        return docker_stat(header)
+
+    def resolve(self, container_id: str, path: str) -> tuple:
+        """Follow symlinks (e.g. /bin -> usr/bin) until `path` names a real directory or file."""
+        path = posixpath.normpath("/" + path)
+        for _ in range(MAX_SYMLINK_HOPS):
+            path_stat = self.stat(container_id, path)
+            if not path_stat["mode"] & GO_MODE_SYMLINK:
+                return path, path_stat
+            target = path_stat["linkTarget"]
+            path = posixpath.normpath(target if target.startswith("/") else posixpath.join(posixpath.dirname(path), target))
+        raise ValueError(f"Too many levels of symbolic links: {path}")
+
+    def _listings(self, container: dict) -> ContainerListings:
+        started_at = container["State"].get("StartedAt", "")
+        with self.lock:
+            listings = self.cache.get(container["Id"])
+            if listings is None or listings.started_at != started_at:
+                listings = ContainerListings(started_at)
+                self.cache[container["Id"]] = listings
+            self.cache.move_to_end(container["Id"])
+            while len(self.cache) > self.max_containers:
+                self.cache.popitem(last=False)
+            return listings
+
+    def list(self, container_id: str, path: str = "/", offset: int = 0, limit: int = 200) -> dict:
+        """
+        List a directory, sorted with directories first.
+
+        Returns:
+            A page of entries plus `total`; `truncated` is set when the
+            directory was too large to scan completely.
+        """
+        container = self.client.api.inspect_container(container_id)
+        listings = self._listings(container)
+
+        with self.lock:
+            listing = listings.listings.get(posixpath.normpath("/" + path))
+        if listing is None or time.time() - listing["scannedAt"] > self.ttl:
+            resolved, path_stat = self.resolve(container["Id"], path)
+            if not path_stat["mode"] & GO_MODE_DIR:
+                raise NotADirectoryError(f"{resolved} is not a directory")
+            with self.lock:
+                listing = listings.listings.get(resolved)
+            if listing is None or time.time() - listing["scannedAt"] > self.ttl:
+                listing = self._scan(container, resolved, listings)
+            if resolved != posixpath.normpath("/" + path):
+                with self.lock:
+                    listings.listings[posixpath.normpath("/" + path)] = listing
+
+        entries = listing["entries"]
+        page = entries[offset:offset + limit]
+        for entry in page:
+            if entry["type"] == "symlink" and entry["target"] is None:
+                try:
+                    entry["target"] = self.stat(container["Id"], entry["path"])["linkTarget"]
+                except Exception:
+                    entry["target"] = ""
+        return {
+            "path": listing["path"],
+            "entries": page,
+            "total": len(entries),
+            "offset": offset,
+            "limit": limit,
+            "truncated": listing["truncated"],
+            "scannedAt": listing["scannedAt"],
+        }
+
+    def _scan(self, container: dict, path: str, listings: ContainerListings) -> dict:
+        listing = None
+        if self.exec_listing and container["State"].get("Running"):
+            listing = self._scan_exec(container["Id"], path)
+        if listing is None:
+            listing = self._scan_archive(container["Id"], path)
+        with self.lock:
+            listings.listings[path] = listing
+        return listing
+
+    def _listing(self, path: str, entries: List[dict], truncated: bool) -> dict:
+        if len(entries) > self.max_entries:
+            entries, truncated = entries[:self.max_entries], True
+        entries.sort(key=lambda entry: (entry["type"] != "directory", entry["name"]))
+        return {"path": path, "entries": entries, "truncated": truncated, "scannedAt": time.time()}
+
+    def _scan_exec(self, container_id: str, path: str) -> Optional[dict]:
+        """One level through find/stat in the container, or None when that is not possible."""
+        api = self.client.api
+        try:
+            exec_id = api.exec_create(container_id, ["find", path, "-mindepth", "1", "-maxdepth", "1",
+                                                     "-exec", "stat", "-c", STAT_FORMAT, "{}", "+"])
+            output, _ = api.exec_start(exec_id, demux=True)
+            exit_code = api.exec_inspect(exec_id).get("ExitCode")
+        except APIError:
+            return None
+        # find exits 1 for unreadable entries but still lists the rest; 126/127 mean no find or stat
+        if exit_code not in (0, 1):
+            return None
+        entries = entries_from_stat((output or b"").decode("utf-8", errors="surrogateescape"), path)
+        if entries is None:
+            return None
+        return self._listing(path, entries, False)
+
+    def _scan_archive(self, container_id: str, path: str) -> dict:
+        """One level from the tar headers of the directory's archive."""
+        api = self.client.api
+        response = api._get(api._url("/containers/{0}/archive", container_id), params={"path": path}, stream=True)
+        api._raise_for_status(response)
+        path_stat = docker_stat(response.headers.get("x-docker-container-path-stat"))
+        base = path_stat["name"].strip("/")
+        prefix = f"{base}/" if base else ""
+        entries = []
+        scanned = 0
+        truncated = False
+        try:
+            with tarfile.open(fileobj=StreamReader(response.iter_content(64 * 1024)), mode="r|") as archive:
+                for member in archive:
+                    scanned += 1
+                    if scanned > self.max_scan_entries:
+                        truncated = True
+                        break
+                    name = member.name[2:] if member.name.startswith("./") else member.name
+                    name = name.rstrip("/")
+                    if name == base or not name.startswith(prefix):
+                        continue
+                    relative = name[len(prefix):]
+                    if "/" in relative:
+                        continue
+                    entries.append(entry_from_tarinfo(member, relative, path))
+        finally:
+            # Stops the transfer if the scan ended early
+            response.close()
+        return self._listing(path, entries, truncated)
+
+    def invalidate(self, container_id: Optional[str] = None):
+        with self.lock:
+            if container_id is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(container_id, None)
+
+
+def docker_stat(header: Optional[str]) -> dict:
+    """Decode the base64 JSON `X-Docker-Container-Path-Stat` header."""
+    if not header:
+        raise FileNotFoundError("Path stat not returned by the daemon")
+    return json.loads(base64.b64decode(header))
+
+
+def get_fs_browser() -> FsBrowser:
+    """Process-wide browser bound to the default Docker client."""
+    global _fs_browser
+    if _fs_browser is None:
+        from app.docker_client import clientContext
+        _fs_browser = FsBrowser(clientContext.client)
+    return _fs_browser
+
+
+_fs_browser: Optional[FsBrowser] = None
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+import docker
+
+LOCAL_HOST = "local"
+HOSTS_FILE = os.environ.get("DOCKER_HOSTS_FILE", os.path.join(os.getcwd(), "docker_hosts.json"))
+
+
+class DockerHost:
+    """One Docker endpoint: its client (with its own connection pool) and last health check."""
+
+    def __init__(self, name: str, client, url: Optional[str] = None, config: Optional[dict] = None):
+        self.name = name
+        self.client = client
+        self.url = url or client.api.base_url
+        self.config = config or {}
+        self.healthy = True
+        self.error: Optional[str] = None
+        self.latency: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.version: Optional[str] = None
+
+    def check(self, timeout: float):
+        api = self.client.api
+        began = time.time()
+        try:
+            response = api._get(api._url("/_ping"), timeout=timeout)
+            api._raise_for_status(response)
+            self.latency = round(time.time() - began, 4)
+            self.version = response.headers.get("api-version", self.version)
+            self.healthy, self.error = True, None
+        except Exception as e:
+            self.healthy, self.error, self.latency = False, str(e), None
+        self.checked_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "healthy": self.healthy,
+            "error": self.error,
+            "latency": self.latency,
+            "checkedAt": self.checked_at,
+            "apiVersion": self.version,
+        }
+
+
+def create_client(url: str, tls: Optional[dict] = None, max_pool_size: int = 10, timeout: int = 60,
+                  use_ssh_client: bool = False):
+    """
+    Build a client for `unix://`, `tcp://` (optionally TLS) or `ssh://` URLs.
+
+    `tls` takes file paths: `{"ca": ..., "cert": ..., "key": ..., "verify": true}`.
+    """
+    tls_config = None
+    if tls:
+        tls_config = docker.tls.TLSConfig(
+            client_cert=(tls["cert"], tls["key"]) if tls.get("cert") else None,
+            ca_cert=tls.get("ca"),
+            verify=tls.get("verify", True),
+        )
+    return docker.DockerClient(base_url=url, tls=tls_config, max_pool_size=max_pool_size, timeout=timeout,
+                               use_ssh_client=use_ssh_client)
+
+
+class HostRegistry:
+    """
+    Registry of Docker hosts with background health checks and fan-out queries.
+
+    The default `local` host reuses the process-wide client. Other hosts come
+    from `docker_hosts.json` (or `DOCKER_HOSTS_FILE`) and can be added at
+    runtime. Fan-out calls skip hosts that failed their last health check
+    and give the others `timeout` seconds, so one slow host only drops its
+    own results instead of holding up the response. The calls themselves
+    carry that timeout too, so a hung host cannot hold pool threads for
+    longer; health checks have their own pool and are never starved by
+    fan-outs.
+    """
+
+    def __init__(self, local_client, hosts_file: str = HOSTS_FILE, check_interval: int = 15, check_timeout: float = 3,
+                 max_workers: int = 16):
+        self.hosts_file = hosts_file
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, DockerHost] = {LOCAL_HOST: DockerHost(LOCAL_HOST, local_client)}
+        self._create_executors()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _create_executors(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="docker-hosts")
+        self.check_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="docker-host-checks")
+        self.executors_closed = False
+
+    def _load(self):
+        if not os.path.exists(self.hosts_file):
+            return
+        with open(self.hosts_file) as f:
+            for config in json.load(f):
+                try:
+                    self.add(save=False, **config)
+                except Exception as e:
+                    print(f"Skipping Docker host {config.get('name')}: {e}")
+
+    def _save(self):
+        with self.lock:
+            configs = [host.config for host in self.hosts.values() if host.name != LOCAL_HOST]
+        with open(self.hosts_file, "w") as f:
+            json.dump(configs, f, indent=2)
+
+    def add(self, name: str, url: str, tls: Optional[dict] = None, max_pool_size: int = 10, timeout: int = 60,
+            use_ssh_client: bool = False, save: bool = True) -> DockerHost:
+        config = {"name": name, "url": url, "tls": tls, "max_pool_size": max_pool_size, "timeout": timeout,
+                  "use_ssh_client": use_ssh_client}
+        with self.lock:
+            if name in self.hosts:
+                raise ValueError(f"Host {name} already exists")
+        host = DockerHost(name, create_client(url, tls, max_pool_size, timeout, use_ssh_client), url, config)
+        if save:
+            # Hosts loaded from the file are checked by the background loop instead of blocking startup
+            host.check(self.check_timeout)
+        with self.lock:
+            # Checked again: the client was built outside the lock and a concurrent add may have won
+            added = name not in self.hosts
+            if added:
+                self.hosts[name] = host
+        if not added:
+            host.client.close()
+            raise ValueError(f"Host {name} already exists")
+        if save:
+            self._save()
+        return host
+
+    def remove(self, name: str):
+        if name == LOCAL_HOST:
+            raise ValueError("The local host cannot be removed")
+        with self.lock:
+            host = self.hosts.pop(name, None)
+        if host is None:
+            raise KeyError(name)
+        host.client.close()
+        self._save()
+
+    def get(self, name: str = LOCAL_HOST):
+        """Client for `name`; raises KeyError for unknown hosts."""
+        with self.lock:
+            return self.hosts[name].client
+
+    def list(self) -> List[dict]:
+        with self.lock:
+            return [host.to_dict() for host in self.hosts.values()]
+
+    def check_all(self):
+        with self.lock:
+            hosts = list(self.hosts.values())
+        wait([self.check_executor.submit(host.check, self.check_timeout) for host in hosts])
+
+    def _check_loop(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            try:
+                self.check_all()
+            except RuntimeError:
+                # The pools were shut down by stop() while this round ran
+                return
+            if stop_event.wait(self.check_interval):
+                return
+
+    def start(self):
+        if self.thread is None:
+            if self.executors_closed:
+                # Restart after stop(): shut-down pools cannot take work again
+                self._create_executors()
+            # A fresh event per run, so a loop still finishing from before stop() keeps exiting
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self._check_loop, args=(self.stop_event,), name="docker-host-checks", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread = None
+        self.executor.shutdown(wait=False)
+        self.check_executor.shutdown(wait=False)
+        self.executors_closed = True
+        with self.lock:
+            hosts = [host for host in self.hosts.values() if host.name != LOCAL_HOST]
+        for host in hosts:
+            host.client.close()
+
+    def fan_out(self, fn: Callable, names: Optional[List[str]] = None, timeout: float = 5) -> dict:
+        """
+        Call `fn(client, timeout)` on every selected host concurrently.
+
+        `fn` must pass `timeout` on to its Docker calls, so a hung host
+        frees its pool thread once the timeout expires.
+
+        Returns:
+            `results` maps host name to the return value; `errors` maps the
+            hosts that failed, timed out or are unhealthy to a message.
+        """
+        with self.lock:
+            hosts = [host for name, host in self.hosts.items() if names is None or name in names]
+        results, errors = {}, {}
+        futures = {}
+        for host in hosts:
+            if not host.healthy:
+                errors[host.name] = f"Unavailable: {host.error}"
+                continue
+            futures[self.executor.submit(fn, host.client, timeout)] = host.name
+        done, pending = wait(futures, timeout=timeout)
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                errors[futures[future]] = f"Error: {e}"
+        for future in pending:
+            # The call ends on its own request timeout; its result is dropped.
+            # The host is skipped until its next health check passes.
+            errors[futures[future]] = f"Timed out after {timeout}s"
+            with self.lock:
+                host = self.hosts.get(futures[future])
+            if host is not None:
+                host.healthy, host.error = False, errors[futures[future]]
+        return {"results": results, "errors": errors}
+
+
+def _list(client, path: str, timeout: float, params: Optional[dict] = None):
+    # The high-level helpers use the client's 60s timeout; fan-outs need their own
+    api = client.api
+    return api._result(api._get(api._url(path), params=params, timeout=timeout), json=True)
+
+
+# Summaries from the list endpoints; tagged with the host when merged
+LISTERS = {
+    "containers": lambda client, timeout: _list(client, "/containers/json", timeout, {"all": 1}),
+    "images": lambda client, timeout: _list(client, "/images/json", timeout),
+    "volumes": lambda client, timeout: _list(client, "/volumes", timeout).get("Volumes") or [],
+    "networks": lambda client, timeout: _list(client, "/networks", timeout),
+}
+
+
+def merged_list(registry: HostRegistry, resource: str, names: Optional[List[str]] = None, timeout: float = 5) -> dict:
+    """Fan a list call out over the hosts and merge the items, each tagged with its `Host`."""
+    fanned = registry.fan_out(LISTERS[resource], names=names, timeout=timeout)
+    items = []
+    for host, host_items in fanned["results"].items():
+        items.extend({**item, "Host": host} for item in host_items)
+    return {resource: items, "length": len(items), "hosts": sorted(fanned["results"]), "errors": fanned["errors"]}
+
+
+def get_host_registry() -> HostRegistry:
+    """Process-wide registry; the local host shares the default client."""
+    global _host_registry
+    if _host_registry is None:
+        from app.docker_client import clientContext
+        _host_registry = HostRegistry(clientContext.client)
+    return _host_registry
+
+
+_host_registry: Optional[HostRegistry] = None
@@ -0,0 +1,216 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Set
+
+
+def chain_ids(diff_ids: List[str]) -> List[str]:
+    """
+    Compute the ChainIDs of an image's layers.
+
+    Layers are shared on disk by ChainID (a layer together with everything
+    below it), not by DiffID, so identical diffs on different parents are
+    still stored twice.
+    """
+    chain = []
+    for diff_id in diff_ids:
+        if not chain:
+            chain.append(diff_id)
+        else:
+            chain.append("sha256:" + hashlib.sha256(f"{chain[-1]} {diff_id}".encode()).hexdigest())
+    return chain
+
+
+# Dockerfile instructions that only change the image config, never a layer
+METADATA_INSTRUCTIONS = re.compile(
+    r"^(ENV|LABEL|CMD|ENTRYPOINT|EXPOSE|VOLUME|USER|ARG|ONBUILD|STOPSIGNAL|HEALTHCHECK|SHELL|MAINTAINER)\b",
+    re.IGNORECASE,
+)
+
+
+def _is_metadata_step(created_by: str) -> bool:
+    command = created_by.strip()
+    # Classic builder: `/bin/sh -c #(nop)  ENV ...`; ADD and COPY are marked
+    # #(nop) too but do create a layer
+    if "#(nop)" in command:
+        instruction = command.split("#(nop)", 1)[1].strip()
+        return not re.match(r"^(ADD|COPY)\b", instruction, re.IGNORECASE)
+    # BuildKit records the instruction itself
+    return bool(METADATA_INSTRUCTIONS.match(command))
+
+
+def layer_sizes(history: List[dict], layer_count: int, image_size: int) -> Optional[List[int]]:
+    """
+    Pair history entries with layers to get per-layer sizes.
+
+    The history API does not say which entries made a layer. Entries that
+    added bytes did; metadata-only steps (ENV, LABEL, ...) did not. Zero-byte
+    RUN/COPY/WORKDIR steps may or may not have, so they are resolved by the
+    layer count: all of them are layers, or none are. Anything else is
+    ambiguous and returns None, as does a result that does not add up to
+    the image size.
+    """
+    entries = list(reversed(history))
+    kinds = []
+    for entry in entries:
+        if entry.get("Size", 0) > 0:
+            kinds.append("layer")
+        elif _is_metadata_step(entry.get("CreatedBy") or ""):
+            kinds.append("empty")
+        else:
+            kinds.append("maybe")
+    layers, maybes = kinds.count("layer"), kinds.count("maybe")
+    if layers + maybes == layer_count:
+        is_layer = {"layer", "maybe"}
+    elif layers == layer_count:
+        is_layer = {"layer"}
+    else:
+        return None
+    sizes = [entry.get("Size", 0) for entry, kind in zip(entries, kinds) if kind in is_layer]
+    if sum(sizes) != image_size:
+        return None
+    return sizes
+
+
+class ImageAnalyzer:
+    """
+    Computes layer sharing between local images.
+
+    Images are immutable, so the layer list and history of each image id are
+    read once and cached; only images not seen before cost a history call.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.lock = threading.Lock()
+        self.layers: Dict[str, Optional[List[dict]]] = {}
+
+    def _image_layers(self, image_id: str, attrs: dict) -> Optional[List[dict]]:
+        with self.lock:
+            if image_id in self.layers:
+                return self.layers[image_id]
+
+        diff_ids = (attrs.get("RootFS") or {}).get("Layers") or []
+        layers = None
+        try:
+            sizes = layer_sizes(self.client.api.history(image_id), len(diff_ids), attrs.get("Size", 0))
+            if sizes is not None:
+                layers = [
+                    {"chainId": chain_id, "diffId": diff_id, "size": size}
+                    for chain_id, diff_id, size in zip(chain_ids(diff_ids), diff_ids, sizes)
+                ]
+        except Exception as e:
+            print(f"Error reading history for image {image_id}: {e}")
+            return None
+
+        with self.lock:
+            self.layers[image_id] = layers
+        return layers
+
+    def analyze(self, images) -> dict:
+        """
+        Analyze a list of docker Image objects.
+
+        Returns:
+            Per-image shared/unique bytes keyed by image id and host-wide totals.
+            Images whose layer sizes could not be derived fall back to the
+            daemon's own Size with no sharing information.
+        """
+        image_layers = {image.id: self._image_layers(image.id, image.attrs) for image in images}
+        # Untagged parents of other images (classic builder cache) hold no
+        # layers of their own and would count as a sharer of every layer
+        parents = {image.attrs.get("Parent") for image in images}
+        intermediate = {image.id for image in images if image.id in parents and not image.attrs.get("RepoTags")}
+
+        # Forget images that no longer exist
+        with self.lock:
+            for image_id in set(self.layers) - set(image_layers):
+                del self.layers[image_id]
+
+        # How many images reference each layer
+        refcount: Dict[str, int] = {}
+        layer_size: Dict[str, int] = {}
+        for image_id, layers in image_layers.items():
+            for layer in layers or []:
+                if image_id not in intermediate:
+                    refcount[layer["chainId"]] = refcount.get(layer["chainId"], 0) + 1
+                layer_size[layer["chainId"]] = layer["size"]
+
+        result = {}
+        logical_size = 0
+        for image in images:
+            layers = image_layers[image.id]
+            size = image.attrs.get("Size", 0)
+            logical_size += size
+            if layers is None:
+                result[image.id] = {"size": size, "sharedSize": None, "uniqueSize": None, "freedIfRemoved": None, "layers": None}
+                continue
+            shared = sum(layer["size"] for layer in layers if refcount.get(layer["chainId"], 0) > 1)
+            result[image.id] = {
+                "size": size,
+                "sharedSize": shared,
+                "uniqueSize": size - shared,
+                "freedIfRemoved": self._freed_if_removed(image, images, image_layers, layer_size),
+                "layers": [{**layer, "sharedBy": refcount.get(layer["chainId"], 0)} for layer in layers],
+            }
+
+        unknown_size = sum(image.attrs.get("Size", 0) for image in images if image_layers[image.id] is None)
+        physical_size = sum(layer_size.values()) + unknown_size
+        return {
+            "images": result,
+            "totals": {
+                "images": len(images),
+                "layers": len(layer_size),
+                "logicalSize": logical_size,
+                "physicalSize": physical_size,
+                "sharedSavings": logical_size - physical_size,
+                "dedupeRatio": logical_size / physical_size if physical_size else 1.0,
+            },
+        }
+
+    @staticmethod
+    def _freed_if_removed(image, images, image_layers: Dict[str, Optional[List[dict]]], layer_size: Dict[str, int]) -> int:
+        """
+        Bytes `docker rmi` of this image would reclaim.
+
+        An image with child images cannot be removed, only untagged, so it
+        frees nothing. Otherwise its untagged parents that are left without
+        children go with it, and every layer of the removed images that no
+        remaining image references is freed. Layer references of images
+        with unknown sizes are still read from their RootFS.
+        """
+        by_id = {other.id: other for other in images}
+        children: Dict[str, Set[str]] = {}
+        for other in images:
+            if other.attrs.get("Parent"):
+                children.setdefault(other.attrs["Parent"], set()).add(other.id)
+        if children.get(image.id):
+            return 0
+
+        removed = {image.id}
+        parent = by_id.get(image.attrs.get("Parent"))
+        while parent is not None and not parent.attrs.get("RepoTags") and children.get(parent.id, set()) <= removed:
+            removed.add(parent.id)
+            parent = by_id.get(parent.attrs.get("Parent"))
+
+        def chains(other) -> List[str]:
+            layers = image_layers.get(other.id)
+            if layers is not None:
+                return [layer["chainId"] for layer in layers]
+            return chain_ids((other.attrs.get("RootFS") or {}).get("Layers") or [])
+
+        kept = {chain_id for other in images if other.id not in removed for chain_id in chains(other)}
+        candidates = {chain_id for image_id in removed for chain_id in chains(by_id[image_id])}
+        return sum(layer_size.get(chain_id, 0) for chain_id in candidates - kept)
+
+
+def get_image_analyzer() -> ImageAnalyzer:
+    """Process-wide analyzer bound to the default Docker client."""
+    global _image_analyzer
+    if _image_analyzer is None:
+        from app.docker_client import clientContext
+        _image_analyzer = ImageAnalyzer(clientContext.client)
+    return _image_analyzer
+
+
+_image_analyzer: Optional[ImageAnalyzer] = None
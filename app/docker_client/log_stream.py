@@ -0,0 +1,146 @@
+import json
+import re
+import struct
+import time
+from typing import Iterator, Optional, Union
+
+from docker.utils.socket import STDERR, STDOUT
+
+from .archive_transfer import abort_response, iterate_blocking
+
+STREAM_NAMES = {STDOUT: "stdout", STDERR: "stderr"}
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+MAX_LINE_SIZE = 1024 * 1024  # longer lines are split so one runaway line cannot grow the buffer
+FRAME_HEADER_SIZE = 8
+
+
+def parse_time(value: Optional[str]) -> Optional[Union[int, float]]:
+    """Accept a unix timestamp or a relative duration such as `15m` or `2h`."""
+    if value is None or value == "":
+        return None
+    if value[-1] in DURATION_UNITS and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * DURATION_UNITS[value[-1]]
+    return float(value)
+
+
+class LineFilter:
+    """Substring or regex match applied to each log line."""
+
+    def __init__(self, pattern: Optional[str], regex: bool = False, ignore_case: bool = False):
+        self.pattern = pattern
+        if pattern and regex:
+            self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        else:
+            self.regex = None
+            self.ignore_case = ignore_case
+            if pattern and ignore_case:
+                self.pattern = pattern.lower()
+
+    def __call__(self, line: str) -> bool:
+        if not self.pattern:
+            return True
+        if self.regex is not None:
+            return self.regex.search(line) is not None
+        return self.pattern in (line.lower() if self.ignore_case else line)
+
+
+class LogStream:
+    """
+    Reads a container's log stream frame by frame.
+
+    Non-TTY containers multiplex stdout and stderr into 8-byte-header frames;
+    each frame is read off the (chunked) response and split into lines, so
+    only the current frame and one partial line per stream are held in memory.
+    """
+
+    def __init__(self, client, container_id: str, follow: bool = False, since=None, until=None, tail: Union[int, str] = "all",
+                 stdout: bool = True, stderr: bool = True, timestamps: bool = False, line_filter: Optional[LineFilter] = None):
+        self.client = client
+        self.container = client.api.inspect_container(container_id)
+        self.tty = self.container["Config"].get("Tty", False)
+        self.params = {
+            "follow": follow,
+            "stdout": stdout,
+            "stderr": stderr,
+            "timestamps": timestamps,
+            "tail": tail,
+        }
+        if since is not None:
+            self.params["since"] = since
+        if until is not None:
+            self.params["until"] = until
+        self.line_filter = line_filter or LineFilter(None)
+        self.response = None
+
+    def _frames(self) -> Iterator[tuple]:
+        # The high-level logs() helper drops which stream a frame came from,
+        # so frames are read here the way docker-py's
+        # _multiplexed_response_stream_helper does, keeping the stream id
+        api = self.client.api
+        self.response = api._get(api._url("/containers/{0}/logs", self.container["Id"]), params=self.params, stream=True)
+        api._raise_for_status(self.response)
+        # As logs(stream=True): an idle followed container must not hit the client's read timeout
+        api._disable_socket_timeout(api._get_raw_response_socket(self.response))
+        if self.tty:
+            for chunk in self.response.iter_content(chunk_size=8192):
+                yield STDOUT, chunk
+            return
+        while True:
+            # raw.read goes through urllib3, which decodes the chunked transfer encoding
+            header = self.response.raw.read(FRAME_HEADER_SIZE)
+            if len(header) < FRAME_HEADER_SIZE:
+                return
+            stream, length = struct.unpack(">BxxxL", header)
+            if not length:
+                continue
+            data = self.response.raw.read(length)
+            if not data:
+                return
+            yield stream, data
+
+    def batches(self) -> Iterator[list]:
+        """Yield the complete, filtered lines of each frame as one list."""
+        partial = {STDOUT: b"", STDERR: b""}
+        for stream, data in self._frames():
+            buffer = partial.get(stream, b"") + data
+            *complete, partial[stream] = buffer.split(b"\n")
+            if len(partial[stream]) > MAX_LINE_SIZE:
+                complete.append(partial[stream])
+                partial[stream] = b""
+            batch = []
+            for raw_line in complete:
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\r")
+                if self.line_filter(line):
+                    batch.append({"stream": STREAM_NAMES.get(stream, "stdout"), "line": line})
+            if batch:
+                yield batch
+        batch = []
+        for stream, raw_line in partial.items():
+            line = raw_line.decode("utf-8", errors="replace")
+            if raw_line and self.line_filter(line):
+                batch.append({"stream": STREAM_NAMES.get(stream, "stdout"), "line": line})
+        if batch:
+            yield batch
+
+    def close(self):
+        if self.response is not None:
+            abort_response(self.client, self.response)
+
+    async def iter_encoded(self, fmt: str = "text"):
+        """
+        Yield encoded lines to an ASGI response.
+
+        Each frame is read from the socket only after the previous one was
+        handed to the server, so a slow client slows the read instead of
+        letting lines pile up in memory. Reads run on the stream thread
+        pool (see `iterate_blocking`); on client disconnect the pending
+        read is abandoned and the daemon response is shut down, which
+        makes the blocked read return so its thread is freed.
+        """
+        async for batch in iterate_blocking(self.batches(), on_close=self.close):
+            if fmt == "ndjson":
+                yield "".join(json.dumps(entry) + "\n" for entry in batch)
+            else:
+                yield "".join(entry["line"] + "\n" for entry in batch)
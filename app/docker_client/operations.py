@@ -0,0 +1,187 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class Operation:
+    """
+    A long-running Docker task (build, pull, ...) run off the request path.
+
+    Progress is recorded as numbered events so any number of clients can
+    follow it and resume from the last event they saw. Only the most recent
+    `max_events` are kept, which bounds memory for chatty builds.
+    """
+
+    def __init__(self, kind: str, params: Optional[dict] = None, max_events: int = 5000):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.events = deque(maxlen=max_events)
+        self.seq = 0
+        self.condition = threading.Condition()
+        self.cancel_event = threading.Event()
+        # asyncio followers (see stream_operation), woken through their loop
+        self.waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def emit(self, event: str, data):
+        with self.condition:
+            self.seq += 1
+            self.events.append((self.seq, event, data))
+            self.condition.notify_all()
+            for loop, waiter in self.waiters:
+                try:
+                    loop.call_soon_threadsafe(waiter.set)
+                except RuntimeError:
+                    # The follower's loop is closed
+                    pass
+
+    def set_status(self, status: str, result=None, error: Optional[str] = None):
+        with self.condition:
+            self.status = status
+            if status == RUNNING:
+                self.started = time.time()
+            if status in FINISHED_STATES:
+                self.finished = time.time()
+                self.result = result
+                self.error = error
+            # Emitted under the same lock so followers never see a finished
+            # operation without its final status event
+            self.emit("status", self.to_dict())
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def check_cancelled(self):
+        """Raise OperationCancelled if a cancel was requested; called by workers between steps."""
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+
+    def events_after(self, seq: int) -> List[tuple]:
+        """The buffered events newer than `seq`."""
+        with self.condition:
+            return [event for event in self.events if event[0] > seq]
+
+    def add_waiter(self, waiter: asyncio.Event):
+        """Set `waiter` (from its own running loop) on every new event."""
+        with self.condition:
+            self.waiters.add((asyncio.get_running_loop(), waiter))
+
+    def remove_waiter(self, waiter: asyncio.Event):
+        with self.condition:
+            self.waiters = {(loop, other) for loop, other in self.waiters if other is not waiter}
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def format_sse(event: str, data, event_id: Optional[int] = None) -> str:
+    message = ""
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"event: {event}\n"
+    message += f"data: {json.dumps(data)}\n\n"
+    return message
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """The Last-Event-ID header of a reconnecting EventSource; anything unparsable replays from the start."""
+    try:
+        return max(int(value or 0), 0)
+    except ValueError:
+        return 0
+
+
+async def stream_operation(operation: Operation, last_event_id: int = 0, heartbeat: float = 15):
+    """
+    Yield an operation's events as Server-Sent Events until it finishes.
+
+    Followers wait on an asyncio.Event that the worker thread sets through
+    the loop on every new event, so an idle follower holds no thread and a
+    disconnect simply drops the wait. A comment line is sent every
+    `heartbeat` seconds to keep proxies from closing idle connections.
+    """
+    seq = last_event_id
+    waiter = asyncio.Event()
+    operation.add_waiter(waiter)
+    try:
+        while True:
+            # Cleared before reading, so an event emitted in between still wakes the wait below
+            waiter.clear()
+            events = operation.events_after(seq)
+            if not events and not operation.done:
+                try:
+                    await asyncio.wait_for(waiter.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                continue
+            for event_id, event, data in events:
+                seq = event_id
+                yield format_sse(event, data, event_id)
+            if operation.done and seq >= operation.seq:
+                return
+    finally:
+        operation.remove_waiter(waiter)
+
+
+class OperationStore:
+    """Keeps recent operations addressable by id for `ttl` seconds after they finish."""
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.operations: Dict[str, Operation] = {}
+
+    def add(self, operation: Operation):
+        with self.lock:
+            self._expire()
+            self.operations[operation.id] = operation
+
+    def get(self, operation_id: str) -> Optional[Operation]:
+        with self.lock:
+            return self.operations.get(operation_id)
+
+    def list(self, kind: Optional[str] = None) -> List[Operation]:
+        with self.lock:
+            self._expire()
+            return [operation for operation in self.operations.values() if kind is None or operation.kind == kind]
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for operation_id in [oid for oid, op in self.operations.items() if op.done and op.finished < cutoff]:
+            del self.operations[operation_id]
+
+
+operation_store = OperationStore()
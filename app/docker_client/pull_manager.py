@@ -0,0 +1,178 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from docker.utils import parse_repository_tag
+
+from app.docker_client.operations import (
+    FAILED,
+    RUNNING,
+    SUCCEEDED,
+    Operation,
+    operation_store,
+)
+
+# Minimum seconds between progress events for one image
+PROGRESS_INTERVAL = 0.25
+MAX_BATCH_PARALLELISM = 8  # threads one pull batch may use
+
+
+def normalize_reference(reference: str) -> str:
+    """Add the implicit `latest` tag so `redis` and `redis:latest` share one pull."""
+    repository, tag = parse_repository_tag(reference)
+    if tag is None:
+        return f"{repository}:latest"
+    return reference
+
+
+class ImagePull:
+    """
+    One in-flight pull of a single reference.
+
+    Several batch operations can be attached as listeners; they all receive
+    the same aggregated layer progress and result.
+    """
+
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.listeners: List[Operation] = []
+        self.layers: Dict[str, dict] = {}
+        self.done_event = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.last_emit = 0.0
+
+    def progress(self) -> dict:
+        known = [layer for layer in self.layers.values() if layer["total"]]
+        return {
+            "image": self.reference,
+            # Copied so buffered events keep the values they were emitted with
+            "layers": {layer_id: dict(layer) for layer_id, layer in self.layers.items()},
+            "layersTotal": len(self.layers),
+            "layersComplete": sum(1 for layer in self.layers.values() if layer["status"] in ("Pull complete", "Already exists")),
+            "downloaded": sum(layer["downloaded"] for layer in known),
+            "extracted": sum(layer["extracted"] for layer in known),
+            "total": sum(layer["total"] for layer in known),
+        }
+
+    def emit(self, event: str, data, force: bool = False):
+        now = time.time()
+        if not force and now - self.last_emit < PROGRESS_INTERVAL:
+            return
+        self.last_emit = now
+        for listener in list(self.listeners):
+            listener.emit(event, data)
+
+    def update(self, chunk: dict):
+        layer_id = chunk.get("id")
+        status = chunk.get("status", "")
+        if not layer_id or layer_id == self.reference.rsplit(":", 1)[-1]:
+            # Messages about the image itself, e.g. "Digest: ..." or "Status: ..."
+            self.emit("log", {"image": self.reference, "message": status}, force=True)
+            return
+        layer = self.layers.setdefault(layer_id, {"status": status, "downloaded": 0, "extracted": 0, "total": 0})
+        layer["status"] = status
+        detail = chunk.get("progressDetail") or {}
+        if status == "Downloading":
+            layer["downloaded"] = detail.get("current", layer["downloaded"])
+            layer["total"] = detail.get("total", layer["total"])
+        elif status == "Download complete":
+            layer["downloaded"] = layer["total"]
+        elif status == "Extracting":
+            layer["extracted"] = detail.get("current", layer["extracted"])
+            layer["total"] = detail.get("total", layer["total"])
+        elif status == "Pull complete":
+            layer["downloaded"] = layer["extracted"] = layer["total"]
+        self.emit("progress", self.progress(), force=status in ("Pull complete", "Already exists"))
+
+
+class PullManager:
+    """
+    Pulls images in the background with streamed layer progress.
+
+    Concurrent requests for the same reference share a single daemon pull,
+    and at most `max_parallel` pulls run against the daemon at once across
+    all batches.
+    """
+
+    def __init__(self, client, max_parallel: int = 4):
+        self.client = client
+        self.semaphore = threading.BoundedSemaphore(max_parallel)
+        self.lock = threading.Lock()
+        self.inflight: Dict[str, ImagePull] = {}
+
+    def pull(self, references: List[str], parallelism: int = 2) -> Operation:
+        """Start pulling `references`, at most `parallelism` at a time for this batch."""
+        # Comes straight from the request: one thread per reference at most, and never more than a handful
+        parallelism = max(1, min(parallelism, MAX_BATCH_PARALLELISM))
+        references = list(dict.fromkeys(normalize_reference(reference) for reference in references))
+        operation = Operation("pull", {"images": references, "parallelism": parallelism})
+        operation_store.add(operation)
+        threading.Thread(target=self._run_batch, args=(operation, references, parallelism), name=f"image-pull-{operation.id[:8]}", daemon=True).start()
+        return operation
+
+    def _run_batch(self, operation: Operation, references: List[str], parallelism: int):
+        operation.set_status(RUNNING)
+        with ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+            pulls = list(executor.map(lambda reference: self._pull_shared(reference, operation), references))
+        results = {pull.reference: pull.result for pull in pulls if pull.error is None}
+        errors = {pull.reference: pull.error for pull in pulls if pull.error is not None}
+        if errors:
+            operation.set_status(FAILED, result={"images": results, "errors": errors}, error=f"Failed to pull {', '.join(errors)}")
+        else:
+            operation.set_status(SUCCEEDED, result={"images": results, "errors": {}})
+
+    def _pull_shared(self, reference: str, listener: Operation) -> ImagePull:
+        with self.lock:
+            pull = self.inflight.get(reference)
+            owner = pull is None
+            if owner:
+                pull = ImagePull(reference)
+                self.inflight[reference] = pull
+            pull.listeners.append(listener)
+
+        if not owner:
+            # Someone else is already pulling this reference; just wait for it
+            listener.emit("log", {"image": reference, "message": "Joined in-flight pull"})
+            pull.done_event.wait()
+            return pull
+
+        try:
+            with self.semaphore:
+                self._pull(pull)
+        finally:
+            with self.lock:
+                del self.inflight[reference]
+            pull.done_event.set()
+        return pull
+
+    def _pull(self, pull: ImagePull):
+        try:
+            for chunk in self.client.api.pull(pull.reference, stream=True, decode=True):
+                if "error" in chunk:
+                    pull.error = chunk.get("errorDetail", {}).get("message", chunk["error"])
+                    break
+                pull.update(chunk)
+            if pull.error is None:
+                image = self.client.api.inspect_image(pull.reference)
+                pull.result = {"id": image["Id"], "tags": image.get("RepoTags") or [], "size": image.get("Size")}
+        except Exception as e:
+            pull.error = str(e)
+        if pull.error is not None:
+            pull.emit("error", {"image": pull.reference, "message": pull.error}, force=True)
+        else:
+            pull.emit("progress", pull.progress(), force=True)
+            pull.emit("pulled", {"image": pull.reference, **pull.result}, force=True)
+
+
+def get_pull_manager() -> PullManager:
+    """Process-wide pull manager bound to the default Docker client."""
+    global _pull_manager
+    if _pull_manager is None:
+        from app.docker_client import clientContext
+        _pull_manager = PullManager(clientContext.client)
+    return _pull_manager
+
+
+_pull_manager: Optional[PullManager] = None
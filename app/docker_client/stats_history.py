@@ -0,0 +1,293 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Metrics recorded for every sample, in column order of the ring buffers.
+# Network and block-IO are stored as per-second rates derived from the
+# cumulative counters Docker reports.
+FIELDS = (
+    "cpu_percent",
+    "memory_usage",
+    "memory_limit",
+    "net_rx_bps",
+    "net_tx_bps",
+    "blk_read_bps",
+    "blk_write_bps",
+)
+
+# name -> (bucket width in seconds, number of buckets kept)
+RESOLUTIONS = {
+    "1s": (1, 900),      # 15 minutes
+    "10s": (10, 1080),   # 3 hours
+    "1m": (60, 1440),    # 24 hours
+}
+
+DISCOVERY_INTERVAL = 5  # seconds between container list refreshes
+
+
+class RingBuffer:
+    """Fixed-size buffer of (timestamp, values) rows for one resolution, preallocated as NumPy arrays."""
+
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, width), dtype=np.float32)
+        self.size = 0
+        self.head = 0
+
+    def append(self, timestamp: float, row: np.ndarray):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def since(self, start: float):
+        """Return the timestamps and value rows recorded at or after `start`, oldest first."""
+        if self.size < self.capacity:
+            timestamps = self.timestamps[:self.size]
+            values = self.values[:self.size]
+        else:
+            # Oldest row is at head once the buffer has wrapped
+            timestamps = np.concatenate((self.timestamps[self.head:], self.timestamps[:self.head]))
+            values = np.concatenate((self.values[self.head:], self.values[:self.head]))
+        # Timestamps are increasing, so the window is a suffix
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        return timestamps[first:], values[first:]
+
+
+class ContainerSeries:
+    """Ring buffers for a single container, one per resolution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.buffers = {
+            resolution: RingBuffer(capacity, len(FIELDS))
+            for resolution, (_, capacity) in RESOLUTIONS.items()
+        }
+        # Per-resolution rollup accumulator: [bucket, sum vector, count]
+        self.pending = {resolution: [None, np.zeros(len(FIELDS)), 0] for resolution in RESOLUTIONS}
+        self.last_counters = None
+        self.last_seen = time.time()
+
+    def record(self, timestamp: float, row: np.ndarray):
+        with self.lock:
+            self.last_seen = timestamp
+            for resolution, (step, _) in RESOLUTIONS.items():
+                bucket = int(timestamp // step)
+                pending = self.pending[resolution]
+                if pending[0] is not None and pending[0] != bucket and pending[2]:
+                    self.buffers[resolution].append(pending[0] * step, pending[1] / pending[2])
+                    pending[1] = np.zeros(len(FIELDS))
+                    pending[2] = 0
+                pending[0] = bucket
+                pending[1] += row
+                pending[2] += 1
+
+
+def _sum_counters(stats: dict):
+    net_rx = net_tx = 0
+    for network in (stats.get("networks") or {}).values():
+        net_rx += network.get("rx_bytes", 0)
+        net_tx += network.get("tx_bytes", 0)
+
+    blk_read = blk_write = 0
+    for entry in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            blk_read += entry.get("value", 0)
+        elif op == "write":
+            blk_write += entry.get("value", 0)
+    return net_rx, net_tx, blk_read, blk_write
+
+
+def _cpu_percent(stats: dict) -> float:
+    cpu_stats = stats.get("cpu_stats") or {}
+    precpu_stats = stats.get("precpu_stats") or {}
+    cpu_delta = cpu_stats.get("cpu_usage", {}).get("total_usage", 0) - precpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_stats.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * online_cpus * 100.0
+
+
+class StatsHistory:
+    """
+    Samples stats for every running container into per-container ring buffers.
+
+    Each running container gets one long-lived stats stream (Docker pushes a
+    sample roughly every second), so sampling costs one connection per
+    container instead of a blocking `stats(stream=False)` call per tick.
+    """
+
+    def __init__(self, client, retention: int = 3600):
+        self.client = client
+        self.retention = retention  # seconds to keep series of removed containers
+        self.series: Dict[str, ContainerSeries] = {}
+        self.streams: Dict[str, threading.Thread] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.supervisor: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the sampler if it is not already running."""
+        with self.lock:
+            if self.supervisor and self.supervisor.is_alive():
+                return
+            self.stop_event.clear()
+            self.supervisor = threading.Thread(target=self._supervise, name="stats-history", daemon=True)
+            self.supervisor.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _supervise(self):
+        while not self.stop_event.is_set():
+            try:
+                # A plain listing; containers.list() would inspect every container
+                for container in self.client.api.containers():
+                    self._ensure_stream(container["Id"], container["Names"][0].lstrip("/"))
+                self._expire()
+            except Exception as e:
+                print(f"Error refreshing stats history containers: {e}")
+            self.stop_event.wait(DISCOVERY_INTERVAL)
+
+    def _ensure_stream(self, container_id: str, name: str):
+        with self.lock:
+            stream = self.streams.get(container_id)
+            if stream and stream.is_alive():
+                return
+            series = self.series.get(container_id)
+            if series is None:
+                series = self.series[container_id] = ContainerSeries(name)
+            stream = threading.Thread(target=self._consume, args=(container_id, series), name=f"stats-{container_id[:12]}", daemon=True)
+            self.streams[container_id] = stream
+            stream.start()
+
+    def _expire(self):
+        cutoff = time.time() - self.retention
+        with self.lock:
+            for container_id in [cid for cid, series in self.series.items() if series.last_seen < cutoff]:
+                self.series.pop(container_id, None)
+                self.streams.pop(container_id, None)
+
+    def _consume(self, container_id: str, series: ContainerSeries):
+        try:
+            for stats in self.client.api.stats(container_id, stream=True, decode=True):
+                if self.stop_event.is_set():
+                    break
+                if not stats.get("read") or not stats.get("memory_stats"):
+                    # Stopped containers emit an empty sample and end the stream
+                    continue
+                self._record(series, stats)
+        except Exception as e:
+            print(f"Stats stream for container {series.name} ended: {e}")
+
+    def _record(self, series: ContainerSeries, stats: dict):
+        now = time.time()
+        counters = _sum_counters(stats)
+        rates = (0.0, 0.0, 0.0, 0.0)
+        if series.last_counters:
+            elapsed = max(now - series.last_counters[0], 1e-3)
+            rates = tuple(max(current - previous, 0) / elapsed for current, previous in zip(counters, series.last_counters[1]))
+        series.last_counters = (now, counters)
+
+        memory_stats = stats.get("memory_stats") or {}
+        row = np.array([
+            _cpu_percent(stats),
+            memory_stats.get("usage", 0),
+            memory_stats.get("limit", 0),
+            *rates,
+        ], dtype=np.float64)
+        series.record(now, row)
+
+    def resolve(self, container_id: str) -> Optional[str]:
+        """Match a full id, id prefix or container name to a tracked container."""
+        with self.lock:
+            if container_id in self.series:
+                return container_id
+            for full_id, series in self.series.items():
+                if full_id.startswith(container_id) or series.name == container_id:
+                    return full_id
+        return None
+
+    def containers(self) -> List[Dict[str, str]]:
+        with self.lock:
+            return [{"id": cid, "name": series.name, "lastSeen": series.last_seen} for cid, series in self.series.items()]
+
+    def query(self, container_id: str, window: int = 300, resolution: Optional[str] = None, include_series: bool = False) -> Optional[dict]:
+        """
+        Aggregate a container's history over the last `window` seconds.
+
+        Args:
+            container_id: Container id, id prefix or name
+            window: Window length in seconds
+            resolution: One of RESOLUTIONS; picks the finest one covering the window if omitted
+            include_series: Also return the raw (timestamp, values) points
+
+        Returns:
+            min/avg/max/p95 per metric, or None if the container is not tracked
+        """
+        full_id = self.resolve(container_id)
+        if full_id is None:
+            return None
+        if resolution is None:
+            resolution = next(
+                (name for name, (step, capacity) in RESOLUTIONS.items() if step * capacity >= window),
+                list(RESOLUTIONS)[-1],
+            )
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution}. Use one of {', '.join(RESOLUTIONS)}.")
+
+        with self.lock:
+            # Expired between resolve() and here
+            series = self.series.get(full_id)
+        if series is None:
+            return None
+        start = time.time() - window
+        with series.lock:
+            timestamps, values = series.buffers[resolution].since(start)
+
+        result = {
+            "id": full_id,
+            "name": series.name,
+            "resolution": resolution,
+            "window": window,
+            "samples": int(len(timestamps)),
+            "from": float(timestamps[0]) if len(timestamps) else None,
+            "to": float(timestamps[-1]) if len(timestamps) else None,
+            "metrics": {},
+        }
+        if len(timestamps):
+            mins = values.min(axis=0)
+            avgs = values.mean(axis=0)
+            maxs = values.max(axis=0)
+            p95s = np.percentile(values, 95, axis=0)
+            for index, field in enumerate(FIELDS):
+                result["metrics"][field] = {
+                    "min": float(mins[index]),
+                    "avg": float(avgs[index]),
+                    "max": float(maxs[index]),
+                    "p95": float(p95s[index]),
+                }
+        if include_series:
+            result["series"] = {
+                "timestamps": timestamps.tolist(),
+                **{field: values[:, index].tolist() for index, field in enumerate(FIELDS)},
+            }
+        return result
+
+
+def get_stats_history() -> StatsHistory:
+    """Process-wide sampler bound to the default Docker client."""
+    global _stats_history
+    if _stats_history is None:
+        from app.docker_client import clientContext
+        _stats_history = StatsHistory(clientContext.client)
+    return _stats_history
+
+
+_stats_history: Optional[StatsHistory] = None
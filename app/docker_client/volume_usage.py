@@ -0,0 +1,41 @@
+from typing import Dict, List
+
+
+def build_volume_usage_index(client) -> Dict[str, List[dict]]:
+    """
+    Map each volume name to the containers mounting it.
+
+    Uses a single low-level container listing (`GET /containers/json`), which
+    already carries the mounts of every container, instead of inspecting
+    every container once per volume.
+    """
+    index: Dict[str, List[dict]] = {}
+    for container in client.api.containers(all=True):
+        names = container.get("Names") or []
+        for mount in container.get("Mounts") or []:
+            if mount.get("Type") != "volume" or not mount.get("Name"):
+                continue
+            index.setdefault(mount["Name"], []).append({
+                "id": container["Id"],
+                "name": names[0].lstrip("/") if names else container["Id"][:12],
+                "state": container.get("State"),
+                "destination": mount.get("Destination"),
+            })
+    return index
+
+
+def volume_details(volume, usage_index: Dict[str, List[dict]], sizes: Dict[str, int]) -> dict:
+    """Serialize a volume together with its usage and size."""
+    used_by = usage_index.get(volume.name, [])
+    return {
+        'name': volume.attrs.get("Name","N/A"),
+        "driver":volume.attrs.get("Driver","N/A"),
+        "labels":volume.attrs.get("Labels",{}),
+        "options":volume.attrs.get("Options","N/A"),
+        "mountPoint":volume.attrs.get("Mountpoint","N/A"),
+        'created': volume.attrs.get('CreatedAt', 'N/A'),
+        'scope': volume.attrs.get('Scope', 'N/A'),
+        'inUse': bool(used_by),
+        'usedBy': used_by,
+        'size': sizes.get(volume.name, -1),
+    }
@@ -1,29 +1,13 @@
-from fastapi import FastAPI, Request
-import httpx
-from starlette.responses import Response
-from starlette.requests import Request
+from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-
-# Define the target server for proxying requests
-TARGET_URL = "https://registry.hub.docker.com"
-
-async def proxy(path: str, request: Request, response: Response):
-    """
-    Proxy the GET request to Docker Hub registry without modifying the headers or body.
-    """
-    target_url = f"{TARGET_URL}/{path}"
-
-    # Send the request to Docker Hub
-    async with httpx.AsyncClient() as client:
-        proxy = await client.get(target_url, params=request.query_params)
-
-    # Set the body and status code in the response to match Docker Hub's response
-    response.body = proxy.content
-    response.status_code = proxy.status_code
-    response.headers["Content-Type"] = "application/json"
-
-    return response
-
+from app.docker_client.stats_history import get_stats_history
+from app.docker_client.disk_usage import get_disk_usage
+from app.docker_client.build_queue import get_build_queue
+from app.docker_client.exec_session import add_exec_routes
+from app.docker_client.hosts import get_host_registry
+from app.docker_client import clientContext
+from app.queue_client import queue_registry, queue_metrics, queue_event_hub, queue_autoscaler, worker_pool
+from app.registry_proxy import upstream, proxy, add_registry_routes, registry_upstream
 
 # Function to extend the app by adding routes (following your exact pattern)
 def extend_app(app: FastAPI):
@@ -36,9 +20,39 @@ def extend_app(app: FastAPI):
     )
 
     app.add_api_route("/api/docker/{path:path}", methods=["GET"], endpoint=proxy)
+    # Pull-through cache for the registry v2 API (usable as a daemon registry-mirror)
+    add_registry_routes(app)
+    # Interactive terminals; WebSocket routes are not covered by the file router
+    add_exec_routes(app)
+
+    @app.on_event("startup")
+    def startup_event():
+        # Start background samplers so history is available from boot
+        get_stats_history().start()
+        get_disk_usage().start()
+        get_host_registry().start()
+        # Open the pooled registry client up front instead of on the first search
+        upstream.get()
+        # Close queues nobody has used for a while
+        queue_registry.start()
+        queue_metrics.start()
+        # Opt-in (WORKER_POOL_SIZE): warm workers make starting one an exec, not a cold container
+        worker_pool.start(clientContext.client)
+        queue_autoscaler.start(clientContext.client)
 
     @app.on_event("shutdown")
-    def shutdown_event():
+    async def shutdown_event():
         # Perform any necessary cleanup or logging here
-        pass
+        get_stats_history().stop()
+        get_disk_usage().stop()
+        get_host_registry().stop()
+        get_build_queue().shutdown()
+        await upstream.close()
+        await registry_upstream.close()
+        queue_autoscaler.stop()
+        # Idle pooled workers keep running and are adopted on the next start
+        worker_pool.stop()
+        queue_metrics.stop()
+        await queue_event_hub.close()
+        await queue_registry.close()
 
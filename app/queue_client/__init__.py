@@ -0,0 +1,8 @@
+from .registry import QueueRegistry, queue_registry, get_queue, split_queue_name, DEFAULT_REDIS_URL
+from .discovery import QueueDiscovery, queue_discovery
+from .metrics import QueueMetrics, queue_metrics
+from .events import QueueEventHub, queue_event_hub
+from .pool import WorkerPool, worker_pool
+from .autoscaler import QueueAutoscaler, queue_autoscaler
+
+__all__ = ['QueueRegistry', 'queue_registry', 'get_queue', 'split_queue_name', 'DEFAULT_REDIS_URL', 'QueueDiscovery', 'queue_discovery', 'QueueMetrics', 'queue_metrics', 'QueueEventHub', 'queue_event_hub', 'WorkerPool', 'worker_pool', 'QueueAutoscaler', 'queue_autoscaler']
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import anyio
+
+from .discovery import QueueDiscovery, queue_discovery
+from .jobs import count_jobs
+from .metrics import QueueMetrics, queue_metrics
+from .pool import WorkerPool, worker_pool
+from .registry import QueueRegistry, queue_registry, split_queue_name
+from .workers import list_workers, run_worker, stop_worker
+
+AUTOSCALE_FILE = os.environ.get("QUEUE_AUTOSCALE_FILE", os.path.join(os.getcwd(), "queue_autoscale.json"))
+AUTOSCALED_LABEL = "autoscaled"
+
+DEFAULT_POLICY = {
+    "enabled": True,
+    "processFileName": "test.ts",
+    "queueProps": None,
+    "minWorkers": 0,
+    "maxWorkers": 4,
+    # Ready + running jobs one worker is expected to carry
+    "jobsPerWorker": 50,
+    # Scale down only once load drops below this share of the current capacity
+    "scaleDownRatio": 0.5,
+    # Add a worker when the p95 wait time (ms) exceeds this, whatever the backlog
+    "maxWaitMs": None,
+    "scaleUpCooldown": 60,
+    "scaleDownCooldown": 300,
+    "maxStepUp": 2,
+    "maxStepDown": 1,
+}
+
+
+def queue_load(counts: dict) -> int:
+    # Delayed jobs are not runnable yet and do not need a worker
+    return counts["waiting"] + counts["prioritized"] + counts["active"]
+
+
+def desired_workers(policy: dict, current: int, load: int, wait_p95: Optional[float]) -> tuple:
+    """
+    (target, reason) for one queue, before cooldowns.
+
+    Scaling up follows the load (`jobsPerWorker` each) or, while there is
+    any load, a p95 wait time above `maxWaitMs`. Scaling down only starts once the load falls below
+    `scaleDownRatio` of the current capacity, so a queue hovering around
+    a worker boundary does not flap.
+    """
+    needed = math.ceil(load / policy["jobsPerWorker"])
+    target, reason = current, "steady"
+    # The p95 covers the whole metrics window, so it stays high for a while
+    # after the queue drained; slowness only counts while jobs are waiting
+    slow = load > 0 and policy["maxWaitMs"] is not None and wait_p95 is not None and wait_p95 > policy["maxWaitMs"]
+    if needed > current:
+        target, reason = min(needed, current + policy["maxStepUp"]), f"{load} jobs need {needed} workers"
+    elif slow:
+        target, reason = current + 1, f"p95 wait {wait_p95}ms over {policy['maxWaitMs']}ms"
+    elif load < current * policy["jobsPerWorker"] * policy["scaleDownRatio"]:
+        target, reason = max(needed, current - policy["maxStepDown"]), f"{load} jobs use under {policy['scaleDownRatio']:.0%} of {current} workers"
+
+    if target < policy["minWorkers"]:
+        target, reason = policy["minWorkers"], f"below minimum {policy['minWorkers']}"
+    elif target > policy["maxWorkers"]:
+        target, reason = policy["maxWorkers"], f"{reason}, capped at {policy['maxWorkers']}"
+    return target, reason
+
+
+class QueueAutoscaler:
+    """
+    Keeps the Deno worker containers of each queue with a policy between
+    its `minWorkers` and `maxWorkers`, following the queue's load.
+
+    Every `interval` seconds it reads the queue counts and p95 wait time
+    (from the metrics sampler, falling back to a direct count) and the
+    running `deno_<queue>_<prefix>_*` containers, and adds or stops
+    workers. Any change starts a cooldown: further scale-ups wait
+    `scaleUpCooldown` seconds, scale-downs `scaleDownCooldown`, which is
+    longer so a brief lull does not stop workers a burst will need again.
+    Scale-down stops autoscaled workers first, newest first, with SIGTERM
+    so the current job can finish. Policies persist in
+    `queue_autoscale.json` (or `QUEUE_AUTOSCALE_FILE`); every decision
+    that changes or is held back from changing the worker count is kept
+    in `decisions`.
+    """
+
+    def __init__(self, registry: QueueRegistry, discovery: QueueDiscovery, metrics: QueueMetrics, pool: WorkerPool,
+                 policies_file: str = AUTOSCALE_FILE, interval: int = 15, history: int = 500):
+        self.registry = registry
+        self.discovery = discovery
+        self.metrics = metrics
+        self.pool = pool
+        self.policies_file = policies_file
+        self.interval = interval
+        self.policies: Dict[str, dict] = {}
+        self.decisions: Deque[dict] = deque(maxlen=history)
+        # Last evaluation per queue, for the status endpoint
+        self.status: Dict[str, dict] = {}
+        # Time of the last change per queue, for the cooldowns
+        self.last_scaled: Dict[str, float] = {}
+        # Action held back by a cooldown per queue, so it is recorded once
+        self.held: Dict[str, str] = {}
+        self.client = None
+        self.task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self):
+        # Runs at import: a bad file must not take the app down with it
+        if not os.path.exists(self.policies_file):
+            return
+        try:
+            with open(self.policies_file) as f:
+                policies = json.load(f)
+            if not isinstance(policies, dict):
+                raise ValueError("expected an object of queue name -> policy")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring autoscale policies in {self.policies_file}: {e}")
+            return
+        for queue_name, policy in policies.items():
+            try:
+                self.set_policy(queue_name, policy, save=False)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"Skipping autoscale policy for {queue_name}: {e}")
+
+    def _save(self):
+        with open(self.policies_file, "w") as f:
+            json.dump(self.policies, f, indent=2)
+
+    def set_policy(self, queue_name: str, policy: dict, save: bool = True) -> dict:
+        split_queue_name(queue_name)
+        merged = {**DEFAULT_POLICY, **self.policies.get(queue_name, {}), **{k: v for k, v in policy.items() if v is not None}}
+        if merged["minWorkers"] < 0 or merged["maxWorkers"] < merged["minWorkers"]:
+            raise ValueError("Need 0 <= minWorkers <= maxWorkers")
+        if merged["jobsPerWorker"] <= 0 or not 0 < merged["scaleDownRatio"] <= 1:
+            raise ValueError("jobsPerWorker must be positive and scaleDownRatio in (0, 1]")
+        self.policies[queue_name] = merged
+        if save:
+            self._save()
+        return merged
+
+    def remove_policy(self, queue_name: str) -> bool:
+        """Stop scaling a queue; its running workers are left as they are."""
+        if self.policies.pop(queue_name, None) is None:
+            return False
+        self.status.pop(queue_name, None)
+        self.last_scaled.pop(queue_name, None)
+        self.held.pop(queue_name, None)
+        self._save()
+        return True
+
+    def _record(self, queue_name: str, action: str, current: int, target: int, reason: str, load: int,
+                wait_p95: Optional[float], error: Optional[str] = None):
+        decision = {"time": time.time(), "queue": queue_name, "action": action, "from": current, "to": target,
+                    "reason": reason, "load": load, "waitP95": wait_p95}
+        if error:
+            decision["error"] = error
+        self.decisions.append(decision)
+        print(f"Autoscaler {queue_name}: {action} {current} -> {target} ({reason}){f' failed: {error}' if error else ''}")
+
+    async def _observe(self, queue_name: str, urls: Dict[str, str]) -> tuple:
+        metrics = self.metrics.query(queue_name, window=120)
+        if metrics is not None:
+            wait = metrics["waitTime"]
+            return metrics["counts"], wait["p95"] if wait else None
+        counts = await count_jobs(self.registry.redis(urls.get(queue_name)), queue_name, ["waiting", "prioritized", "active"])
+        return counts, None
+
+    async def evaluate(self, queue_name: str, policy: dict, urls: Dict[str, str]):
+        counts, wait_p95 = await self._observe(queue_name, urls)
+        workers = await anyio.to_thread.run_sync(list_workers, self.client, queue_name)
+        current, load = len(workers), queue_load(counts)
+        target, reason = desired_workers(policy, current, load, wait_p95)
+        self.status[queue_name] = {"workers": current, "target": target, "load": load, "waitP95": wait_p95,
+                                   "reason": reason, "evaluatedAt": time.time()}
+        if target == current:
+            self.held.pop(queue_name, None)
+            return
+
+        action = "scale_up" if target > current else "scale_down"
+        cooldown = policy["scaleUpCooldown"] if target > current else policy["scaleDownCooldown"]
+        since = time.time() - self.last_scaled.get(queue_name, 0)
+        if since < cooldown:
+            if self.held.get(queue_name) != action:
+                self._record(queue_name, f"{action}_held", current, target, f"{reason}; cooldown {cooldown - since:.0f}s left", load, wait_p95)
+            self.held[queue_name] = action
+            return
+
+        self.held.pop(queue_name, None)
+        self.last_scaled[queue_name] = time.time()
+        try:
+            if target > current:
+                prefix, name = split_queue_name(queue_name)
+                for _ in range(target - current):
+                    await anyio.to_thread.run_sync(self._start_worker, name, prefix, policy)
+            else:
+                # Autoscaled workers first, newest first; manually started ones last
+                victims = sorted(workers, key=lambda c: (self._autoscaled(c), c["Created"]), reverse=True)
+                for container in victims[:current - target]:
+                    await anyio.to_thread.run_sync(stop_worker, self.client, container["Id"])
+        except Exception as e:
+            self._record(queue_name, action, current, target, reason, load, wait_p95, str(e))
+            return
+        self._record(queue_name, action, current, target, reason, load, wait_p95)
+
+    def _start_worker(self, name: str, prefix: str, policy: dict):
+        # A warm pooled container when one is ready, else a fresh one
+        if self.pool.acquire(name, prefix, policy["processFileName"], policy["queueProps"], autoscaled=True) is not None:
+            return
+        run_worker(self.client, name, prefix, policy["processFileName"], policy["queueProps"], labels={AUTOSCALED_LABEL: "true"})
+
+    def _autoscaled(self, container: dict) -> bool:
+        # Pooled workers cannot carry the label; the pool records which ones it handed to us
+        return container["Labels"].get(AUTOSCALED_LABEL) == "true" or self.pool.autoscaled(container["Names"][0].lstrip("/"))
+
+    async def run_once(self):
+        policies = {name: policy for name, policy in self.policies.items() if policy["enabled"]}
+        if not policies:
+            return
+        urls = {queue["name"]: queue["url"] for queue in await self.discovery.list()}
+        results = await asyncio.gather(*(self.evaluate(name, policy, urls) for name, policy in policies.items()), return_exceptions=True)
+        for name, result in zip(policies, results):
+            if isinstance(result, Exception):
+                print(f"Error autoscaling queue {name}: {result}")
+
+    async def _scale_loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Error autoscaling queues: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, client):
+        """Start scaling with `client` (a docker.DockerClient); call from the running event loop."""
+        self.client = client
+        if self.task is None:
+            self.task = asyncio.get_event_loop().create_task(self._scale_loop())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def describe(self, queue_name: Optional[str] = None, limit: int = 100) -> dict:
+        names = [queue_name] if queue_name else sorted(self.policies)
+        decisions = [d for d in self.decisions if queue_name is None or d["queue"] == queue_name]
+        return {
+            "interval": self.interval,
+            "queues": [{"queue": name, "policy": self.policies[name], "status": self.status.get(name)} for name in names if name in self.policies],
+            "decisions": list(reversed(decisions))[:limit],
+        }
+
+
+queue_autoscaler = QueueAutoscaler(queue_registry, queue_discovery, queue_metrics, worker_pool)
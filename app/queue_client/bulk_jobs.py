@@ -0,0 +1,65 @@
+import asyncio
+from typing import List
+
+from bullmq import Job, Queue
+
+BATCH_SIZE = 1000  # jobs handled per lua script call
+ID_CONCURRENCY = 100  # single-job scripts in flight at once
+
+
+async def _for_ids(ids: List[str], fn) -> dict:
+    """Run `fn(job_id)` over the ids in bounded concurrent chunks; collect per-id failures."""
+    done, errors = 0, {}
+    for offset in range(0, len(ids), ID_CONCURRENCY):
+        chunk = ids[offset:offset + ID_CONCURRENCY]
+        results = await asyncio.gather(*(fn(job_id) for job_id in chunk), return_exceptions=True)
+        for job_id, result in zip(chunk, results):
+            if isinstance(result, Exception):
+                errors[job_id] = str(result)
+            elif result is False:
+                errors[job_id] = "Job not found"
+            else:
+                done += 1
+    return {"done": done, "errors": errors}
+
+
+async def retry_job_ids(queue: Queue, ids: List[str], state: str = "failed") -> dict:
+    async def retry(job_id: str):
+        job = await Job.fromId(queue, job_id)
+        if job is None:
+            return False
+        await job.retry(state)
+
+    return await _for_ids(ids, retry)
+
+
+async def remove_job_ids(queue: Queue, ids: List[str]) -> dict:
+    async def remove(job_id: str):
+        # The remove script reports 0 for jobs that do not exist (or are locked)
+        return bool(await queue.remove(job_id))
+
+    return await _for_ids(ids, remove)
+
+
+async def retry_all(queue: Queue, redis_client, state: str = "failed") -> dict:
+    """
+    Move every job in `state` back to waiting.
+
+    bullmq's retryJobs script moves `BATCH_SIZE` jobs per call and is
+    repeated until the set is empty, so Redis is never blocked by one huge
+    script and 50k jobs take about 50 calls.
+    """
+    key = f"{queue.prefix}:{queue.name}:{state}"
+    before = await redis_client.zcard(key)
+    await queue.retryJobs({"count": BATCH_SIZE, "state": state})
+    return {"done": before - await redis_client.zcard(key), "errors": {}}
+
+
+async def clean_state(queue: Queue, state: str, older_than: int = 0) -> dict:
+    """Remove jobs in `state` older than `older_than` ms, `BATCH_SIZE` per clean call."""
+    removed = 0
+    while True:
+        deleted = await queue.clean(older_than, BATCH_SIZE, state)
+        removed += len(deleted)
+        if len(deleted) < BATCH_SIZE:
+            return {"done": removed, "errors": {}}
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from .registry import QueueRegistry, queue_registry
+
+
+def queue_name_from_meta_key(key: str) -> Optional[str]:
+    """`<prefix>:<queue>:meta` -> `prefix:queue` (queue names may contain colons)."""
+    if not key.endswith(":meta"):
+        return None
+    name = key[: -len(":meta")]
+    return name if ":" in name else None
+
+
+class QueueDiscovery:
+    """
+    Finds BullMQ queues from their `<prefix>:<queue>:meta` hashes in Redis.
+
+    The key SCAN is cached for `ttl` seconds, and concurrent callers share
+    one scan, so job operations cost no Docker calls and at most one SCAN
+    per TTL. Worker containers are only looked up when explicitly asked
+    for.
+    """
+
+    def __init__(self, registry: QueueRegistry, ttl: float = 10, prefixes: Optional[List[str]] = None, scan_count: int = 1000):
+        self.registry = registry
+        self.ttl = ttl
+        # Restricting the prefixes narrows the SCAN match on big Redis instances
+        self.prefixes = prefixes
+        self.scan_count = scan_count
+        self.cache: Dict[str, tuple] = {}
+        self.lock = asyncio.Lock()
+
+    async def _scan(self, url: str) -> List[str]:
+        client = self.registry.redis(url)
+        names = set()
+        for prefix in self.prefixes or ["*"]:
+            async for key in client.scan_iter(match=f"{prefix}:*:meta", count=self.scan_count, _type="hash"):
+                name = queue_name_from_meta_key(key)
+                if name:
+                    names.add(name)
+        return sorted(names)
+
+    async def list(self, url: Optional[str] = None) -> List[dict]:
+        """Queue configs in the shape the queue pages use: `{name, hostId, url}`."""
+        url = url or self.registry.default_url
+        cached = self.cache.get(url)
+        if cached is None or time.monotonic() - cached[0] > self.ttl:
+            async with self.lock:
+                cached = self.cache.get(url)
+                if cached is None or time.monotonic() - cached[0] > self.ttl:
+                    cached = self.cache[url] = (time.monotonic(), await self._scan(url))
+        return [{"name": name, "hostId": "redis", "url": url} for name in cached[1]]
+
+    def invalidate(self):
+        self.cache.clear()
+
+    async def list_with_workers(self, docker_client, url: Optional[str] = None) -> List[dict]:
+        """Queue configs plus the `deno_<queue>_<prefix>_...` worker containers serving each queue."""
+        queues = await self.list(url)
+        workers: Dict[str, List[dict]] = {}
+        containers = await asyncio.to_thread(docker_client.api.containers, all=True, filters={"name": "deno_"})
+        for container in containers:
+            container_name = container["Names"][0].lstrip("/")
+            name_list = container_name.split("deno_", 1)[1].split("_")
+            if len(name_list) < 2:
+                continue
+            workers.setdefault(f"{name_list[1]}:{name_list[0]}", []).append({
+                "id": container["Id"],
+                "name": container_name,
+                "state": container["State"],
+                "status": container["Status"],
+            })
+        return [{**queue, "workers": workers.get(queue["name"], [])} for queue in queues]
+
+
+queue_discovery = QueueDiscovery(queue_registry)
@@ -0,0 +1,94 @@
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from bullmq import Queue
+
+
+def job_spec(meta: dict, data: dict) -> dict:
+    """The `{name, data, opts}` bullmq expects, with the job data the workers already read."""
+    job_data = {
+        "obj": {
+            "meta": {"id": meta.get("id") or "1", "name": meta.get("name", "")},
+            "data": data,
+        }
+    }
+    opts = {"delay": meta.get("delay", 0), "attempts": meta.get("attempts", 0)}
+    if meta.get("repeat"):
+        # Workers read the repeat options as a one-element list
+        job_data["repeat"] = [meta["repeat"]]
+        return {"name": "add_repeat_job", "data": job_data, "opts": opts}
+    return {"name": "__default__", "data": job_data, "opts": opts}
+
+
+def initial_state(spec: dict) -> str:
+    # What getState would answer right after the add, without the round trip
+    return "delayed" if spec["opts"].get("delay") else "waiting"
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, item, error) from an NDJSON byte stream, one line at a time."""
+    buffer = b""
+    line_number = 0
+
+    def parse(raw: bytes):
+        try:
+            item = json.loads(raw)
+        except ValueError as e:
+            return None, f"Invalid JSON: {e}"
+        if not isinstance(item, dict):
+            return None, "Each line must be a JSON object"
+        return item, None
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            if raw.strip():
+                yield (line_number, *parse(raw))
+    if buffer.strip():
+        yield (line_number + 1, *parse(buffer))
+
+
+async def iter_array(items: List) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            yield index, item, None
+        else:
+            yield index, None, "Each job must be a JSON object"
+
+
+async def enqueue(queue: Queue, items: AsyncIterator[Tuple[int, Optional[dict], Optional[str]]], chunk_size: int = 1000) -> AsyncIterator[dict]:
+    """
+    Add jobs with `addBulk`, `chunk_size` at a time, yielding one result per chunk.
+
+    addBulk sends the whole chunk as one MULTI, so a chunk costs a single
+    round trip instead of one per job. Items are consumed as they arrive,
+    so an NDJSON upload never has to be held in memory.
+    """
+    batch: List[Tuple[int, dict]] = []
+    errors: List[dict] = []
+
+    async def flush():
+        specs = [spec for _, spec in batch]
+        jobs = await queue.addBulk(specs)
+        result = {
+            "jobs": [{"index": index, "id": job.id, "state": initial_state(spec)} for (index, spec), job in zip(batch, jobs)],
+            "errors": list(errors),
+        }
+        batch.clear()
+        errors.clear()
+        return result
+
+    async for index, item, error in items:
+        if error is None:
+            try:
+                batch.append((index, job_spec(item.get("meta") or {}, item.get("data") or {})))
+            except (AttributeError, TypeError) as e:
+                error = str(e)
+        if error is not None:
+            errors.append({"index": index, "error": error})
+        if len(batch) >= chunk_size:
+            yield await flush()
+    if batch or errors:
+        yield await flush() if batch else {"jobs": [], "errors": list(errors)}
@@ -0,0 +1,207 @@
+import asyncio
+import base64
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.docker_client.operations import format_sse
+
+from .discovery import QueueDiscovery, queue_discovery
+from .jobs import queue_key
+from .registry import QueueRegistry, queue_registry
+
+READ_COUNT = 500  # stream entries per XREAD
+# Stream that subscribe() appends to so the reader's blocking XREAD returns and picks up new queues
+WAKE_KEY = "queue-dashboard:events:wake"
+CLIENT_BUFFER = 1000  # events buffered per client before it is cut off to resume from its last id
+
+
+def stream_id(entry_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def encode_positions(positions: Dict[str, str]) -> str:
+    """The SSE id: the last entry id sent per queue, so one Last-Event-ID resumes every queue."""
+    return base64.urlsafe_b64encode(json.dumps(positions, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_positions(value: Optional[str]) -> Dict[str, str]:
+    if not value:
+        return {}
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+    except ValueError:
+        return {}
+    return positions if isinstance(positions, dict) else {}
+
+
+class Subscription:
+    """
+    One SSE client: the queues and event names it wants, and a bounded buffer.
+
+    `positions` holds the last entry id replayed or sent per queue; queues
+    without one start after `started`, the stream id of the moment the
+    client subscribed.
+    """
+
+    def __init__(self, queues: Optional[Set[str]], events: Optional[Set[str]], positions: Dict[str, str], started: str):
+        self.queues = queues
+        self.events = events
+        self.positions = positions
+        self.started = started
+        self.buffer: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_BUFFER)
+        self.overflowed = False
+
+    def wants_queue(self, queue_name: str) -> bool:
+        return self.queues is None or queue_name in self.queues
+
+    def wants(self, queue_name: str, fields: dict) -> bool:
+        return self.wants_queue(queue_name) and (self.events is None or fields.get("event") in self.events)
+
+    def position(self, queue_name: str) -> str:
+        return self.positions.get(queue_name, self.started)
+
+    def push(self, item: tuple):
+        if self.overflowed:
+            return
+        try:
+            self.buffer.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too slow: end the stream, the client reconnects with Last-Event-ID
+            self.overflowed = True
+
+
+class QueueEventHub:
+    """
+    Fans BullMQ's `<prefix>:<queue>:events` streams out to SSE clients.
+
+    A single reader per Redis server follows the streams of every queue
+    with at least one subscriber, in one blocking XREAD. Redis load
+    therefore stays flat no matter how many browsers are connected. Each
+    client filters by queue and event name. A client that reconnects with
+    Last-Event-ID first replays what it missed with XRANGE (up to
+    CLIENT_BUFFER entries per queue, and as far as the streams' max length
+    allows) and then continues live without duplicates.
+
+    A queue that starts being watched is read from the oldest position any
+    of its subscribers has reached, so nothing published while the reader
+    was catching up is lost. Subscribing appends to WAKE_KEY, which the
+    XREAD also follows, so the reader picks up new queues at once instead
+    of after `block_ms`.
+    """
+
+    def __init__(self, registry: QueueRegistry, discovery: QueueDiscovery, block_ms: int = 5000):
+        self.registry = registry
+        self.discovery = discovery
+        self.block_ms = block_ms
+        self.subscribers: Set[Subscription] = set()
+        # Hub read position per queue
+        self.positions: Dict[str, str] = {}
+        self.reader: Optional[asyncio.Task] = None
+
+    async def _watched_queues(self) -> List[str]:
+        discovered = [queue["name"] for queue in await self.discovery.list()]
+        if any(subscription.queues is None for subscription in self.subscribers):
+            return discovered
+        wanted = set().union(*(subscription.queues for subscription in self.subscribers))
+        return [name for name in discovered if name in wanted]
+
+    def _start_position(self, queue_name: str) -> str:
+        positions = [subscription.position(queue_name) for subscription in self.subscribers if subscription.wants_queue(queue_name)]
+        return min(positions, key=stream_id) if positions else "0-0"
+
+    async def _read_loop(self):
+        # Pin one pooled connection for the blocking reads
+        client = self.registry.redis().client()
+        try:
+            latest = await client.xrevrange(WAKE_KEY, count=1)
+            wake_position = latest[0][0] if latest else "0-0"
+            while self.subscribers:
+                queues = await self._watched_queues()
+                for queue_name in queues:
+                    if queue_name not in self.positions:
+                        self.positions[queue_name] = self._start_position(queue_name)
+                streams = {queue_key(queue_name, "events"): self.positions[queue_name] for queue_name in queues}
+                streams[WAKE_KEY] = wake_position
+                for key, entries in await client.xread(streams, count=READ_COUNT, block=self.block_ms) or []:
+                    if key == WAKE_KEY:
+                        wake_position = entries[-1][0]
+                        continue
+                    queue_name = key[: -len(":events")]
+                    for entry_id, fields in entries:
+                        self.positions[queue_name] = entry_id
+                        for subscription in list(self.subscribers):
+                            if subscription.wants(queue_name, fields):
+                                subscription.push((queue_name, entry_id, fields))
+        except Exception as e:
+            print(f"Queue event reader stopped: {e}")
+            for subscription in list(self.subscribers):
+                subscription.overflowed = True
+        finally:
+            self.positions.clear()
+            try:
+                await client.close()
+            finally:
+                # Only now: a subscriber arriving during the close would otherwise start a second reader
+                self.reader = None
+        if any(not subscription.overflowed for subscription in self.subscribers):
+            # A client subscribed while the loop was exiting
+            self.reader = asyncio.get_event_loop().create_task(self._read_loop())
+
+    async def subscribe(self, queues: Optional[Set[str]] = None, events: Optional[Set[str]] = None,
+                        last_event_id: Optional[str] = None, heartbeat: float = 15) -> AsyncIterator[str]:
+        """Yield SSE messages for one client until it disconnects or falls too far behind."""
+        client = self.registry.redis()
+        seconds, microseconds = await client.time()
+        # Entries from the millisecond before are included rather than risk missing one
+        started = f"{seconds * 1000 + microseconds // 1000 - 1}-0"
+        subscription = Subscription(queues, events, decode_positions(last_event_id), started)
+        # Attach before replaying so nothing published meanwhile is missed
+        self.subscribers.add(subscription)
+        try:
+            if self.reader is None:
+                self.reader = asyncio.get_event_loop().create_task(self._read_loop())
+            else:
+                await client.xadd(WAKE_KEY, {"subscribed": "1"}, maxlen=1, approximate=False)
+            for queue_name, position in list(subscription.positions.items()):
+                if queues is not None and queue_name not in queues:
+                    continue
+                entries = await client.xrange(queue_key(queue_name, "events"), min=f"({position}", max="+", count=CLIENT_BUFFER)
+                for entry_id, fields in entries:
+                    subscription.positions[queue_name] = entry_id
+                    if subscription.wants(queue_name, fields):
+                        yield self._message(queue_name, entry_id, fields, subscription.positions)
+
+            while not subscription.overflowed:
+                try:
+                    queue_name, entry_id, fields = await asyncio.wait_for(subscription.buffer.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if stream_id(entry_id) <= stream_id(subscription.position(queue_name)):
+                    # Already sent during the replay, or from before this client subscribed
+                    continue
+                subscription.positions[queue_name] = entry_id
+                yield self._message(queue_name, entry_id, fields, subscription.positions)
+        finally:
+            self.subscribers.discard(subscription)
+
+    @staticmethod
+    def _message(queue_name: str, entry_id: str, fields: dict, positions: Dict[str, str]) -> str:
+        data = {"queueName": queue_name, "streamId": entry_id, **fields}
+        for name in ("returnvalue", "data"):
+            if name in data:
+                try:
+                    data[name] = json.loads(data[name])
+                except ValueError:
+                    pass
+        return format_sse(fields.get("event", "message"), data, encode_positions(positions))
+
+    async def close(self):
+        self.subscribers.clear()
+        if self.reader is not None:
+            self.reader.cancel()
+            self.reader = None
+
+
+queue_event_hub = QueueEventHub(queue_registry, queue_discovery)
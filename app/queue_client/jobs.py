@@ -0,0 +1,152 @@
+import base64
+import json
+from typing import Dict, List, Optional
+
+# BullMQ state -> (key suffix, redis type). Lists get new jobs pushed on
+# the left; the sorted sets are scored by time (finish time for completed
+# and failed, due time for delayed).
+STATE_KEYS = {
+    "waiting": ("wait", "list"),
+    "paused": ("paused", "list"),
+    "active": ("active", "list"),
+    "prioritized": ("prioritized", "zset"),
+    "delayed": ("delayed", "zset"),
+    "completed": ("completed", "zset"),
+    "failed": ("failed", "zset"),
+    "waiting-children": ("waiting-children", "zset"),
+}
+ALL_STATES = list(STATE_KEYS)
+
+
+def _json(value: Optional[str], default=None):
+    if value is None or value == "":
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+def job_from_hash(job_id: str, raw: Dict[str, str], state: str, queue_name: str) -> dict:
+    """Build the job dict the queue pages render straight from the job hash."""
+    attempts_made = _int(raw.get("attemptsMade") or raw.get("atm")) or 0
+    return {
+        "queueName": queue_name,
+        "parent": _json(raw.get("parent")),
+        "job_id": job_id,
+        "name": raw.get("name"),
+        "progress": _json(raw.get("progress"), 0),
+        "timestamps": {
+            "added": _int(raw.get("timestamp")),
+            "processed": _int(raw.get("processedOn")) or None,
+            "finished": _int(raw.get("finishedOn")) or None,
+        },
+        "attempts": attempts_made + 1,
+        "data": _json(raw.get("data"), {}),
+        "job_state": state,
+        "return_value": _json(raw.get("returnvalue")),
+        "failed_reason": raw.get("failedReason"),
+        "stacktrace": _json(raw.get("stacktrace"), []),
+    }
+
+
+def queue_key(queue_name: str, suffix: str) -> str:
+    # Queue names are shown as `prefix:name`, which is also their key prefix
+    return f"{queue_name}:{suffix}"
+
+
+def queue_count(pipe, queue_name: str, state: str):
+    suffix, key_type = STATE_KEYS[state]
+    key = queue_key(queue_name, suffix)
+    if key_type == "list":
+        pipe.llen(key)
+    else:
+        pipe.zcard(key)
+
+
+async def load_jobs(client, queue_name: str, entries: List[tuple]) -> List[dict]:
+    """HGETALL every (job_id, state, score) in one pipelined round trip; vanished jobs are skipped."""
+    if not entries:
+        return []
+    pipe = client.pipeline(transaction=False)
+    for job_id, _, _ in entries:
+        pipe.hgetall(queue_key(queue_name, job_id))
+    hashes = await pipe.execute()
+    jobs = []
+    for (job_id, state, score), raw in zip(entries, hashes):
+        # Removed (or trimmed) between the range and the HGETALL
+        if not raw:
+            continue
+        job = job_from_hash(job_id, raw, state, queue_name)
+        job["score"] = score
+        jobs.append(job)
+    return jobs
+
+
+async def count_jobs(client, queue_name: str, states: List[str] = ALL_STATES) -> Dict[str, int]:
+    pipe = client.pipeline(transaction=False)
+    for state in states:
+        queue_count(pipe, queue_name, state)
+    return dict(zip(states, await pipe.execute()))
+
+
+def encode_cursor(state: str, job_id: str, score: Optional[float]) -> str:
+    raw = json.dumps({"state": state, "id": job_id, "score": score}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(decoded, dict) or "id" not in decoded:
+        raise ValueError("Invalid cursor")
+    return decoded
+
+
+async def page_ids(client, queue_name: str, state: str, cursor: Optional[dict], limit: int) -> List[tuple]:
+    """
+    One page of (job_id, score) after `cursor`, newest first.
+
+    The cursor is the last job returned, located again by its current rank
+    (ZREVRANK / LPOS), so jobs added at the head while paging do not shift
+    later pages. If that job has left the state, sorted sets resume below
+    its score. Lists have no score, so such a page ends, because jobs leave
+    a list from the old end.
+    """
+    suffix, key_type = STATE_KEYS[state]
+    key = queue_key(queue_name, suffix)
+    start = 0
+    if cursor is not None:
+        position = await (client.zrevrank(key, cursor["id"]) if key_type == "zset" else client.lpos(key, cursor["id"]))
+        if position is None:
+            if key_type == "list":
+                return []
+            result = await client.zrevrangebyscore(key, f"({cursor['score']}", "-inf", start=0, num=limit, withscores=True)
+            return [(job_id, score) for job_id, score in result]
+        start = position + 1
+    if key_type == "list":
+        return [(job_id, None) for job_id in await client.lrange(key, start, start + limit - 1)]
+    return [(job_id, score) for job_id, score in await client.zrevrange(key, start, start + limit - 1, withscores=True)]
+
+
+async def page_jobs(client, queue_name: str, state: str, cursor: Optional[str] = None, limit: int = 50) -> dict:
+    """A cursor page of one state's jobs; memory is bounded by `limit` whatever the queue size."""
+    if state not in STATE_KEYS:
+        raise ValueError(f"Unknown state {state}. Use one of {', '.join(STATE_KEYS)}.")
+    if limit <= 0:
+        # The range end would be -1, i.e. the whole list or set
+        raise ValueError("limit must be positive")
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is not None and decoded.get("state") != state:
+        raise ValueError("Cursor belongs to a different state")
+    ids = await page_ids(client, queue_name, state, decoded, limit)
+    jobs = await load_jobs(client, queue_name, [(job_id, state, score) for job_id, score in ids])
+    next_cursor = encode_cursor(state, ids[-1][0], ids[-1][1]) if len(ids) == limit else None
+    total = (await count_jobs(client, queue_name, [state]))[state]
+    return {"jobs": jobs, "state": state, "limit": limit, "total": total, "nextCursor": next_cursor}
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .discovery import QueueDiscovery, queue_discovery
+from .jobs import ALL_STATES, queue_count, queue_key
+from .registry import QueueRegistry, queue_registry
+
+PERCENTILES = [50, 90, 95, 99]
+MAX_JOBS_PER_SAMPLE = 5000  # finished jobs read per state and tick; the rest wait for the next tick
+
+
+class QueueSeries:
+    """Rolling samples of one queue: counts per tick and durations of finished jobs."""
+
+    def __init__(self, retention: int):
+        self.retention = retention
+        # (sampled_at, counts)
+        self.counts: Deque[tuple] = deque()
+        # (finished_at, state, wait_ms, processing_ms)
+        self.finished: Deque[tuple] = deque()
+        # Score (finishedOn) of the last finished job read, per state
+        self.cursors: Dict[str, float] = {}
+        # Per-minute counts from bullmq's own metrics, when the workers enable them
+        self.builtin: Dict[str, List[int]] = {}
+
+    def trim(self, now: float):
+        cutoff = now - self.retention
+        while self.counts and self.counts[0][0] < cutoff:
+            self.counts.popleft()
+        while self.finished and self.finished[0][0] < cutoff:
+            self.finished.popleft()
+
+
+def percentiles(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    result = {}
+    for p in PERCENTILES:
+        # Linear interpolation between the closest ranks
+        position = (len(ordered) - 1) * p / 100
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        result[f"p{p}"] = round(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower), 1)
+    result["avg"] = round(sum(ordered) / len(ordered), 1)
+    return result
+
+
+def backlog(counts: dict) -> int:
+    return counts["waiting"] + counts["prioritized"] + counts["delayed"]
+
+
+class QueueMetrics:
+    """
+    Samples every discovered queue every `interval` seconds into rolling windows.
+
+    Each tick reads the counts of all states and the completed/failed jobs
+    finished since the previous tick (by the sorted-set score, which is
+    finishedOn), with `timestamp`, `processedOn` and `finishedOn` from
+    their hashes. Wait time is processedOn - timestamp, processing time is
+    finishedOn - processedOn. Jobs removed on completion never reach the
+    sets, so when the workers enable bullmq metrics, the per-minute counts
+    in `<queue>:metrics:<state>:data` are used for throughput instead.
+    """
+
+    def __init__(self, registry: QueueRegistry, discovery: QueueDiscovery, interval: int = 10, retention: int = 3600):
+        self.registry = registry
+        self.discovery = discovery
+        self.interval = interval
+        self.retention = retention
+        self.series: Dict[str, QueueSeries] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    async def sample_queue(self, queue_name: str, url: str):
+        client = self.registry.redis(url)
+        series = self.series.setdefault(queue_name, QueueSeries(self.retention))
+        now = time.time()
+
+        pipe = client.pipeline(transaction=False)
+        for state in ALL_STATES:
+            queue_count(pipe, queue_name, state)
+        for state in ("completed", "failed"):
+            # First tick: only jobs that finished within the retention window
+            since = series.cursors.get(state, (now - self.retention) * 1000)
+            pipe.zrangebyscore(queue_key(queue_name, state), f"({since}", "+inf", start=0, num=MAX_JOBS_PER_SAMPLE, withscores=True)
+            pipe.lrange(queue_key(queue_name, f"metrics:{state}:data"), 0, self.retention // 60 - 1)
+        results = await pipe.execute()
+
+        counts = dict(zip(ALL_STATES, results[:len(ALL_STATES)]))
+        series.counts.append((now, counts))
+        finished_ids = []
+        for offset, state in enumerate(("completed", "failed")):
+            entries = results[len(ALL_STATES) + offset * 2]
+            series.builtin[state] = [int(value) for value in results[len(ALL_STATES) + offset * 2 + 1]]
+            if entries:
+                series.cursors[state] = entries[-1][1]
+            finished_ids.extend((state, job_id) for job_id, _ in entries)
+
+        if finished_ids:
+            pipe = client.pipeline(transaction=False)
+            for _, job_id in finished_ids:
+                pipe.hmget(queue_key(queue_name, job_id), "timestamp", "processedOn", "finishedOn")
+            for (state, _), (added, processed, finished) in zip(finished_ids, await pipe.execute()):
+                if not (added and processed and finished):
+                    continue
+                added, processed, finished = int(added), int(processed), int(finished)
+                series.finished.append((finished / 1000, state, processed - added, finished - processed))
+        series.trim(now)
+
+    async def sample(self):
+        queues = await self.discovery.list()
+        results = await asyncio.gather(*(self.sample_queue(queue["name"], queue["url"]) for queue in queues), return_exceptions=True)
+        for queue, result in zip(queues, results):
+            if isinstance(result, Exception):
+                print(f"Error sampling queue {queue['name']}: {result}")
+        # Forget queues that no longer exist
+        for name in set(self.series) - {queue["name"] for queue in queues}:
+            del self.series[name]
+
+    async def _sample_loop(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                # Redis being down must not end sampling for good
+                print(f"Error sampling queues: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start sampling; must be called from the running event loop (app startup)."""
+        if self.task is None:
+            self.task = asyncio.get_event_loop().create_task(self._sample_loop())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def query(self, queue_name: str, window: int = 300) -> Optional[dict]:
+        """
+        Throughput, latency percentiles (ms) and backlog trend over the last `window` seconds.
+
+        `backlogGrowthPerMinute` > 0 means jobs arrive faster than they are
+        processed, i.e. the queue is not keeping up.
+        """
+        series = self.series.get(queue_name)
+        if series is None or not series.counts:
+            return None
+        now = time.time()
+        # At least one sampling interval: a zero or negative window has no throughput
+        window = max(self.interval, min(window, self.retention))
+        finished = [entry for entry in series.finished if entry[0] >= now - window]
+        counts = [entry for entry in series.counts if entry[0] >= now - window] or [series.counts[-1]]
+        minutes = window / 60
+
+        throughput = {state: round(sum(1 for entry in finished if entry[1] == state) / minutes, 2) for state in ("completed", "failed")}
+        source = "samples"
+        if any(series.builtin.values()):
+            # bullmq keeps exact per-minute counts even for jobs removed on completion
+            whole_minutes = max(1, window // 60)
+            throughput = {state: round(sum(values[:whole_minutes]) / whole_minutes, 2) for state, values in series.builtin.items()}
+            source = "bullmq"
+
+        backlog_growth = None
+        first, last = counts[0], counts[-1]
+        if last[0] > first[0]:
+            backlog_growth = round((backlog(last[1]) - backlog(first[1])) / ((last[0] - first[0]) / 60), 2)
+
+        return {
+            "queue": queue_name,
+            "window": window,
+            "counts": last[1],
+            "throughputPerMinute": throughput,
+            "throughputSource": source,
+            "waitTime": percentiles([entry[2] for entry in finished]),
+            "processingTime": percentiles([entry[3] for entry in finished]),
+            "samples": len(finished),
+            "backlogGrowthPerMinute": backlog_growth,
+            "keepingUp": backlog_growth is None or backlog_growth <= 0,
+        }
+
+    def query_all(self, window: int = 300) -> List[dict]:
+        return [result for result in (self.query(name, window) for name in sorted(self.series)) if result is not None]
+
+
+queue_metrics = QueueMetrics(queue_registry, queue_discovery)
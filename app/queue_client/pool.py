@@ -0,0 +1,245 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import anyio
+from docker.errors import APIError, ImageNotFound
+
+from .workers import DENO_DIR, WORKER_IMAGE, WORKER_RESOURCES, worker_command, worker_name, worker_volumes
+
+POOL_FILE = os.environ.get("WORKER_POOL_FILE", os.path.join(os.getcwd(), "worker_pool.json"))
+POOL_NAME_PREFIX = "denopool_"
+POOL_LABEL = "workerPool"
+ASSIGNMENT_FILE = "/tmp/assignment"
+READY_FILE = "/tmp/ready"
+
+# Command of a pooled container: compile the worker and every process file
+# into the shared cache, mark the container ready, then wait for an
+# assignment and exec it, so the worker replaces the shell and its output
+# is the container's log
+BOOTSTRAP = (
+    "for file in /worker/worker.ts /worker/Queues/processList/*; do deno cache \"$file\"; done > /dev/null 2>&1; "
+    f"touch {READY_FILE}; while [ ! -f {ASSIGNMENT_FILE} ]; do sleep 0.05; done; exec sh {ASSIGNMENT_FILE}"
+)
+# Reports the ready marker as the container's health, so ready containers
+# can be listed with one filtered call instead of an exec into each
+READY_HEALTHCHECK = {
+    "test": ["CMD-SHELL", f"test -f {READY_FILE}"],
+    "interval": 1_000_000_000,
+    "timeout": 1_000_000_000,
+    "retries": 1,
+}
+# Written to a temp file and renamed, so the bootstrap never runs a partial script
+ASSIGN = f'printf "%s\\n" "$1" > {ASSIGNMENT_FILE}.tmp && mv {ASSIGNMENT_FILE}.tmp {ASSIGNMENT_FILE}'
+
+
+class WorkerPool:
+    """
+    Keeps `size` idle Deno worker containers running and hands them to queues on demand.
+
+    Creating a worker means creating a container and having Deno fetch and
+    compile `worker.ts` and its dependencies, which takes seconds. A pooled
+    container has done all of that ahead of time (into the shared
+    `deno_worker_cache` volume) and waits in a 50ms poll loop. Assigning it
+    renames it to the usual `deno_<queue>_<prefix>_<processFile>_<ts>` and
+    writes the worker command into it with one exec, so it is processing
+    jobs well under a second later. Only containers that finished caching
+    (reported healthy through the ready marker) are handed out. The pool
+    is refilled in the background after every assignment. Idle containers
+    are left running on shutdown and adopted on the next start.
+
+    The pool is opt-in: with the default size of 0 (`WORKER_POOL_SIZE`)
+    nothing is pulled or started until it is resized.
+
+    Container labels cannot change after creation, so the queueProps of
+    pooled workers, and whether the autoscaler took them, are kept in
+    `worker_pool.json` (or `WORKER_POOL_FILE`) instead of a label.
+    """
+
+    def __init__(self, size: int = int(os.environ.get("WORKER_POOL_SIZE", 0)), interval: int = 10, state_file: str = POOL_FILE):
+        self.size = size
+        self.interval = interval
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        # Worker name -> {"queueProps": ..., "autoscaled": ...} of pooled workers handed out
+        self.assigned: Dict[str, dict] = {}
+        self.client = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wake: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self):
+        # Runs at import: a bad file must not take the app down with it
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file) as f:
+                assigned = json.load(f)
+            if not isinstance(assigned, dict):
+                raise ValueError("expected an object of worker name -> assignment")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring worker pool state in {self.state_file}: {e}")
+            return
+        self.assigned = {name: entry for name, entry in assigned.items() if isinstance(entry, dict)}
+
+    def _save(self):
+        # Called with the lock held
+        with open(self.state_file, "w") as f:
+            json.dump(self.assigned, f, indent=2)
+
+    def queue_props(self, name: str) -> Optional[dict]:
+        """queueProps a pooled worker was assigned with."""
+        with self.lock:
+            return (self.assigned.get(name) or {}).get("queueProps")
+
+    def autoscaled(self, name: str) -> bool:
+        """Whether the autoscaler took this pooled worker."""
+        with self.lock:
+            return bool((self.assigned.get(name) or {}).get("autoscaled"))
+
+    def idle(self, ready_only: bool = False) -> List[dict]:
+        """Running pooled containers not yet assigned, oldest (most likely warm) first."""
+        filters = {"label": POOL_LABEL, "status": "running"}
+        if ready_only:
+            filters["health"] = "healthy"
+        containers = self.client.api.containers(filters=filters)
+        idle = [container for container in containers if container["Names"][0].lstrip("/").startswith(POOL_NAME_PREFIX)]
+        return sorted(idle, key=lambda container: container["Created"])
+
+    def _ensure_image(self):
+        try:
+            self.client.images.get(WORKER_IMAGE)
+        except ImageNotFound:
+            print(f"Pulling {WORKER_IMAGE} for the worker pool...")
+            self.client.images.pull(WORKER_IMAGE)
+
+    def _create(self) -> str:
+        name = f"{POOL_NAME_PREFIX}{time.time_ns()}"
+        self.client.containers.run(
+            WORKER_IMAGE,
+            name=name,
+            volumes=worker_volumes(),
+            network_mode="host",
+            command=["sh", "-c", BOOTSTRAP],
+            environment={"DENO_DIR": DENO_DIR},
+            detach=True,
+            healthcheck=READY_HEALTHCHECK,
+            **WORKER_RESOURCES,
+            labels={POOL_LABEL: "true"},
+        )
+        return name
+
+    def fill(self):
+        """Create or remove idle containers until exactly `size` are waiting."""
+        with self.lock:
+            idle = self.idle()
+        missing = self.size - len(idle)
+        if missing > 0:
+            self._ensure_image()
+            for _ in range(missing):
+                self._create()
+        elif missing < 0:
+            with self.lock:
+                # Keep the oldest, whose cache is warm
+                for container in self.idle()[self.size:]:
+                    self.client.api.remove_container(container["Id"], force=True)
+        # Forget assigned workers that have been removed since
+        existing = {container["Names"][0].lstrip("/") for container in self.client.api.containers(all=True, filters={"label": POOL_LABEL})}
+        with self.lock:
+            removed = set(self.assigned) - existing
+            if removed:
+                for name in removed:
+                    self.assigned.pop(name, None)
+                self._save()
+
+    def _wake(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wake.set)
+
+    def acquire(self, queue_name: str, prefix: str, process_file_name: str, queue_props: Optional[dict] = None,
+                autoscaled: bool = False) -> Optional[str]:
+        """
+        Turn a ready pooled container into a worker for `prefix:queue_name` and return its name.
+
+        Returns None when the pool is disabled or has no ready container;
+        callers then start a fresh worker with `run_worker`.
+        """
+        if self.client is None or self.size <= 0:
+            return None
+        name = worker_name(queue_name, prefix, process_file_name)
+        with self.lock:
+            for container in self.idle(ready_only=True):
+                try:
+                    # Renaming takes it out of the pool, for other processes sharing the daemon too
+                    self.client.api.rename(container["Id"], name)
+                except APIError:
+                    continue
+                break
+            else:
+                self._wake()
+                return None
+        try:
+            script = f"exec {worker_command(queue_name, prefix, process_file_name)}"
+            exec_id = self.client.api.exec_create(container["Id"], ["sh", "-c", ASSIGN, "sh", script])
+            self.client.api.exec_start(exec_id)
+        except APIError as e:
+            print(f"Error assigning pooled worker {name}: {e}")
+            self.client.api.remove_container(container["Id"], force=True)
+            self._wake()
+            return None
+        with self.lock:
+            self.assigned[name] = {"queueProps": queue_props, "autoscaled": autoscaled}
+            self._save()
+        self._wake()
+        return name
+
+    async def _fill_loop(self):
+        while True:
+            try:
+                await anyio.to_thread.run_sync(self.fill)
+            except Exception as e:
+                print(f"Error filling worker pool: {e}")
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+
+    def start(self, client):
+        """Bind `client` and, if the pool has a size, start filling it; call from the running event loop."""
+        self.client = client
+        self.loop = asyncio.get_event_loop()
+        if self.wake is None:
+            self.wake = asyncio.Event()
+        if self.task is None and self.size > 0:
+            self.task = self.loop.create_task(self._fill_loop())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def resize(self, size: int):
+        """Change the pool size; call from the event loop. Growing from 0 starts the fill loop."""
+        if size < 0:
+            raise ValueError("Pool size must be 0 or more")
+        self.size = size
+        if self.task is None and size > 0 and self.loop is not None:
+            self.task = self.loop.create_task(self._fill_loop())
+        self._wake()
+
+    def describe(self) -> dict:
+        idle = self.idle() if self.client is not None else []
+        return {
+            "size": self.size,
+            "idle": [{"id": container["Id"], "name": container["Names"][0].lstrip("/"), "created": container["Created"],
+                      "status": container["Status"], "ready": "(healthy)" in container["Status"]} for container in idle],
+            "assigned": len(self.assigned),
+        }
+
+
+worker_pool = WorkerPool()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from bullmq import Queue
+
+DEFAULT_REDIS_URL = "redis://localhost:6379"
+
+
+def split_queue_name(queue_name: str) -> Tuple[str, str]:
+    """`prefix:name` as shown in the UI -> (prefix, name)."""
+    prefix, _, name = queue_name.partition(":")
+    if not name:
+        raise ValueError(f"Queue name must look like prefix:name, got {queue_name}")
+    return prefix, name
+
+
+class QueueRegistry:
+    """
+    Process-wide BullMQ queues, one per (prefix, name, redis URL).
+
+    All queues on the same Redis share one blocking connection pool (with
+    `decode_responses`, which bullmq expects), so a request borrows a
+    connection instead of opening one and loading the lua scripts again.
+    Queues unused for `idle_ttl` seconds are closed by a background sweep.
+    Closing a queue releases only its own client: the shared pool stays open
+    until `close()` on shutdown.
+    """
+
+    def __init__(self, default_url: str = DEFAULT_REDIS_URL, idle_ttl: int = 300, max_connections: int = 50):
+        self.default_url = default_url
+        self.idle_ttl = idle_ttl
+        self.max_connections = max_connections
+        self.pools: Dict[str, redis.BlockingConnectionPool] = {}
+        self.clients: Dict[str, redis.Redis] = {}
+        # (prefix, name, url) -> (queue, last_used)
+        self.queues: Dict[Tuple[str, str, str], List] = {}
+        self.sweeper: Optional[asyncio.Task] = None
+
+    def pool(self, url: Optional[str] = None) -> redis.BlockingConnectionPool:
+        url = url or self.default_url
+        if url not in self.pools:
+            # Blocking: under load requests wait for a free connection instead of failing
+            self.pools[url] = redis.BlockingConnectionPool.from_url(url, decode_responses=True, max_connections=self.max_connections, timeout=10)
+        return self.pools[url]
+
+    def redis(self, url: Optional[str] = None) -> redis.Redis:
+        """Shared client over the pool for raw commands alongside the queues."""
+        url = url or self.default_url
+        if url not in self.clients:
+            self.clients[url] = redis.Redis(connection_pool=self.pool(url))
+        return self.clients[url]
+
+    def get(self, queue_name: str, url: Optional[str] = None) -> Queue:
+        url = url or self.default_url
+        prefix, name = split_queue_name(queue_name)
+        key = (prefix, name, url)
+        entry = self.queues.get(key)
+        if entry is None:
+            queue = Queue(name, {"prefix": prefix, "connection": redis.Redis(connection_pool=self.pool(url))})
+            entry = self.queues[key] = [queue, 0.0]
+        entry[1] = time.monotonic()
+        return entry[0]
+
+    async def sweep(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        for key in [key for key, (_, last_used) in self.queues.items() if last_used < cutoff]:
+            queue, _ = self.queues.pop(key)
+            try:
+                await queue.close()
+            except Exception as e:
+                print(f"Error closing queue {key[0]}:{key[1]}: {e}")
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(max(self.idle_ttl / 4, 5))
+            await self.sweep()
+
+    def start(self):
+        """Start the idle sweep; must be called from the running event loop (app startup)."""
+        if self.sweeper is None:
+            self.sweeper = asyncio.get_event_loop().create_task(self._sweep_loop())
+
+    async def close(self):
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+            self.sweeper = None
+        for queue, _ in list(self.queues.values()):
+            try:
+                await queue.close()
+            except Exception as e:
+                print(f"Error closing queue {queue.name}: {e}")
+        self.queues.clear()
+        for client in self.clients.values():
+            await client.close()
+        self.clients.clear()
+        for pool in self.pools.values():
+            await pool.disconnect()
+        self.pools.clear()
+
+
+queue_registry = QueueRegistry()
+
+
+def get_queue(queue_name: str, all_queue_configs: List[dict]) -> Queue:
+    """Shared queue for `queue_name`, which must be one of the discovered queue configs."""
+    queue_config = next((config for config in all_queue_configs if config["name"] == queue_name), None)
+    if not queue_config:
+        raise ValueError(f"No configuration found for queue: {queue_name}")
+    return queue_registry.get(queue_name, queue_config.get("url"))
@@ -0,0 +1,88 @@
+import json
+import shlex
+import time
+from typing import List, Optional
+
+from .registry import split_queue_name
+
+WORKER_IMAGE = "denoland/deno"
+WORKER_ROOT = "/Users/ai/Documents/node_hooks/explore/bull"
+# Named volume shared by all workers, so dependencies are downloaded and compiled once
+WORKER_CACHE_VOLUME = "deno_worker_cache"
+DENO_DIR = "/deno-dir"
+
+# Same limits for fresh and pooled workers
+WORKER_RESOURCES = {
+    "cpu_shares": 1024,
+    "mem_limit": "512m",
+    "mem_reservation": "256m",
+    "memswap_limit": "768m",
+}
+
+
+def worker_name_prefix(queue_name: str, prefix: str) -> str:
+    return f"deno_{queue_name}_{prefix}_"
+
+
+def worker_name(queue_name: str, prefix: str, process_file_name: str) -> str:
+    # Nanosecond suffix: the autoscaler can start several workers within one second
+    return f"{worker_name_prefix(queue_name, prefix)}{process_file_name}_{time.time_ns()}"
+
+
+def worker_command(queue_name: str, prefix: str, process_file_name: str) -> str:
+    return (f"deno run --allow-all --unstable-worker-options  /worker/worker.ts --queueName={shlex.quote(queue_name)} "
+            f"--prefix={shlex.quote(prefix)} --processFileName={shlex.quote(process_file_name)}")
+
+
+def worker_volumes(process_file_name: Optional[str] = None) -> dict:
+    """Worker mounts; without `process_file_name` every process file is mounted (pooled workers)."""
+    process_path = f"Queues/processList/{process_file_name}" if process_file_name else "Queues/processList"
+    return {
+        WORKER_CACHE_VOLUME: {"bind": DENO_DIR, "mode": "rw"},
+        f"{WORKER_ROOT}/worker.ts": {"bind": "/worker/worker.ts", "mode": "ro"},
+        f"{WORKER_ROOT}/utils": {"bind": "/worker/utils", "mode": "ro"},
+        f"{WORKER_ROOT}/{process_path}": {"bind": f"/worker/{process_path}", "mode": "ro"},
+        f"{WORKER_ROOT}/Queues/index.ts": {"bind": "/worker/Queues/index.ts", "mode": "ro"},
+        f"{WORKER_ROOT}/Queues/queueContext.ts": {"bind": "/worker/Queues/queueContext.ts", "mode": "ro"},
+        f"{WORKER_ROOT}/Queues/type.ts": {"bind": "/worker/Queues/type.ts", "mode": "ro"},
+    }
+
+
+def run_worker(client, queue_name: str, prefix: str, process_file_name: str, queue_props: Optional[dict] = None,
+               labels: Optional[dict] = None) -> str:
+    """Start one Deno worker container for `prefix:queue_name` and return its name."""
+    unique_container_name = worker_name(queue_name, prefix, process_file_name)
+    client.containers.run(
+        WORKER_IMAGE,
+        name=unique_container_name,
+        volumes=worker_volumes(process_file_name),
+        network_mode="host",
+        command=worker_command(queue_name, prefix, process_file_name),
+        environment={"DENO_DIR": DENO_DIR},
+        detach=True,
+        **WORKER_RESOURCES,
+        labels={
+            "queueProps": json.dumps(queue_props),
+            **(labels or {}),
+        },
+    )
+    return unique_container_name
+
+
+def list_workers(client, full_queue_name: str, running_only: bool = True) -> List[dict]:
+    """Worker containers of `prefix:name`, oldest first, from one filtered listing."""
+    prefix, queue_name = split_queue_name(full_queue_name)
+    name_prefix = worker_name_prefix(queue_name, prefix)
+    filters = {"name": name_prefix}
+    if running_only:
+        filters["status"] = "running"
+    containers = client.api.containers(filters=filters, all=not running_only)
+    # The name filter is a substring match; keep exact prefixes only
+    workers = [container for container in containers if container["Names"][0].lstrip("/").startswith(name_prefix)]
+    return sorted(workers, key=lambda container: container["Created"])
+
+
+def stop_worker(client, container_id: str, timeout: int = 30):
+    """Stop (SIGTERM, then SIGKILL after `timeout`) and remove a worker."""
+    client.api.stop(container_id, timeout=timeout)
+    client.api.remove_container(container_id)
@@ -0,0 +1,7 @@
+from .client import UpstreamClient, upstream, TARGET_URL
+from .cache import ResponseCache, response_cache
+from .proxy import proxy
+from .blob_store import BlobStore
+from .registry import add_registry_routes, get_blob_store, registry_upstream
+
+__all__ = ['UpstreamClient', 'upstream', 'TARGET_URL', 'ResponseCache', 'response_cache', 'proxy', 'BlobStore', 'add_registry_routes', 'get_blob_store', 'registry_upstream']
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Optional
+
+
+class DigestMismatch(Exception):
+    pass
+
+
+class BlobWriter:
+    """Streams a blob into a temp file, hashing it as it goes; `commit` verifies and publishes it."""
+
+    def __init__(self, store: "BlobStore", digest: str):
+        self.store = store
+        self.digest = digest
+        self.hash = hashlib.sha256()
+        self.size = 0
+        fd, self.temp_path = tempfile.mkstemp(dir=store.temp_folder)
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        self.file.write(chunk)
+
+    def commit(self, meta: Optional[dict] = None) -> str:
+        self.file.close()
+        actual = f"sha256:{self.hash.hexdigest()}"
+        if actual != self.digest:
+            os.remove(self.temp_path)
+            raise DigestMismatch(f"Expected {self.digest}, got {actual}")
+        return self.store._publish(self.digest, self.temp_path, self.size, meta)
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class BlobStore:
+    """
+    Content-addressed on-disk store for registry blobs and manifests.
+
+    Blobs live at `<base>/blobs/sha256/<hex>` and are only published after
+    their sha256 matches the digest they were requested by, so a truncated
+    or corrupted download is never served. The total size is kept under
+    `max_size` bytes by evicting the least recently used blobs.
+    """
+
+    def __init__(self, base_folder: str, max_size: int = 20 * 1024 ** 3):
+        self.base_folder = base_folder
+        self.blob_folder = os.path.join(base_folder, "blobs", "sha256")
+        self.temp_folder = os.path.join(base_folder, "tmp")
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        # digest -> size, least recently used first
+        self.index: "OrderedDict[str, int]" = OrderedDict()
+        self.size = 0
+        os.makedirs(self.blob_folder, exist_ok=True)
+        os.makedirs(self.temp_folder, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuild the LRU index from disk, oldest access first."""
+        entries = []
+        for name in os.listdir(self.blob_folder):
+            if name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.blob_folder, name))
+            entries.append((stat.st_atime, f"sha256:{name}", stat.st_size))
+        for _, digest, size in sorted(entries):
+            self.index[digest] = size
+            self.size += size
+        # Leftovers from downloads interrupted by a restart
+        for name in os.listdir(self.temp_folder):
+            os.remove(os.path.join(self.temp_folder, name))
+
+    @staticmethod
+    def valid_digest(digest: str) -> bool:
+        algorithm, _, hex_digest = digest.partition(":")
+        return algorithm == "sha256" and len(hex_digest) == 64 and all(c in "0123456789abcdef" for c in hex_digest)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.blob_folder, digest.split(":", 1)[1])
+
+    def has(self, digest: str) -> bool:
+        with self.lock:
+            return digest in self.index
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        """
+        Open a cached blob for reading and mark it recently used, or return None if it is not cached.
+
+        The open file keeps the data readable even if the blob is evicted
+        while it is being served.
+        """
+        with self.lock:
+            if digest not in self.index:
+                return None
+            self.index.move_to_end(digest)
+        path = self.path(digest)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # Removed behind the store's back; forget it so it is fetched again
+            with self.lock:
+                size = self.index.pop(digest, None)
+                if size is not None:
+                    self.size -= size
+            return None
+        now = time.time()
+        try:
+            os.utime(path, (now, os.stat(path).st_mtime))
+        except FileNotFoundError:
+            pass
+        return f
+
+    def meta(self, digest: str) -> dict:
+        try:
+            with open(self.path(digest) + ".json") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def writer(self, digest: str) -> BlobWriter:
+        return BlobWriter(self, digest)
+
+    def put(self, digest: str, content: bytes, meta: Optional[dict] = None) -> str:
+        writer = self.writer(digest)
+        writer.write(content)
+        return writer.commit(meta)
+
+    def _publish(self, digest: str, temp_path: str, size: int, meta: Optional[dict]) -> str:
+        path = self.path(digest)
+        if meta:
+            with open(path + ".json", "w") as f:
+                json.dump(meta, f)
+        os.replace(temp_path, path)
+        with self.lock:
+            if digest in self.index:
+                self.size -= self.index[digest]
+            self.index[digest] = size
+            self.size += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self.size > self.max_size and len(self.index) > 1:
+            digest, size = self.index.popitem(last=False)
+            self.size -= size
+            for path in (self.path(digest), self.path(digest) + ".json"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"blobs": len(self.index), "size": self.size, "maxSize": self.max_size}
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Response headers worth replaying from a cached entry
+CACHED_HEADERS = ("content-type", "content-encoding", "cache-control", "etag", "last-modified", "docker-content-digest", "vary")
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+class CacheEntry:
+    def __init__(self, status_code: int, headers: Dict[str, str], body: bytes, expires_at: float):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        validators = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+
+class ResponseCache:
+    """
+    LRU cache of upstream responses with TTLs taken from `Cache-Control`.
+
+    Responses without caching headers are kept for `default_ttl` seconds.
+    Stale entries are kept so they can be revalidated with their ETag or
+    Last-Modified instead of being downloaded again. Entries are keyed by
+    the caller's credentials as well, so a response fetched with one token
+    is never served to another caller, and `private` responses are not
+    stored at all.
+    """
+
+    def __init__(self, max_entries: int = 512, max_body_size: int = 1024 * 1024, default_ttl: int = 30):
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    @staticmethod
+    def key(path: str, query_params, authorization: Optional[str] = None) -> str:
+        key = f"{path}?{'&'.join(f'{k}={v}' for k, v in sorted(query_params.multi_items()))}"
+        if authorization:
+            # Hashed so tokens are not kept in memory as cache keys
+            key += f"#{hashlib.sha256(authorization.encode()).hexdigest()}"
+        return key
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def ttl(self, headers) -> Optional[int]:
+        """Seconds a response may be served from cache, or None if it must not be stored."""
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives or "private" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0  # Store, but revalidate before every use
+        for directive in ("s-maxage", "max-age"):
+            if directives.get(directive):
+                try:
+                    return int(directives[directive])
+                except ValueError:
+                    pass
+        return self.default_ttl
+
+    def store(self, key: str, status_code: int, headers, body: bytes) -> Optional[CacheEntry]:
+        ttl = self.ttl(headers)
+        if status_code != 200 or ttl is None or len(body) > self.max_body_size:
+            return None
+        entry = CacheEntry(
+            status_code,
+            {name: headers[name] for name in CACHED_HEADERS if name in headers},
+            body,
+            time.time() + ttl,
+        )
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def revalidated(self, entry: CacheEntry, headers) -> CacheEntry:
+        """Extend a stale entry after the upstream answered 304 Not Modified."""
+        ttl = self.ttl(headers)
+        entry.expires_at = time.time() + (ttl or 0)
+        for name in CACHED_HEADERS:
+            if name in headers:
+                entry.headers[name] = headers[name]
+        return entry
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,44 @@
+import importlib.util
+from typing import Optional
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package; fall back to pooled HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+TARGET_URL = "https://registry.hub.docker.com"
+
+
+class UpstreamClient:
+    """
+    Long-lived pooled client for the Docker Hub registry.
+
+    One client is shared by every proxied request, so DNS, TCP and TLS setup
+    happen once per pooled connection instead of once per request.
+    """
+
+    def __init__(self, base_url: str = TARGET_URL, max_connections: int = 20, keepalive_expiry: float = 60.0, timeout: float = 30.0):
+        self.base_url = base_url
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=keepalive_expiry)
+        self.timeout = httpx.Timeout(timeout)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def get(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use."""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        return self.client
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+upstream = UpstreamClient()
@@ -0,0 +1,100 @@
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from .cache import response_cache
+from .client import upstream
+
+# Request headers forwarded to the registry
+FORWARDED_REQUEST_HEADERS = ("accept", "accept-encoding", "authorization", "range")
+
+# Hop-by-hop headers that describe the upstream connection, not the payload
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def response_headers(headers) -> dict:
+    return {name: value for name, value in headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    if not encoding or encoding == "identity":
+        return True
+    accepted = [part.split(";")[0].strip().lower() for part in request.headers.get("accept-encoding", "").split(",")]
+    return encoding.lower() in accepted or "*" in accepted
+
+
+async def proxy(path: str, request: Request):
+    """
+    Proxy the GET request to Docker Hub registry without modifying the headers or body.
+
+    Upstream bytes are forwarded as they arrive, still in their original
+    content encoding, so memory use does not grow with the response size.
+    Small cacheable responses are copied into the response cache on the
+    way through and served from memory while fresh.
+    """
+    key = response_cache.key(path, request.query_params, request.headers.get("authorization"))
+    entry = response_cache.get(key)
+    if entry is not None and not accepts_encoding(request, entry.headers.get("content-encoding")):
+        entry = None
+
+    if entry is not None and entry.fresh:
+        return Response(entry.body, status_code=entry.status_code, headers={**entry.headers, "X-Cache": "HIT"})
+
+    headers = {name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers}
+    if entry is not None and "range" not in headers:
+        headers.update(entry.validators())
+
+    client = upstream.get()
+    upstream_request = client.build_request("GET", f"/{path}", params=request.query_params, headers=headers)
+    upstream_response = await client.send(upstream_request, stream=True)
+
+    if upstream_response.status_code == 304 and entry is not None:
+        await upstream_response.aclose()
+        entry = response_cache.revalidated(entry, upstream_response.headers)
+        return Response(entry.body, status_code=entry.status_code, headers={**entry.headers, "X-Cache": "REVALIDATED"})
+
+    content_length = int(upstream_response.headers.get("content-length") or 0)
+    cacheable = (
+        upstream_response.status_code == 200
+        and "range" not in headers
+        and content_length <= response_cache.max_body_size
+        and response_cache.ttl(upstream_response.headers) is not None
+    )
+
+    async def body():
+        chunks = []
+        size = 0
+        keep = cacheable
+        try:
+            # aiter_raw keeps the upstream content encoding instead of decompressing
+            async for chunk in upstream_response.aiter_raw():
+                if keep:
+                    size += len(chunk)
+                    if size > response_cache.max_body_size:
+                        keep = False
+                        chunks = []
+                    else:
+                        chunks.append(chunk)
+                yield chunk
+            if keep:
+                response_cache.store(key, upstream_response.status_code, upstream_response.headers, b"".join(chunks))
+        finally:
+            # Runs on completion and when the client disconnects mid-stream,
+            # which drops the upstream connection as well
+            await upstream_response.aclose()
+
+    return StreamingResponse(
+        body(),
+        status_code=upstream_response.status_code,
+        headers={**response_headers(upstream_response.headers), "X-Cache": "MISS"},
+        background=BackgroundTask(upstream_response.aclose),
+    )
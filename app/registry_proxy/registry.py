@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import time
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import anyio
+import httpx
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .blob_store import BlobStore, DigestMismatch
+from .client import UpstreamClient
+
+REGISTRY_URL = os.environ.get("REGISTRY_UPSTREAM_URL", "https://registry-1.docker.io")
+REGISTRY_CACHE_DIR = os.environ.get("REGISTRY_CACHE_DIR", os.path.join(os.getcwd(), "registry_cache"))
+MANIFEST_TAG_TTL = 60  # seconds a tag -> digest resolution is trusted
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_MANIFEST_ACCEPT = ", ".join([
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+])
+
+registry_upstream = UpstreamClient(REGISTRY_URL, timeout=300.0)
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store, created (with its folders) on the first registry request."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore(REGISTRY_CACHE_DIR)
+    return _blob_store
+
+
+class TokenCache:
+    """Anonymous bearer tokens for the upstream registry, cached per scope until they expire."""
+
+    def __init__(self):
+        self.tokens: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def parse_challenge(header: str) -> Dict[str, str]:
+        return dict(re.findall(r'(\w+)="([^"]*)"', header))
+
+    def get(self, scope: str) -> Optional[str]:
+        token = self.tokens.get(scope)
+        if token and token[1] > time.time():
+            return token[0]
+        return None
+
+    async def fetch(self, client: httpx.AsyncClient, challenge: str) -> Optional[str]:
+        params = self.parse_challenge(challenge)
+        if "realm" not in params:
+            return None
+        response = await client.get(params["realm"], params={k: v for k, v in params.items() if k in ("service", "scope")})
+        response.raise_for_status()
+        data = response.json()
+        token = data.get("token") or data.get("access_token")
+        # Refresh a little early so a token never expires mid-request
+        self.tokens[params.get("scope", "")] = (token, time.time() + data.get("expires_in", 60) - 10)
+        return token
+
+
+tokens = TokenCache()
+
+
+async def upstream_send(method: str, path: str, scope: str, headers: Dict[str, str], stream: bool = False) -> httpx.Response:
+    """Send a request to the upstream registry, authenticating once if challenged."""
+    client = registry_upstream.get()
+    token = tokens.get(scope)
+    for attempt in range(2):
+        request_headers = dict(headers)
+        if token:
+            request_headers["Authorization"] = f"Bearer {token}"
+        response = await client.send(client.build_request(method, path, headers=request_headers), stream=stream)
+        challenge = response.headers.get("www-authenticate", "")
+        if response.status_code != 401 or attempt or not challenge.lower().startswith("bearer"):
+            return response
+        await response.aclose()
+        token = await tokens.fetch(client, challenge)
+    return response
+
+
+class BlobResponse(Response):
+    """
+    Serves a cached blob from disk, honouring a single-range `Range` header.
+
+    The file is opened by the store before the headers are built, so a
+    blob evicted meanwhile is still served in full. When the ASGI server
+    offers the `http.response.zerocopysend` extension the file descriptor
+    is handed over for sendfile; otherwise the file is read in fixed-size
+    chunks off the event loop.
+    """
+
+    def __init__(self, file: BinaryIO, request: Request, headers: Dict[str, str], send_body: bool = True):
+        self.file = file
+        self.send_body = send_body
+        self.file_size = os.fstat(file.fileno()).st_size
+        self.offset, self.count = 0, self.file_size
+        status_code = 200
+        headers = {**headers, "Accept-Ranges": "bytes"}
+
+        byte_range = self.parse_range(request.headers.get("range"), self.file_size)
+        if byte_range == "invalid":
+            status_code = 416
+            self.count = 0
+            headers["Content-Range"] = f"bytes */{self.file_size}"
+        elif byte_range is not None:
+            status_code = 206
+            self.offset, end = byte_range
+            self.count = end - self.offset + 1
+            headers["Content-Range"] = f"bytes {self.offset}-{end}/{self.file_size}"
+
+        super().__init__(status_code=status_code, headers=headers)
+        self.headers["content-length"] = str(self.count)
+
+    @staticmethod
+    def parse_range(header: Optional[str], size: int):
+        if not header or not header.startswith("bytes=") or "," in header:
+            return None
+        start, _, end = header[len("bytes="):].strip().partition("-")
+        try:
+            if start == "":
+                # Suffix range: the last N bytes
+                first, last = max(size - int(end), 0), size - 1
+            else:
+                first, last = int(start), int(end) if end else size - 1
+        except ValueError:
+            return None
+        if first >= size or first > last:
+            return "invalid"
+        return first, min(last, size - 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        with self.file as f:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if not self.send_body or self.count == 0:
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopysend", "file": f.fileno(), "offset": self.offset, "count": self.count})
+                return
+            f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+
+def registry_headers(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    return {"Docker-Distribution-API-Version": "registry/2.0", **(extra or {})}
+
+
+async def registry_base(request: Request):
+    """`GET /v2/` version check, which lets a Docker daemon use this server as a registry mirror."""
+    return JSONResponse({}, headers=registry_headers())
+
+
+# (name, reference, accept) -> (digest, expires_at)
+manifest_tags: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+
+
+def manifest_response(request: Request, digest: str, cache_status: str) -> Optional[Response]:
+    """Serve a stored manifest, or None if it was evicted meanwhile."""
+    blob_store = get_blob_store()
+    file = blob_store.open(digest)
+    if file is None:
+        return None
+    meta = blob_store.meta(digest)
+    return BlobResponse(
+        file,
+        request,
+        registry_headers({
+            "Content-Type": meta.get("mediaType", "application/vnd.docker.distribution.manifest.v2+json"),
+            "Docker-Content-Digest": digest,
+            "X-Cache": cache_status,
+        }),
+        send_body=request.method != "HEAD",
+    )
+
+
+async def manifests(name: str, reference: str, request: Request):
+    """Serve a manifest by digest from the store, resolving tags upstream at most once per TTL."""
+    accept = request.headers.get("accept", DEFAULT_MANIFEST_ACCEPT)
+    blob_store = get_blob_store()
+    by_digest = blob_store.valid_digest(reference)
+    digest = reference if by_digest else None
+    if not by_digest:
+        resolved = manifest_tags.get((name, reference, accept))
+        if resolved and resolved[1] > time.time():
+            digest = resolved[0]
+
+    if digest:
+        cached = manifest_response(request, digest, "HIT")
+        if cached is not None:
+            return cached
+
+    # The last known manifest for a tag is served if the upstream is unavailable
+    stale = manifest_tags.get((name, reference, accept))
+    try:
+        response = await upstream_send("GET", f"/v2/{name}/manifests/{reference}", f"repository:{name}:pull", {"Accept": accept})
+    except httpx.TransportError as e:
+        cached = manifest_response(request, stale[0], "STALE") if stale else None
+        if cached is not None:
+            return cached
+        return JSONResponse({"errors": [{"code": "UNAVAILABLE", "message": f"Upstream registry unreachable: {e}"}]}, status_code=502,
+                            headers=registry_headers())
+    if response.status_code != 200:
+        if stale and response.status_code >= 500:
+            cached = manifest_response(request, stale[0], "STALE")
+            if cached is not None:
+                return cached
+        return Response(response.content, status_code=response.status_code, headers=registry_headers({"Content-Type": response.headers.get("content-type", "application/json")}))
+
+    content = response.content
+    digest = f"sha256:{hashlib.sha256(content).hexdigest()}"
+    if by_digest and digest != reference:
+        return JSONResponse({"errors": [{"code": "DIGEST_INVALID", "message": f"Upstream manifest does not match {reference}"}]}, status_code=502)
+    media_type = response.headers.get("content-type")
+    await anyio.to_thread.run_sync(blob_store.put, digest, content, {"mediaType": media_type})
+    if not by_digest:
+        manifest_tags[(name, reference, accept)] = (digest, time.time() + MANIFEST_TAG_TTL)
+    served = manifest_response(request, digest, "MISS")
+    if served is None:
+        # Evicted straight away (a tiny cache); answer from memory
+        headers = registry_headers({"Content-Type": media_type or "application/vnd.docker.distribution.manifest.v2+json",
+                                    "Docker-Content-Digest": digest, "X-Cache": "MISS"})
+        return Response(content if request.method != "HEAD" else b"", headers={**headers, "Content-Length": str(len(content))})
+    return served
+
+
+async def blobs(name: str, digest: str, request: Request):
+    """Serve a blob from the store, or stream it from upstream while verifying and storing it."""
+    if not BlobStore.valid_digest(digest):
+        return JSONResponse({"errors": [{"code": "DIGEST_INVALID", "message": f"Unsupported digest {digest}"}]}, status_code=400)
+
+    blob_store = get_blob_store()
+    file = blob_store.open(digest)
+    if file is not None:
+        return BlobResponse(file, request, registry_headers({"Content-Type": "application/octet-stream", "Docker-Content-Digest": digest, "X-Cache": "HIT"}), send_body=request.method != "HEAD")
+
+    # Blobs are already compressed; asking for identity keeps the bytes hashable as-is
+    headers = {"Accept-Encoding": "identity"}
+    if "range" in request.headers:
+        # Partial fetches cannot be verified, so they are passed through uncached
+        headers["Range"] = request.headers["range"]
+    response = await upstream_send(request.method, f"/v2/{name}/blobs/{digest}", f"repository:{name}:pull", headers, stream=True)
+    passthrough_headers = {name: value for name, value in response.headers.items() if name.lower() in ("content-type", "content-length", "content-range", "accept-ranges", "docker-content-digest")}
+
+    if response.status_code != 200 or request.method == "HEAD" or "Range" in headers:
+        async def passthrough():
+            try:
+                if request.method != "HEAD":
+                    async for chunk in response.aiter_raw():
+                        yield chunk
+            finally:
+                await response.aclose()
+
+        return StreamingResponse(passthrough(), status_code=response.status_code, headers=registry_headers({**passthrough_headers, "X-Cache": "BYPASS"}))
+
+    async def body():
+        # Disk writes happen in worker threads so a slow disk never stalls the event loop
+        writer = await anyio.to_thread.run_sync(blob_store.writer, digest)
+        committed = False
+        try:
+            async for chunk in response.aiter_bytes():
+                await anyio.to_thread.run_sync(writer.write, chunk)
+                yield chunk
+            try:
+                await anyio.to_thread.run_sync(writer.commit)
+                committed = True
+            except DigestMismatch as e:
+                print(f"Discarding blob {digest}: {e}")
+        finally:
+            if not committed:
+                await anyio.to_thread.run_sync(writer.abort)
+            await response.aclose()
+
+    return StreamingResponse(body(), status_code=200, headers=registry_headers({**passthrough_headers, "X-Cache": "MISS"}))
+
+
+def add_registry_routes(app):
+    app.add_api_route("/v2/", methods=["GET"], endpoint=registry_base)
+    app.add_api_route("/v2/{name:path}/manifests/{reference}", methods=["GET", "HEAD"], endpoint=manifests)
+    app.add_api_route("/v2/{name:path}/blobs/{digest}", methods=["GET", "HEAD"], endpoint=blobs)
+
+
+_blob_store: Optional[BlobStore] = None
@@ -0,0 +1,65 @@
+import posixpath
+from urllib.parse import quote
+import docker
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Literal, Optional
+from app.docker_client import clientContext
+from app.docker_client.archive_transfer import COMPRESSIONS, abort_response, compressed_chunks, compressor, iterate_blocking, open_archive, put_archive_from_stream
+from app.docker_client.fs_browser import docker_stat
+
+client = clientContext.client
+
+async def GET(request: Request, container_id: str, path: str = "/", compression: Literal["none", "gzip", "zstd"] = "none"):
+    """
+    Download a file or directory from a container as a tar stream.
+
+    The archive is relayed chunk by chunk from the daemon (optionally
+    compressed on the fly), so memory use does not grow with its size.
+    """
+    try:
+        compressor(compression)
+        response = open_archive(client, container_id, path)
+    except docker.errors.NotFound as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {e.explanation}"})
+    except (docker.errors.APIError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {e}"})
+
+    try:
+        name = docker_stat(response.headers.get("x-docker-container-path-stat")).get("name")
+    except (FileNotFoundError, ValueError):
+        name = None
+    filename = (name or posixpath.basename(path.rstrip("/")) or "root") + COMPRESSIONS[compression][1]
+    # Plain ASCII for old clients, the exact UTF-8 name as RFC 5987 filename*
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace('"', "_").replace("\\", "_")
+    return StreamingResponse(
+        iterate_blocking(compressed_chunks(response, compression), on_close=lambda: abort_response(client, response)),
+        media_type=COMPRESSIONS[compression][0],
+        headers={
+            "Content-Disposition": f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+async def PUT(request: Request, container_id: str, path: str = "/", filename: Optional[str] = None):
+    """
+    Upload into a container directory, streaming the request body to the daemon.
+
+    The body is a tar archive (plain, gzip, bzip2, xz or zstd; the daemon
+    detects the compression), or with `filename` the raw bytes of a single
+    file, which then needs a Content-Length.
+    """
+    size = None
+    if filename:
+        if posixpath.basename(filename) != filename or filename in (".", ".."):
+            return JSONResponse(status_code=400, content={"message": "filename must be a plain file name"})
+        if not request.headers.get("content-length", "").isdigit():
+            return JSONResponse(status_code=411, content={"message": "Content-Length is required when uploading a single file"})
+        size = int(request.headers["content-length"])
+    try:
+        await put_archive_from_stream(client, container_id, path, request.stream(), filename=filename, size=size)
+    except docker.errors.NotFound as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {e.explanation}"})
+    except (docker.errors.APIError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {e}"})
+    return {"error": False, "message": f"Uploaded to {path}"}
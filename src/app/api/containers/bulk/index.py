@@ -0,0 +1,63 @@
+import json
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from app.docker_client import clientContext
+from app.docker_client.bulk_actions import resolve_targets, run_bulk, update_body
+
+client = clientContext.client
+
+class UpdateDockerConfig(BaseModel):
+    cpuShares: str = ""
+    memory: str = ""
+    memoryReservation: str = ""
+    memorySwap: str = ""
+
+class BulkContainerAction(BaseModel):
+    action: Literal["start", "stop", "restart", "pause", "unpause", "kill", "remove", "update"]
+    containerIds: List[str] = []
+    # Filters, applied by the daemon: "key" or "key=value" labels, a name substring and a status
+    labels: List[str] = []
+    name: Optional[str] = None
+    status: Optional[str] = None
+    parallelism: int = 8
+    timeout: float = 30  # seconds per container
+    stopTimeout: int = 10
+    force: bool = False
+    signal: str = "SIGKILL"
+    updateInstanceConfig: Optional[UpdateDockerConfig] = None
+
+async def POST(request: Request, body: BulkContainerAction):
+    """
+    Run one action on many containers, selected by ID and/or filter.
+
+    Streams one NDJSON line per container as soon as it finishes, then a
+    `summary` line with the totals.
+    """
+    if not body.containerIds and not (body.labels or body.name or body.status):
+        return JSONResponse(status_code=400, content={"message": "Pass containerIds or at least one filter (labels, name, status)"})
+    if body.action == "update" and not body.updateInstanceConfig:
+        return JSONResponse(status_code=400, content={"message": "updateInstanceConfig is required for update"})
+
+    try:
+        targets = resolve_targets(client, body.containerIds, body.labels, name=body.name, status=body.status)
+        update = update_body(body.updateInstanceConfig.dict()) if body.updateInstanceConfig else None
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": f"Error: {str(e)}"})
+
+    async def results():
+        async for result in run_bulk(
+            client,
+            body.action,
+            targets,
+            parallelism=min(max(body.parallelism, 1), 32),
+            timeout=body.timeout,
+            stop_timeout=body.stopTimeout,
+            force=body.force,
+            signal=body.signal,
+            update=update,
+        ):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
@@ -0,0 +1,14 @@
+import docker
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.docker_client.fs_browser import get_fs_browser
+
+fs_browser = get_fs_browser()
+
+async def GET(request: Request, container_id: str, path: str = "/", offset: int = 0, limit: int = 200):
+    try:
+        return fs_browser.list(container_id, path, offset=offset, limit=min(limit, 1000))
+    except docker.errors.NotFound as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {e.explanation}"})
+    except (NotADirectoryError, ValueError, FileNotFoundError) as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {e}"})
@@ -1,11 +1,14 @@
+import anyio
 from fastapi import Request, APIRouter
 from pydantic import BaseModel
 from typing import Optional,Literal,List, Dict,Any
 from enum import Enum
 from fastapi.responses import JSONResponse
 from app.docker_client import clientContext
+from app.docker_client.fs_browser import get_fs_browser
 
 client = clientContext.client
+fs_browser = get_fs_browser()
 
 class HostConfig(BaseModel):
     CpuShares: Optional[int]
@@ -48,6 +51,8 @@ class ActionTypeEnum(str, Enum):
 class DockerRequest(BaseModel):
     command: str = ''
     directory: str = '/'
+    offset: int = 0
+    limit: int = 200
 
 class HealthCheck(BaseModel):
     test: List[str] = []  # Default to empty list if not provided
@@ -244,27 +249,21 @@ async def POST(request:Request,body: RunContainer):
             return {"logs": logs}
 
         elif actionType == ActionTypeEnum.FILES:
-            container = client.containers.get(body.containerId)
             if not body.dir:
                 return {"message": "Directory path is required"}
             
-            # Execute ls command in the container
-            exec_command = container.exec_run(f"ls -la {body.dir.directory}")
-            files = exec_command.output.decode('utf-8')
-            if "exec failed" in files:
-                return JSONResponse(
-                    status_code=500,
-                    content={"message": f"Error: {str(files)}"}
-                )
-            return {"files": files}
+            # One level of structured entries, without shell parsing of ls output
+            listing = fs_browser.list(body.containerId, body.dir.directory, offset=body.dir.offset, limit=body.dir.limit)
+            return {"files": listing["entries"], "total": listing["total"], "path": listing["path"], "truncated": listing["truncated"]}
 
         elif actionType == ActionTypeEnum.COMMAND:
             container = client.containers.get(body.containerId)
             if not body.dir or not body.dir.command:
                 return {"message": "Command is required"}
             
-            # Execute the specified command in the container
-            exec_command = container.exec_run(body.dir.command)
+            # Execute the specified command in the container; interactive
+            # sessions use the /api/containers/exec/{id} WebSocket instead
+            exec_command = await anyio.to_thread.run_sync(container.exec_run, body.dir.command)
             output = exec_command.output.decode('utf-8')
             if "exec failed" in output:
                 return JSONResponse(
@@ -0,0 +1,54 @@
+import re
+import docker
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Literal, Optional
+from app.docker_client import clientContext
+from app.docker_client.log_stream import LogStream, LineFilter, parse_time
+
+client = clientContext.client
+
+async def GET(
+    request: Request,
+    container_id: str,
+    follow: bool = False,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    tail: str = "100",
+    filter: Optional[str] = None,
+    regex: bool = False,
+    ignore_case: bool = False,
+    stdout: bool = True,
+    stderr: bool = True,
+    timestamps: bool = False,
+    format: Literal["text", "ndjson"] = "text",
+):
+    """
+    Stream a container's logs.
+
+    `since`/`until` take a unix timestamp or a relative duration (`30s`, `15m`, `2h`).
+    `filter` is matched against every line as it streams, as a substring or, with `regex=true`, a regular expression.
+    """
+    try:
+        log_stream = LogStream(
+            client,
+            container_id,
+            follow=follow,
+            since=parse_time(since),
+            until=parse_time(until),
+            tail=int(tail) if tail.isdigit() else "all",
+            stdout=stdout,
+            stderr=stderr,
+            timestamps=timestamps,
+            line_filter=LineFilter(filter, regex=regex, ignore_case=ignore_case),
+        )
+    except docker.errors.NotFound:
+        return JSONResponse(status_code=404, content={"message": f"Container {container_id} not found"})
+    except (ValueError, re.error) as e:
+        return JSONResponse(status_code=400, content={"message": f"Invalid parameter: {e}"})
+
+    return StreamingResponse(
+        log_stream.iter_encoded(format),
+        media_type="application/x-ndjson" if format == "ndjson" else "text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
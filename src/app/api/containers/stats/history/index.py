@@ -0,0 +1,27 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from typing import Optional
+from app.docker_client.stats_history import get_stats_history
+
+stats_history = get_stats_history()
+
+async def GET(request: Request, container_id: Optional[str] = None, window: int = 300, resolution: Optional[str] = None, series: bool = False):
+    # The sampler is started on app startup; this covers routes loaded without it
+    stats_history.start()
+    try:
+        if container_id:
+            history = stats_history.query(container_id, window=window, resolution=resolution, include_series=series)
+            if history is None:
+                return JSONResponse(
+                    status_code=404,
+                    content={"message": f"No stats history recorded for container {container_id}"}
+                )
+            return {"history": history}
+
+        histories = [
+            stats_history.query(container["id"], window=window, resolution=resolution, include_series=series)
+            for container in stats_history.containers()
+        ]
+        return {"history": [history for history in histories if history is not None]}
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
@@ -0,0 +1,49 @@
+import anyio
+import docker
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.docker_client.archive_transfer import UploadOffsetMismatch, get_upload_store
+
+upload_store = get_upload_store()
+
+def not_found(upload_id: str):
+    return JSONResponse(status_code=404, content={"message": f"Upload {upload_id} not found"})
+
+async def GET(request: Request, upload_id: str):
+    session = upload_store.get(upload_id)
+    if session is None:
+        return not_found(upload_id)
+    return session.to_dict()
+
+async def PUT(request: Request, upload_id: str, offset: int = 0):
+    """Append the request body at `offset`; a mismatch returns 409 with the offset to resume from."""
+    session = upload_store.get(upload_id)
+    if session is None:
+        return not_found(upload_id)
+    try:
+        new_offset = await upload_store.append(session, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        return JSONResponse(status_code=409, content={"message": f"Error: {e}", "offset": e.offset})
+    return {"id": session.id, "offset": new_offset}
+
+async def POST(request: Request, upload_id: str):
+    """Write the completed upload into the container."""
+    session = upload_store.get(upload_id)
+    if session is None:
+        return not_found(upload_id)
+    try:
+        await anyio.to_thread.run_sync(upload_store.commit, session)
+    except UploadOffsetMismatch as e:
+        return JSONResponse(status_code=409, content={"message": f"Upload incomplete at {e.offset} of {session.size} bytes", "offset": e.offset})
+    except docker.errors.NotFound as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {e.explanation}"})
+    except (docker.errors.APIError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {e}"})
+    return {"error": False, "message": f"Uploaded to {session.path}"}
+
+async def DELETE(request: Request, upload_id: str):
+    session = upload_store.get(upload_id)
+    if session is None:
+        return not_found(upload_id)
+    upload_store.abort(session)
+    return {"error": False, "message": f"Upload {upload_id} discarded"}
@@ -0,0 +1,30 @@
+import docker
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Optional
+from app.docker_client.archive_transfer import get_upload_store
+
+upload_store = get_upload_store()
+
+class CreateUpload(BaseModel):
+    container_id: str
+    path: str = "/"
+    filename: Optional[str] = None
+    size: Optional[int] = None
+
+async def POST(request: Request, body: CreateUpload):
+    """
+    Start a resumable upload.
+
+    Send chunks with `PUT /api/containers/uploads/{id}?offset=N`, ask for the
+    current offset with GET after a dropped connection, and POST to write the
+    upload into the container.
+    """
+    try:
+        session = upload_store.create(body.container_id, body.path, filename=body.filename, size=body.size)
+    except docker.errors.NotFound as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {e.explanation}"})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {e}"})
+    return session.to_dict()
@@ -0,0 +1,19 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from typing import Optional
+import anyio
+from app.docker_client.hosts import LISTERS, get_host_registry, merged_list
+
+host_registry = get_host_registry()
+
+async def GET(request: Request, resource: str, hosts: Optional[str] = None, timeout: float = 5):
+    """
+    List containers, images, volumes or networks across hosts, each item tagged with its `Host`.
+
+    `hosts` is a comma separated subset of host names. Hosts that fail or do
+    not answer within `timeout` seconds are listed under `errors`.
+    """
+    if resource not in LISTERS:
+        return JSONResponse(status_code=404, content={"message": f"Unknown resource {resource}. Use one of {', '.join(LISTERS)}."})
+    names = [name.strip() for name in hosts.split(",")] if hosts else None
+    return await anyio.to_thread.run_sync(lambda: merged_list(host_registry, resource, names=names, timeout=min(timeout, 30)))
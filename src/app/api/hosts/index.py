@@ -0,0 +1,47 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Optional
+from app.docker_client.hosts import get_host_registry
+
+host_registry = get_host_registry()
+
+class TlsConfig(BaseModel):
+    ca: Optional[str] = None
+    cert: Optional[str] = None
+    key: Optional[str] = None
+    verify: bool = True
+
+class AddHost(BaseModel):
+    name: str
+    url: str  # unix:///var/run/docker.sock, tcp://host:2376 or ssh://user@host
+    tls: Optional[TlsConfig] = None
+    max_pool_size: int = 10
+    timeout: int = 60
+    use_ssh_client: bool = False
+
+async def GET(request: Request):
+    return {"hosts": host_registry.list()}
+
+async def POST(request: Request, body: AddHost):
+    try:
+        host = host_registry.add(
+            body.name,
+            body.url,
+            tls=body.tls.dict() if body.tls else None,
+            max_pool_size=body.max_pool_size,
+            timeout=body.timeout,
+            use_ssh_client=body.use_ssh_client,
+        )
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {str(e)}"})
+    return {"error": False, "message": f"Host {body.name} added", "host": host.to_dict()}
+
+async def DELETE(request: Request, name: str):
+    try:
+        host_registry.remove(name)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"message": f"Host {name} not found"})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {str(e)}"})
+    return {"error": False, "message": f"Host {name} removed"}
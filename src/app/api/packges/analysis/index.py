@@ -0,0 +1,20 @@
+from fastapi import Request
+from typing import Optional
+from app.docker_client import clientContext
+from app.docker_client.image_analysis import get_image_analyzer
+
+client = clientContext.client
+image_analyzer = get_image_analyzer()
+
+async def GET(request: Request, image_id: Optional[str] = None):
+    try:
+        images = client.images.list(all=True)
+        analysis = image_analyzer.analyze(images)
+        if image_id:
+            matches = {iid: details for iid, details in analysis["images"].items() if iid.replace("sha256:", "").startswith(image_id.replace("sha256:", ""))}
+            if not matches:
+                return {"error": True, "message": f"Image {image_id} not found"}
+            analysis["images"] = matches
+        return {"error": False, "analysis": analysis}
+    except Exception as e:
+        return {"error": True, "message": f"Error analyzing images: {e}"}
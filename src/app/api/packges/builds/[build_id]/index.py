@@ -0,0 +1,27 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.docker_client.operations import operation_store, parse_last_event_id, stream_operation
+from app.docker_client.build_queue import get_build_queue
+
+build_queue = get_build_queue()
+
+async def GET(request: Request, build_id: str, follow: bool = True):
+    operation = operation_store.get(build_id)
+    if operation is None or operation.kind != "build":
+        return JSONResponse(status_code=404, content={"message": f"Build {build_id} not found"})
+    if not follow:
+        return {"build": operation.to_dict()}
+
+    # Resume after the last event the client saw when an EventSource reconnects
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        stream_operation(operation, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def DELETE(request: Request, build_id: str):
+    operation = build_queue.cancel(build_id)
+    if operation is None:
+        return JSONResponse(status_code=404, content={"message": f"Build {build_id} not found"})
+    return {"message": f"Cancelling build {build_id}", "build": operation.to_dict()}
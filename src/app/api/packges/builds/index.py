@@ -0,0 +1,6 @@
+from fastapi import Request
+from app.docker_client.operations import operation_store
+
+async def GET(request: Request):
+    builds = sorted(operation_store.list("build"), key=lambda operation: operation.created, reverse=True)
+    return {"builds": [operation.to_dict() for operation in builds]}
@@ -1,18 +1,21 @@
-import docker
-import docker.utils
 from fastapi import Request
 from pydantic import BaseModel
 from enum import Enum
 import tempfile
 import os
 import traceback
-from io import BytesIO
 from typing import List, Dict, Optional
 
 
 from app.docker_client import clientContext
+from app.docker_client.image_analysis import get_image_analyzer
+from app.docker_client.build_queue import get_build_queue, BuildQueueFull
+from app.docker_client.pull_manager import get_pull_manager
 
 client = clientContext.client
+image_analyzer = get_image_analyzer()
+build_queue = get_build_queue()
+pull_manager = get_pull_manager()
 
 
 class ActionTypeEnum(str, Enum):
@@ -22,8 +25,10 @@ class ActionTypeEnum(str, Enum):
     CREATE = "crete"
 
 class PullConfig(BaseModel):
-    image:str
+    image:str = ""
+    images:List[str] = []  # Pull several images in one request
     registry:str = "docker.io"
+    parallelism:int = 2
 
 class CreateConfig(BaseModel):
     content:str
@@ -66,54 +71,6 @@ def remove_image(image_id):
         client.images.remove(image_id,force=True)
         print(f"Image {image_id} has been removed successfully.")
 
-def pull_image(image_name: str):
-    """
-    Pulls an image from either a local registry or a remote registry.
-    """
-    # Attempt to pull the image
-    image = client.images.pull(image_name)
-    return image
-
-
-async def build_from_string(dockerfile_string, tag):
-
-    try:
-        # Use the low-level API client
-        # Build the image using the build method
-        f = BytesIO(dockerfile_string.encode('utf-8'))
-        image, logs = client.images.build(fileobj=f, tag=tag,forcerm=True, rm=True,pull=False,labels={"com.docker.my.package":"_"+tag})
-        # Loop through each image and retrieve information
-        image_details = {}
-        # Extract image name (repo name) and tag from the tags
-        image_details['name'] = [tag.split(":")[0] for tag in image.tags] if image.tags else "None"
-        image_details['id'] = image.id
-        image_details['tags'] = image.tags
-        image_details['created'] = image.attrs['Created']
-        image_details['size'] = image.attrs['Size']
-        image_details['virtual_size'] = image.attrs.get('VirtualSize',"N/A")
-        image_details['repo_tags'] = image.attrs['RepoTags']
-        image_details['labels'] = image.attrs.get('Labels', {})
-        # Return the built image and logs
-        return {"image":image_details, "logs":logs}
-    
-    except docker.errors.BuildError as build_error:
-        # Handle errors that occur during image build
-        ex = Exception(f"Error building image")
-        ex.__dict__["explanation"] = f"Error building image: {build_error}"
-        raise ex
-
-    except docker.errors.APIError as api_error:
-        # Handle errors that occur due to Docker daemon issues
-        ex = Exception(f"Docker API error")
-        ex.__dict__["explanation"] = f"Docker API error: {api_error}"
-        raise ex
-
-    except Exception as e:
-        # Handle any other unexpected errors
-        ex = Exception(f"Unexpected error")
-        ex.__dict__["explanation"] = f"Unexpected error: {e}"
-        raise ex
-        
 class Package_Info(BaseModel):
     name: List[str]  # Repo name(s) extracted from image tags
     id: str          # Unique image ID
@@ -123,13 +80,28 @@ class Package_Info(BaseModel):
     virtual_size: int  # Virtual size of the image (could be string like "N/A")
     repo_tags: List[str]  # List of repository tags
     labels: Optional[Dict[str, str]] = {}  # Optional dictionary of labels, defaults to empty dict
+    shared_size: Optional[int] = None  # Bytes in layers shared with other images
+    unique_size: Optional[int] = None  # Bytes in layers only this image uses
+    freed_if_removed: Optional[int] = None  # Bytes reclaimed by removing this image
+    layers: Optional[int] = None  # Number of layers
+
+
+class Layer_Sharing(BaseModel):
+    images: int
+    layers: int
+    logicalSize: int  # Sum of image sizes, counting shared layers once per image
+    physicalSize: int  # Bytes actually stored, counting each layer once
+    sharedSavings: int
+    dedupeRatio: float
 
 
 class Get_Packages_Response(BaseModel):
     packages:List[Package_Info]
+    layer_sharing: Optional[Layer_Sharing] = None
 
 async def GET(request:Request)->Get_Packages_Response:
     images = client.images.list(all=True)  # Get all containers (running or stopped)
+    analysis = image_analyzer.analyze(images)
     
     image_info = []
 
@@ -149,12 +121,18 @@ async def GET(request:Request)->Get_Packages_Response:
                 image_details['repo_tags'] = image.attrs['RepoTags']
                 image_details['labels'] = image.attrs.get('Labels', {})
 
-                # You can also retrieve more info, like layers, parent id, etc.
+                # Layer sharing, so the real cost of each image is visible
+                image_analysis = analysis['images'][image.id]
+                image_details['shared_size'] = image_analysis['sharedSize']
+                image_details['unique_size'] = image_analysis['uniqueSize']
+                image_details['freed_if_removed'] = image_analysis['freedIfRemoved']
+                image_details['layers'] = len(image_analysis['layers']) if image_analysis['layers'] is not None else None
+
                 image_info.append(image_details)
             except Exception as e:
                 print(f"Error retrieving info for image {[tag.split(':')[0] for tag in image.tags] if image.tags else 'None'}: {e}")
     
-    return {"packages": image_info}
+    return {"packages": image_info, "layer_sharing": analysis['totals']}
 
 async def POST(request:Request,body: RunImage):
     actionType = body.action
@@ -162,39 +140,29 @@ async def POST(request:Request,body: RunImage):
 
     try:
         if actionType == "pull":
-            if not body.pull_config.image:
+            image_names = body.pull_config.images or ([body.pull_config.image] if body.pull_config.image else [])
+            if not image_names:
                 return({"error":True,"message":f"Image name is required'."})
             
-            image_name = body.pull_config.image
             registry = body.pull_config.registry
 
             # If a registry is specified, prepend it to the image name
             if registry:
-                image_name = f"{registry}/{image_name}"
-
-            # Try pulling the image
-            image = pull_image(image_name)
-
-            # Loop through each image and retrieve information
-            image_details = {}
-            # Extract image name (repo name) and tag from the tags
-            image_details['name'] = [tag.split(":")[0] for tag in image.tags] if image.tags else "None"
-            image_details['id'] = image.id
-            image_details['tags'] = image.tags
-            image_details['created'] = image.attrs['Created']
-            image_details['size'] = image.attrs['Size']
-            image_details['virtual_size'] = image.attrs.get('VirtualSize',"N/A")
-            image_details['repo_tags'] = image.attrs['RepoTags']
-            image_details['labels'] = image.attrs.get('Labels', {})
-
-            return {"error":False, "message":f"Image {image_name} pulled successfully.","package": image_details}
+                image_names = [f"{registry}/{image_name}" for image_name in image_names]
+
+            # Pulls run in the background; follow progress at /api/packges/pulls/{id}
+            operation = pull_manager.pull(image_names, parallelism=body.pull_config.parallelism)
+            return {"error":False, "message":f"Pulling {', '.join(image_names)}.","operation":operation.to_dict()}
         
         if actionType == "create":
             package_content = body.create_config.content
             tag = body.create_config.tag
-            created_image = await build_from_string(package_content,tag)
-            # Loop through each image and retrieve information
-            return {"error":False, "message":f"Created Image {created_image['image']['id']}","image":created_image['image']}
+            # Builds run on the build queue; follow progress at /api/packges/builds/{id}
+            try:
+                operation = build_queue.submit(package_content, tag, labels={"com.docker.my.package":"_"+tag} if tag else None)
+            except BuildQueueFull as e:
+                return {"error":True, "message":str(e)}
+            return {"error":False, "message":f"Build queued ({operation.id})","operation":operation.to_dict()}
         
         image_id = body.packageId
 
@@ -0,0 +1,18 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.docker_client.operations import operation_store, parse_last_event_id, stream_operation
+
+async def GET(request: Request, pull_id: str, follow: bool = True):
+    operation = operation_store.get(pull_id)
+    if operation is None or operation.kind != "pull":
+        return JSONResponse(status_code=404, content={"message": f"Pull {pull_id} not found"})
+    if not follow:
+        return {"pull": operation.to_dict()}
+
+    # Resume after the last event the client saw when an EventSource reconnects
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        stream_operation(operation, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
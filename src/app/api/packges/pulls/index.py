@@ -0,0 +1,21 @@
+from fastapi import Request
+from pydantic import BaseModel
+from typing import List
+from app.docker_client.operations import operation_store
+from app.docker_client.pull_manager import get_pull_manager
+
+pull_manager = get_pull_manager()
+
+class PullImages(BaseModel):
+    images: List[str]
+    parallelism: int = 2
+
+async def GET(request: Request):
+    pulls = sorted(operation_store.list("pull"), key=lambda operation: operation.created, reverse=True)
+    return {"pulls": [operation.to_dict() for operation in pulls]}
+
+async def POST(request: Request, body: PullImages):
+    if not body.images:
+        return {"error": True, "message": "At least one image is required."}
+    operation = pull_manager.pull(body.images, parallelism=body.parallelism)
+    return {"error": False, "message": f"Pulling {len(operation.params['images'])} images.", "operation": operation.to_dict()}
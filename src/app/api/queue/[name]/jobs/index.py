@@ -0,0 +1,21 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from typing import Optional
+from app.queue_client import queue_discovery, queue_registry
+from app.queue_client.jobs import page_jobs
+
+async def GET(request: Request, name: str, state: str = "waiting", cursor: Optional[str] = None, limit: int = 50):
+    """
+    Page through one state of a queue (`prefix:name`), newest first.
+
+    Pass the returned `nextCursor` to get the next page; it is null on the
+    last page. Cursors stay valid while jobs are added or finish.
+    """
+    queues = await queue_discovery.list()
+    queue_config = next((config for config in queues if config["name"] == name), None)
+    if queue_config is None:
+        return JSONResponse(status_code=404, content={"message": f"Queue {name} not found"})
+    try:
+        return await page_jobs(queue_registry.redis(queue_config["url"]), name, state, cursor=cursor, limit=max(1, min(limit, 500)))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {str(e)}"})
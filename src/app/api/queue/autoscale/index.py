@@ -0,0 +1,41 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Dict, Optional
+from app.queue_client import queue_autoscaler
+
+class AutoscalePolicy(BaseModel):
+    queueName: str
+    enabled: Optional[bool] = None
+    processFileName: Optional[str] = None
+    queueProps: Optional[Dict] = None
+    minWorkers: Optional[int] = None
+    maxWorkers: Optional[int] = None
+    jobsPerWorker: Optional[int] = None
+    scaleDownRatio: Optional[float] = None
+    maxWaitMs: Optional[int] = None
+    scaleUpCooldown: Optional[int] = None
+    scaleDownCooldown: Optional[int] = None
+    maxStepUp: Optional[int] = None
+    maxStepDown: Optional[int] = None
+
+class RemoveAutoscalePolicy(BaseModel):
+    queueName: str
+
+async def GET(request: Request, queue: Optional[str] = None, limit: int = 100):
+    """Policies, the last evaluation per queue and the most recent scaling decisions (newest first)."""
+    return queue_autoscaler.describe(queue, limit)
+
+async def PUT(request: Request, body: AutoscalePolicy):
+    """Create or update a queue's policy; omitted fields keep their current (or default) value."""
+    policy = body.dict(exclude={"queueName"})
+    try:
+        policy = queue_autoscaler.set_policy(body.queueName, policy)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {str(e)}"})
+    return {"error": False, "message": f"Autoscaling {body.queueName}", "policy": policy}
+
+async def DELETE(request: Request, body: RemoveAutoscalePolicy):
+    if not queue_autoscaler.remove_policy(body.queueName):
+        return JSONResponse(status_code=404, content={"message": f"No autoscale policy for {body.queueName}"})
+    return {"error": False, "message": f"Stopped autoscaling {body.queueName}"}
@@ -0,0 +1,17 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.docker_client import clientContext
+from app.queue_client import queue_discovery
+
+client = clientContext.client
+
+async def GET(request: Request, workers: bool = False, refresh: bool = False):
+    """Queues found in Redis; `workers=true` also lists the worker containers of each queue."""
+    if refresh:
+        queue_discovery.invalidate()
+    try:
+        if workers:
+            return {"queues": await queue_discovery.list_with_workers(client)}
+        return {"queues": await queue_discovery.list()}
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": f"Error: {str(e)}"})
@@ -0,0 +1,22 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.queue_client import queue_event_hub
+
+async def GET(request: Request, queues: Optional[str] = None, events: Optional[str] = None, lastEventId: Optional[str] = None):
+    """
+    Live BullMQ job events (added, active, progress, completed, failed, ...) as Server-Sent Events.
+
+    `queues` and `events` are comma separated filters. Reconnecting with
+    the Last-Event-ID header (sent automatically by EventSource) resumes
+    where the stream left off.
+    """
+    return StreamingResponse(
+        queue_event_hub.subscribe(
+            queues=set(queues.split(",")) if queues else None,
+            events=set(events.split(",")) if events else None,
+            last_event_id=request.headers.get("last-event-id") or lastEventId,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
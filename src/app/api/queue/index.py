@@ -1,13 +1,12 @@
 import os
-import time
 import json
 import docker
 from fastapi import Request
-from bullmq import Queue
-
 from pydantic import BaseModel
 from typing import Dict
 from app.docker_client import clientContext
+from app.queue_client import queue_discovery, worker_pool
+from app.queue_client.workers import run_worker
 
 client = clientContext.client
 
@@ -29,31 +28,10 @@ def run_containers(queueName="dynamicWorkQueue1",prefix="bull",processFileName="
     try:
         # Start the Deno container
         print("Starting Deno container...")
-        # Start the Deno container with a unique name
-        unique_container_name = f"deno_{queueName}_{prefix}_{processFileName}_{int(time.time())}"
-        
-        client.containers.run(
-            "denoland/deno",
-            name=unique_container_name,
-            volumes={
-                "/Users/ai/Documents/node_hooks/explore/bull/worker.ts":{"bind": "/worker/worker.ts", "mode": "ro"},
-                "/Users/ai/Documents/node_hooks/explore/bull/utils":{"bind": "/worker/utils", "mode": "ro"},
-                f"/Users/ai/Documents/node_hooks/explore/bull/Queues/processList/{processFileName}":{"bind": f"/worker/Queues/processList/{processFileName}", "mode": "ro"},
-                "/Users/ai/Documents/node_hooks/explore/bull/Queues/index.ts":{"bind": "/worker/Queues/index.ts", "mode": "ro"},
-                "/Users/ai/Documents/node_hooks/explore/bull/Queues/queueContext.ts":{"bind": "/worker/Queues/queueContext.ts", "mode": "ro"},
-                "/Users/ai/Documents/node_hooks/explore/bull/Queues/type.ts":{"bind": "/worker/Queues/type.ts", "mode": "ro"},
-            },
-            network_mode="host",
-            command=f"deno run --allow-all --unstable-worker-options  /worker/worker.ts --queueName={queueName} --prefix={prefix} --processFileName={processFileName}",
-            detach=True,
-            cpu_shares=1024,
-            mem_limit="512m",
-            mem_reservation="256m",
-            memswap_limit="768m",
-            labels={
-                "queueProps":json.dumps(queueProps),
-            }
-        )
+        # Take a warm container from the pool when one is idle, else start a fresh one
+        unique_container_name = worker_pool.acquire(queueName, prefix, processFileName, queueProps)
+        if unique_container_name is None:
+            unique_container_name = run_worker(client, queueName, prefix, processFileName, queueProps)
         # Track the container name
         container_names.append(unique_container_name)
         # Wait for containers to be running (you can adjust the wait time as needed)
@@ -63,26 +41,8 @@ def run_containers(queueName="dynamicWorkQueue1",prefix="bull",processFileName="
         print(f"Error while starting containers: {e}")
         return False
 
-
-def create_queue_connection(queue_name, all_queue_configs):
-    queue_config = next((config for config in all_queue_configs if config['name'] == queue_name), None)
-    if not queue_config:
-        raise ValueError(f"No configuration found for queue: {queue_name}")
-    
-    array_name = queue_name.split(":")
-    queue = Queue(":".join(array_name[1:]), {
-        'prefix': array_name[0],
-        'connection': {
-            "host": "localhost",
-            "port": 6379,
-            "db": 0,
-            "password": None,
-            "username": None,
-        }
-    })
-    return queue
-
-async def GET(request:Request):
+async def GET(request:Request, logs:bool=False):
+    # Logs are opt-in; the UI streams them per container from /api/containers/logs/{id}
     containers = client.containers.list(all=True)  # Get all containers (running or stopped)
     
     container_info = []
@@ -104,9 +64,10 @@ async def GET(request:Request):
                     "id": container.id,
                     "status": container.status,
                     "created": container.attrs['Created'],
-                    "logs": container.logs(stdout=True, stderr=True, tail=10).decode('utf-8'),
+                    "logs": container.logs(stdout=True, stderr=True, tail=10).decode('utf-8') if logs else None,
                     "finishedAt":container.attrs['State']["FinishedAt"],
-                    "queueProps":json.loads(container.labels["queueProps"])
+                    # Pooled workers were created before their queue was known, so have no label
+                    "queueProps":json.loads(container.labels["queueProps"]) if "queueProps" in container.labels else worker_pool.queue_props(container.name)
                 }
                 
                 container_info.append(container_details)
@@ -122,6 +83,8 @@ async def POST(request:Request,body: RunQueue):
     queueProps = body.queueProps
     isRunning = run_containers(queueName,prefix,processFileName,queueProps)
     if isRunning:
+        # The new worker registers its queue in Redis; pick it up on the next listing
+        queue_discovery.invalidate()
         return {"message":"done","container_name":isRunning}
     return {"message":"failed"}
 
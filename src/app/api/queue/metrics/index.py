@@ -0,0 +1,17 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from typing import Optional
+from app.queue_client import queue_metrics
+
+async def GET(request: Request, queue: Optional[str] = None, window: int = 300):
+    """
+    Throughput, wait/processing time percentiles (ms) and backlog trend per queue.
+
+    `window` is in seconds, from one sampling interval up to one hour. Without `queue`, every sampled queue is returned.
+    """
+    if queue:
+        metrics = queue_metrics.query(queue, window)
+        if metrics is None:
+            return JSONResponse(status_code=404, content={"message": f"No samples for queue {queue} yet"})
+        return metrics
+    return {"queues": queue_metrics.query_all(window), "interval": queue_metrics.interval}
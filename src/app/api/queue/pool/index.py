@@ -0,0 +1,24 @@
+import anyio
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.queue_client import worker_pool
+
+class ResizePool(BaseModel):
+    size: int
+
+async def GET(request: Request):
+    """Target size and the idle pre-warmed worker containers waiting for a queue."""
+    try:
+        # Lists containers; keep the Docker call off the event loop
+        return await anyio.to_thread.run_sync(worker_pool.describe)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": f"Error: {str(e)}"})
+
+async def PUT(request: Request, body: ResizePool):
+    """Change how many idle workers are kept warm (until restart; WORKER_POOL_SIZE sets the default)."""
+    try:
+        worker_pool.resize(body.size)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"Error: {str(e)}"})
+    return {"error": False, "message": f"Worker pool resized to {body.size}"}
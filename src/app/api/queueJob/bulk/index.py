@@ -0,0 +1,46 @@
+import json
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.queue_client import get_queue, queue_discovery
+from app.queue_client.enqueue import enqueue, iter_array, iter_ndjson
+
+async def POST(request: Request, queueName: str, chunk: int = 1000, progress: bool = False):
+    """
+    Enqueue many jobs into `queueName` with addBulk.
+
+    The body is a JSON array or (Content-Type application/x-ndjson) one job
+    per line, each `{"meta": {...}, "data": {...}}` as for POST /api/queueJob.
+    With `progress=true` one NDJSON line is streamed per added chunk;
+    otherwise all ids are returned at the end.
+    """
+    try:
+        queue = get_queue(queueName, await queue_discovery.list())
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {str(e)}"})
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = iter_ndjson(request.stream())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse(status_code=400, content={"message": "Body must be a JSON array or NDJSON"})
+        if not isinstance(body, list):
+            return JSONResponse(status_code=400, content={"message": "Body must be a JSON array or NDJSON"})
+        items = iter_array(body)
+    results = enqueue(queue, items, chunk_size=max(1, min(chunk, 10000)))
+
+    if progress:
+        async def stream():
+            added = 0
+            async for result in results:
+                added += len(result["jobs"])
+                yield json.dumps({**result, "added": added}) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+    jobs, errors = [], []
+    async for result in results:
+        jobs.extend(result["jobs"])
+        errors.extend(result["errors"])
+    return {"message": "done", "added": len(jobs), "jobs": jobs, "errors": errors}
@@ -1,12 +1,10 @@
 from fastapi import Request
-from bullmq import Queue
-import json
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import  Dict,Optional
-from app.docker_client import clientContext
-import time
-
-client = clientContext.client
+from typing import  Dict,List,Literal,Optional
+from app.queue_client import get_queue, queue_discovery, queue_registry
+from app.queue_client.enqueue import initial_state, job_spec
+from app.queue_client.bulk_jobs import clean_state, remove_job_ids, retry_all, retry_job_ids
 
 class CreateQueueJobMeta(BaseModel):
     id:Optional[str]=None
@@ -20,103 +18,79 @@ class CreateQueueJob(BaseModel):
     meta: CreateQueueJobMeta
     data: Dict
 
-async def get_queues():
-    containers = client.containers.list(all=True)  # Get all containers (running or stopped)
-    container_info = []
-    for container in containers:
-        if container.name.startswith("deno_"):  # Filter only containers started by the POST method
-            try:
-                # Fetch container details
-                name_list = container.name.split("deno_")[1].split("_")
-                name = name_list[0]
-                prefix = name_list[1]
-                container_details = {
-                    "name": f"{prefix}:{name}", 
-                    "hostId": "redis",
-                    "url": "redis://localhost:6379" 
-                }
-                
-                container_info.append(container_details)
-            except Exception as e:
-                print(f"Error retrieving info for container {container.name}: {e}")
-    return {"containers": container_info}
+class RetryQueueJobs(BaseModel):
+    queueName:str
+    id:Optional[str]=None
+    ids:List[str]=[]
+    # Retry every job in `state` instead of listed ids
+    all:bool=False
+    state:Literal["failed","completed"]="failed"
+
+class RemoveQueueJobs(BaseModel):
+    queueName:str
+    id:Optional[str]=None
+    ids:List[str]=[]
+    # Remove every job in `state` finished/added more than `olderThan` ms ago
+    state:Optional[Literal["completed","failed","delayed","waiting","active","paused","prioritized"]]=None
+    olderThan:int=0
 
+# Job states as bullmq's clean() names them
+CLEAN_STATES = {"waiting": "wait"}
+CLEAN_STATES.update({state: state for state in ["completed","failed","delayed","active","paused","prioritized"]})
 
-def create_queue_connection(queue_name, all_queue_configs):
-    queue_config = next((config for config in all_queue_configs if config['name'] == queue_name), None)
-    if not queue_config:
-        raise ValueError(f"No configuration found for queue: {queue_name}")
-    
-    array_name = queue_name.split(":")
-    # print(isinstance(r, redis.Redis))
-    queue = Queue(":".join(array_name[1:]), {
-        'prefix': array_name[0],
-        'connection': {
-            "host": "localhost",
-            "port": 6379,
-            "db": 0,
-            "password": None,
-            "username": None,
-        }
-    })
-    return queue
+async def get_queues():
+    # Discovered from the queues' meta keys in Redis (cached briefly); no Docker calls
+    return {"containers": await queue_discovery.list()}
 
 async def GET(request:Request):
     return {"user":"1"}
 
 async def POST(request:Request,body:CreateQueueJob):
-    print(body)
     queueName = body.queueName
     data = body.data
     meta = body.meta
     all_queue_configs = await get_queues()
-    queue = create_queue_connection(queueName,all_queue_configs["containers"])
-    job_data = {
-        "obj":{
-            "meta": {"id":meta.id or "1","name":meta.name},
-            "data": data
-        }
-    }
-
-    if meta.repeat:
-        job_data["repeat"] = meta.repeat,
-        print(job_data,"findMe")
-        job = await queue.add("add_repeat_job",job_data,{
-            "delay":meta.delay,
-            "attempts":meta.attempts,
-            # "removeOnComplete":True
-
-        })
-    else:
-        job = await queue.add("__default__",job_data,{
-            "delay":meta.delay,
-            "attempts":meta.attempts,
-        })
+    try:
+        queue = get_queue(queueName,all_queue_configs["containers"])
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {str(e)}"})
+    spec = job_spec(meta.dict(), data)
+    job = await queue.add(spec["name"], spec["data"], spec["opts"])
 
     to_return = {
-        "id":job.id,"state":await job.getState() ,"data":job.data
+        "id":job.id,"state":initial_state(spec),"data":job.data
     }
-    await queue.close()
     return to_return
 
-async def PUT(request:Request):
-    jobId = json.loads(await request.body())["id"]
-    queueName = json.loads(await request.body())["queueName"]
+async def PUT(request:Request, body:RetryQueueJobs):
     all_queue_configs = await get_queues()
+    try:
+        queue = get_queue(body.queueName, all_queue_configs["containers"])
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {str(e)}"})
 
-    queue = create_queue_connection(queueName, all_queue_configs["containers"])
-    jobs = await queue.getJobs(["failed"])
-    for job in jobs:
-        if(job.id == jobId):
-            await job.retry()
-            break
-    return {"message":"done"}
+    ids = body.ids + ([body.id] if body.id else [])
+    if body.all:
+        queue_config = next(config for config in all_queue_configs["containers"] if config["name"] == body.queueName)
+        result = await retry_all(queue, queue_registry.redis(queue_config["url"]), body.state)
+    elif ids:
+        result = await retry_job_ids(queue, ids, body.state)
+    else:
+        return JSONResponse(status_code=400, content={"message": "Pass id, ids or all"})
+    return {"message":"done", "retried": result["done"], "errors": result["errors"]}
 
-async def DELETE(request:Request):
-    jobId = json.loads(await request.body())["id"]
-    queueName = json.loads(await request.body())["queueName"]
+async def DELETE(request:Request, body:RemoveQueueJobs):
     all_queue_configs = await get_queues()
+    try:
+        queue = get_queue(body.queueName, all_queue_configs["containers"])
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"message": f"Error: {str(e)}"})
 
-    queue = create_queue_connection(queueName, all_queue_configs["containers"])
-    await queue.remove(jobId)
-    return {"message":"done"}
\ No newline at end of file
+    ids = body.ids + ([body.id] if body.id else [])
+    if body.state:
+        result = await clean_state(queue, CLEAN_STATES[body.state], body.olderThan)
+    elif ids:
+        result = await remove_job_ids(queue, ids)
+    else:
+        return JSONResponse(status_code=400, content={"message": "Pass id, ids or state"})
+    return {"message":"done", "removed": result["done"], "errors": result["errors"]}
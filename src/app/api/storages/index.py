@@ -4,8 +4,11 @@ from pydantic import BaseModel
 from enum import Enum
 from datetime import datetime
 from app.docker_client import clientContext
+from app.docker_client.disk_usage import get_disk_usage
+from app.docker_client.volume_usage import build_volume_usage_index, volume_details
 
 client = clientContext.client
+disk_usage = get_disk_usage()
 
 class VolumeActionEnum(str, Enum):
     PRUNE = 'prune'
@@ -43,7 +46,9 @@ async def create_volume(data):
         "mountPoint":new_volume.attrs.get("Mountpoint","N/A"),
         'created': new_volume.attrs.get('CreatedAt', 'N/A'),
         'scope': new_volume.attrs.get('Scope', 'N/A'),
-        'inUse': False
+        'inUse': False,
+        'usedBy': [],
+        'size': 0,
     }
     return volume_details
 
@@ -52,52 +57,20 @@ async def create_volume(data):
 async def list_volumes():
 
     volumes = client.volumes.list()  # Get all volumes
-    volume_info = []
-
-    for volume in volumes:
-        volume_details = {
-            'name': volume.attrs.get("Name","N/A"),
-            "driver":volume.attrs.get("Driver","N/A"),
-            "labels":volume.attrs.get("Labels",{}),
-            "options":volume.attrs.get("Options","N/A"),
-            "mountPoint":volume.attrs.get("Mountpoint","N/A"),
-            'created': volume.attrs.get('CreatedAt', 'N/A'),
-            'scope': volume.attrs.get('Scope', 'N/A'),
-            'inUse': False
-        }
-
-        # Check if the volume is in use
-        for container in client.containers.list(all=True):
-            for mount in container.attrs.get('Mounts', []):
-                if mount.get('Type') == 'volume' and mount.get('Name') == volume.name:
-                    volume_details['inUse'] = True
-                    break
-
-        volume_info.append(volume_details)
-    
-    return volume_info
+    usage_index = build_volume_usage_index(client)
+    sizes = disk_usage.volume_sizes()
+
+    return [volume_details(volume, usage_index, sizes) for volume in volumes]
 
 # Function to prune unused volumes
 async def prune_volumes():
-    unused_volumes = []
-
-    # First, list all volumes
-    volumes = client.volumes.list()
-
-    for volume in volumes:
-        in_use = False
-        for container in client.containers.list(all=True):
-            for mount in container.attrs.get('Mounts', []):
-                if mount.get('Type') == 'volume' and mount.get('Name') == volume.name:
-                    in_use = True
-                    break
-        
-        if not in_use:
-            unused_volumes.append(volume.name)
+    usage_index = build_volume_usage_index(client)
+    unused_volumes = [volume.name for volume in client.volumes.list() if volume.name not in usage_index]
 
     # Remove unused volumes
     if unused_volumes:
         client.volumes.prune()  # This removes all unused volumes
+        disk_usage.invalidate()
         return {"message": "Unused volumes pruned successfully.", "volumes": unused_volumes}
     else:
         return {"message": "No unused volumes found to prune."}
@@ -108,22 +81,18 @@ async def remove_volume(volume_id: str):
     try:
         # Check if the volume exists
         volume = client.volumes.get(volume_id)
-        in_use = False
 
         # Check if any container is using the volume
-        for container in client.containers.list(all=True):
-            for mount in container.attrs.get('Mounts', []):
-                if mount.get('Type') == 'volume' and mount.get('Name') == volume.name:
-                    in_use = True
-                    break
+        used_by = build_volume_usage_index(client).get(volume.name, [])
 
-        if in_use:
+        if used_by:
             ex = Exception(f"Volume {volume_id} in use.")
-            ex.__dict__["explanation"] = f"Volume {volume_id} is in use by one or more containers and cannot be removed."
+            ex.__dict__["explanation"] = f"Volume {volume_id} is in use by {', '.join(container['name'] for container in used_by)} and cannot be removed."
             raise ex
         
         # Remove the volume if it's not in use
         volume.remove()
+        disk_usage.invalidate()
         return {"message": f"Volume {volume_id} removed successfully."}
     
     except docker.errors.NotFound:
@@ -0,0 +1,17 @@
+import asyncio
+from fastapi import Request
+from app.docker_client.disk_usage import get_disk_usage
+
+disk_usage = get_disk_usage()
+
+async def GET(request: Request, refresh: bool = False, raw: bool = False):
+    try:
+        # df() can take tens of seconds on large hosts; keep it off the event loop
+        if refresh:
+            await asyncio.to_thread(disk_usage.refresh)
+        usage = {"error": False, "usage": await asyncio.to_thread(disk_usage.get_summary)}
+        if raw:
+            usage["df"] = await asyncio.to_thread(disk_usage.get)
+        return usage
+    except Exception as e:
+        return {"error": True, "message": f"Error retrieving disk usage: {e}"}
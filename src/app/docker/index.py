@@ -1,7 +1,9 @@
+import asyncio
 import docker
 from fastapi import Request
 from pydantic import BaseModel
 from app.docker_client import clientContext
+from app.docker_client.disk_usage import get_disk_usage
 
 client = clientContext.client
 
@@ -65,6 +67,12 @@ def get_system_stats():
 
 async def index(request:Request):
     try:
-        return {"error":False, "info": get_system_stats()}
+        info = get_system_stats()
+        try:
+            disk_usage = await asyncio.to_thread(get_disk_usage().get_summary)
+        except Exception as e:
+            print(f"Error retrieving disk usage: {e}")
+            disk_usage = None
+        return {"error":False, "info": info, "diskUsage": disk_usage}
     except Exception as e:
         return {"error": True, "message": e.__dict__["explanation"]}
\ No newline at end of file
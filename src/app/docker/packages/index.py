@@ -1,6 +1,7 @@
 from fastapi import Request
 
 from app.docker_client import clientContext
+from app.docker_client.image_analysis import get_image_analyzer
 
 async def meta_data():
     return {
@@ -11,6 +12,7 @@ async def meta_data():
 async def index(request:Request):
     client = clientContext.client
     images = client.images.list(all=True)  # Get all containers (running or stopped)
+    analysis = get_image_analyzer().analyze(images)
     
     image_info = []
 
@@ -30,9 +32,15 @@ async def index(request:Request):
                 image_details['repo_tags'] = image.attrs['RepoTags']
                 image_details['labels'] = image.attrs.get('Labels', {})
 
-                # You can also retrieve more info, like layers, parent id, etc.
+                # Layer sharing, so the real cost of each image is visible
+                image_analysis = analysis['images'][image.id]
+                image_details['shared_size'] = image_analysis['sharedSize']
+                image_details['unique_size'] = image_analysis['uniqueSize']
+                image_details['freed_if_removed'] = image_analysis['freedIfRemoved']
+                image_details['layers'] = len(image_analysis['layers']) if image_analysis['layers'] is not None else None
+
                 image_info.append(image_details)
             except Exception as e:
                 print(f"Error retrieving info for image {[tag.split(':')[0] for tag in image.tags] if image.tags else 'None'}: {e}")
     
-    return {"packageInfo": image_info}
\ No newline at end of file
+    return {"packageInfo": image_info, "layerSharing": analysis['totals']}
\ No newline at end of file
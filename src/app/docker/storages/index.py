@@ -2,6 +2,8 @@ import docker
 from fastapi import Request
 from datetime import datetime
 from app.docker_client import clientContext
+from app.docker_client.disk_usage import get_disk_usage
+from app.docker_client.volume_usage import build_volume_usage_index, volume_details
 
 async def meta_data():
     return {
@@ -13,30 +15,10 @@ async def meta_data():
 async def list_volumes():
     client = clientContext.client
     volumes = client.volumes.list()  # Get all volumes
-    volume_info = []
+    usage_index = build_volume_usage_index(client)
+    sizes = get_disk_usage().volume_sizes()
 
-    for volume in volumes:
-        volume_details = {
-            'name': volume.attrs.get("Name","N/A"),
-            "driver":volume.attrs.get("Driver","N/A"),
-            "labels":volume.attrs.get("Labels",{}),
-            "options":volume.attrs.get("Options","N/A"),
-            "mountPoint":volume.attrs.get("Mountpoint","N/A"),
-            'created': volume.attrs.get('CreatedAt', 'N/A'),
-            'scope': volume.attrs.get('Scope', 'N/A'),
-            'inUse': False
-        }
-
-        # Check if the volume is in use
-        for container in client.containers.list(all=True):
-            for mount in container.attrs.get('Mounts', []):
-                if mount.get('Type') == 'volume' and mount.get('Name') == volume.name:
-                    volume_details['inUse'] = True
-                    break
-
-        volume_info.append(volume_details)
-    
-    return volume_info
+    return [volume_details(volume, usage_index, sizes) for volume in volumes]
 
 
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState } from "react";
 import {
   Activity,
   CheckCircle,
@@ -14,18 +14,7 @@ import { ContainerDashboard } from "@/components/queues/ContainerDashboard";
 import { Button } from "@/components/ui/button";
 import { JobFormModal } from "@/components/queues/queueJob/JobFormModal";
 import { addItemToQueue } from "@/components/queues/services/api";
-
-function sortArrayOfArraysByAddedTimestamp(arrayOfArrays) {
-  // Flatten the array of arrays into a single array
-  const flattenedArray = arrayOfArrays.flat();
-
-  // Sort the flattened array by 'timestamps.added'
-  const sortedArray = flattenedArray.sort(
-    (a, b) => b.timestamps.added - a.timestamps.added
-  );
-
-  return sortedArray;
-}
+import { useQueueJobs } from "@/components/queues/hooks/useQueueJobs";
 
 const tabs = [
   { id: "overview", label: "Overview" },
@@ -43,28 +32,10 @@ function App({
 }) {
   const [open, setOpen] = useState(false);
   const [activeTab, setActiveTab] = useState("overview");
-  const [jobs,setJobs] = useState(
-    sortArrayOfArraysByAddedTimestamp(
-      (allQueues||[]).reduce((acc, item) => {
-        acc.push(item.jobs);
-        return acc;
-      }, [])
-    )
+  const { jobs, loading, hasMore, newJobs, loadMore, reload } = useQueueJobs(
+    (allQueues || []).map((item) => item.name)
   );
 
-  useEffect(()=>{
-    if(allQueues){
-      setJobs(
-        sortArrayOfArraysByAddedTimestamp(
-          (allQueues).reduce((acc, item) => {
-            acc.push(item.jobs);
-            return acc;
-          }, [])
-        )
-      )
-    }
-  },[allQueues])
-
   const handleRetry = async (id: string, queueName: string) => {
     console.log("Retrying job:", id, queueName);
     await fetch("/api/queueJob", {
@@ -157,11 +128,26 @@ function App({
                 <h2 className="text-lg font-medium text-gray-900 mb-4">
                   Recent Jobs
                 </h2>
+                {newJobs > 0 && (
+                  <Button variant="outline" className="mb-4" onClick={reload}>
+                    {newJobs} new {newJobs === 1 ? "job" : "jobs"}, show latest
+                  </Button>
+                )}
                 <JobTable
                   jobs={jobs}
                   onRetry={handleRetry}
                   onDelete={handleDelete}
                 />
+                {hasMore && (
+                  <Button
+                    variant="outline"
+                    className="mt-4"
+                    disabled={loading}
+                    onClick={loadMore}
+                  >
+                    {loading ? "Loading..." : "Load more"}
+                  </Button>
+                )}
               </div>
               
             </div>
@@ -35,8 +35,7 @@ export function useFileExplorer(containerId: string,attachTerminalToPath:(action
       }
 
       const data = (await response.json()).files;
-      const entries = parseListOutput(data);
-      console.log({entries})
+      const entries = toFileSystemEntries(data);
       
       setState(prev => ({
         ...prev,
@@ -79,30 +78,22 @@ export function useFileExplorer(containerId: string,attachTerminalToPath:(action
   };
 }
 
-function parseListOutput(output: string): FileSystemEntry[] {
-  // Simple parser for ls -la output
-  return output
-    .split('\n')
-    .filter(line => line && !line.startsWith('total'))
-    .map(line => {
-      const parts = line.split(/\s+/);
-      const name = parts.slice(8).join(' ');
-      const isDirectory = line.startsWith('d');
-      const isSymlink = line.startsWith('l');
+interface ArchiveEntry {
+  name: string;
+  type: "directory" | "symlink" | "file" | "other";
+  size: number;
+  permissions: string;
+  mtime: number;
+  target: string | null;
+}
 
-      let target: string | undefined;
-      if (isSymlink) {
-        // The last part (after the '->') is the target of the symlink
-        target = parts.slice(-1)[0].replace(/^->\s*/, '');
-      }
-      
-      return {
-        name,
-        type: isDirectory ? 'directory' : isSymlink?"symlink":'file',
-        size: parseInt(parts[4], 10),
-        permissions: parts[0],
-        modified: `${parts[5]} ${parts[6]} ${parts[7]}`,
-        target
-      };
-    });
+function toFileSystemEntries(entries: ArchiveEntry[]): FileSystemEntry[] {
+  return entries.map(entry => ({
+    name: entry.name,
+    type: entry.type === "other" ? "file" : entry.type,
+    size: entry.size,
+    permissions: entry.permissions,
+    modified: new Date(entry.mtime * 1000).toLocaleString(),
+    target: entry.target ?? undefined,
+  }));
 }
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Container } from './types/container';
 import { Play, Square, Terminal, StopCircle } from 'lucide-react';
 import { Card, CardContent, CardFooter, CardHeader, CardTitle } from '@/components//ui/card';
@@ -14,6 +14,17 @@ interface ContainerCardProps {
 
 export function ContainerCard({ container, onRemove }: ContainerCardProps) {
   const isRunning = container.status === 'running';
+  const [logs, setLogs] = useState<string>(container.logs || "");
+
+  useEffect(() => {
+    if (container.logs) return;
+    const controller = new AbortController();
+    fetch(`/api/containers/logs/${container.id}?tail=10`, { signal: controller.signal })
+      .then((response) => (response.ok ? response.text() : ""))
+      .then(setLogs)
+      .catch(() => {});
+    return () => controller.abort();
+  }, [container.id, container.logs]);
 
   return (
     <Card className="overflow-hidden transition-all hover:shadow-md">
@@ -60,14 +71,14 @@ export function ContainerCard({ container, onRemove }: ContainerCardProps) {
         <div className="text-muted-foreground">
         <SmartDataViewer data={container.queueProps} label='Props'  initiallyOpen={false}/>
         </div>
-        {container.logs && (
+        {logs && (
           <div className="space-y-2">
             <div className="flex items-center text-sm text-muted-foreground">
               <Terminal className="w-4 h-4 mr-2" />
               <span>Recent Logs</span>
             </div>
             <pre className="p-4 rounded-lg bg-slate-950 text-slate-50 text-xs font-mono overflow-x-auto">
-              {container.logs}
+              {logs}
             </pre>
           </div>
         )}
@@ -0,0 +1,104 @@
+import { useState, useEffect, useCallback, useRef } from 'react';
+import type { Job } from 'src/types/job';
+import * as api from '../services/api';
+
+const RECENT_STATES = ['active', 'waiting', 'delayed', 'failed', 'completed'];
+
+type Cursors = Record<string, string | null>;
+
+const cursorKey = (queueName: string, state: string) => `${queueName}|${state}`;
+
+function sortByAdded(jobs: Job[]) {
+  return [...jobs].sort((a: any, b: any) => (b.timestamps.added || 0) - (a.timestamps.added || 0));
+}
+
+// Pages every queue/state through /api/queue/{name}/jobs instead of loading all jobs at once
+export function useQueueJobs(queueNames: string[], pageSize = 20) {
+  const [jobs, setJobs] = useState<Job[]>([]);
+  const [cursors, setCursors] = useState<Cursors>({});
+  const [loading, setLoading] = useState(false);
+  // Jobs added since the first page was loaded while the user is further down
+  const [newJobs, setNewJobs] = useState(0);
+  const pagesLoaded = useRef(0);
+
+  const loadPages = useCallback(async (from: Cursors | null) => {
+    setLoading(true);
+    try {
+      const requests = queueNames.flatMap((queueName) =>
+        RECENT_STATES
+          // On "load more", only states that still have pages
+          .filter((state) => from === null || from[cursorKey(queueName, state)])
+          .map(async (state) => {
+            const page = await api.fetchQueueJobs(queueName, state, from ? from[cursorKey(queueName, state)] : null, pageSize);
+            return { key: cursorKey(queueName, state), page };
+          })
+      );
+      const pages = await Promise.all(requests);
+      const next: Cursors = from === null ? {} : { ...from };
+      const loaded: Job[] = [];
+      pages.forEach(({ key, page }) => {
+        next[key] = page.nextCursor;
+        loaded.push(...page.jobs);
+      });
+      setCursors(next);
+      setJobs((previous) => sortByAdded(from === null ? loaded : [...previous, ...loaded]));
+      pagesLoaded.current = from === null ? 1 : pagesLoaded.current + 1;
+      if (from === null) setNewJobs(0);
+    } finally {
+      setLoading(false);
+    }
+  }, [queueNames.join(','), pageSize]);
+
+  useEffect(() => {
+    loadPages(null);
+  }, [loadPages]);
+
+  // Follow job transitions pushed over SSE instead of polling the dashboard
+  useEffect(() => {
+    if (!queueNames.length) return;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    const source = new EventSource(
+      `/api/queue/events?queues=${encodeURIComponent(queueNames.join(','))}&events=added,active,completed,failed`
+    );
+    // State changes are applied to the rows already shown; no page is read again
+    const onTransition = (event: MessageEvent) => {
+      const payload = JSON.parse(event.data);
+      const now = Date.now();
+      setJobs((previous) =>
+        previous.map((job: any) => {
+          if (job.queueName !== payload.queueName || String(job.job_id) !== String(payload.jobId)) return job;
+          return {
+            ...job,
+            job_state: event.type,
+            timestamps: { ...job.timestamps, ...(event.type === 'active' ? { processed: now } : { finished: now }) },
+            ...(event.type === 'completed' ? { return_value: payload.returnvalue } : {}),
+            ...(event.type === 'failed' ? { failed_reason: payload.failedReason } : {}),
+          };
+        })
+      );
+    };
+    const onAdded = () => {
+      // Reloading would undo "Load more"; just count what is new
+      if (pagesLoaded.current > 1) {
+        setNewJobs((count) => count + 1);
+        return;
+      }
+      // Coalesce bursts of additions into one first-page reload
+      if (timer) return;
+      timer = setTimeout(() => {
+        timer = null;
+        loadPages(null);
+      }, 2000);
+    };
+    source.addEventListener('added', onAdded);
+    ['active', 'completed', 'failed'].forEach((event) => source.addEventListener(event, onTransition as EventListener));
+    return () => {
+      if (timer) clearTimeout(timer);
+      source.close();
+    };
+  }, [loadPages]);
+
+  const hasMore = Object.values(cursors).some(Boolean);
+
+  return { jobs, loading, hasMore, newJobs, loadMore: () => loadPages(cursors), reload: () => loadPages(null) };
+}
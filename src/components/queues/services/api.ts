@@ -37,4 +37,11 @@ export async function addItemToQueue(payload){
     })
     if (!response.ok) throw new Error('Failed to stop container');
   return response.json();
-}
\ No newline at end of file
+}
+export async function fetchQueueJobs(queueName: string, state: string, cursor: string | null, limit = 20) {
+  const params = new URLSearchParams({ state, limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${API_BASE}/${encodeURIComponent(queueName)}/jobs?${params}`);
+  if (!response.ok) throw new Error('Failed to fetch jobs');
+  return response.json();
+}
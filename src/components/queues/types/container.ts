@@ -6,7 +6,7 @@ export interface Container {
     id: string;
     status: string;
     created: string;
-    logs: string;
+    logs: string | null;
     finishedAt:string
     queueProps:Record<string,any>
   }
@@ -0,0 +1,267 @@
+"""
+Offline tests for the registry v2 pull-through cache.
+
+The upstream registry is an httpx MockTransport, so no network is needed.
+"""
+import hashlib
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.registry_proxy import registry
+from app.registry_proxy.blob_store import BlobStore
+
+MANIFEST_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+
+
+def digest_of(content: bytes) -> str:
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+class StandInRegistry:
+    """Serves manifests and blobs from dicts and records every request it gets."""
+
+    def __init__(self):
+        self.manifests = {}
+        self.blobs = {}
+        self.requests = []
+        self.status = None
+        self.unreachable = False
+        self.require_token = False
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.unreachable:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.requests.append(request)
+        if request.url.host == "auth.test":
+            return httpx.Response(200, json={"token": "t0ken", "expires_in": 300})
+        if self.require_token and request.headers.get("authorization") != "Bearer t0ken":
+            scope = request.url.path[len("/v2/"):].rsplit("/", 2)[0]
+            return httpx.Response(401, headers={"www-authenticate": f'Bearer realm="https://auth.test/token",service="test",scope="repository:{scope}:pull"'})
+        if self.status is not None:
+            return httpx.Response(self.status, json={"errors": [{"code": "UNAVAILABLE"}]})
+        parts = request.url.path.split("/")
+        kind, reference = parts[-2], parts[-1]
+        if kind == "manifests" and reference in self.manifests:
+            return httpx.Response(200, content=self.manifests[reference], headers={"content-type": MANIFEST_TYPE})
+        if kind == "blobs" and reference in self.blobs:
+            content = self.blobs[reference]
+            if "range" in request.headers:
+                start, _, end = request.headers["range"][len("bytes="):].partition("-")
+                part = content[int(start):int(end) + 1]
+                return httpx.Response(206, stream=httpx.ByteStream(part), headers={"content-range": f"bytes {start}-{end}/{len(content)}"})
+            # Streamed like a real download, so the proxy can read it raw
+            return httpx.Response(200, stream=httpx.ByteStream(content), headers={"content-type": "application/octet-stream"})
+        return httpx.Response(404, json={"errors": [{"code": "MANIFEST_UNKNOWN"}]})
+
+    def paths(self):
+        return [request.url.path for request in self.requests if request.url.host != "auth.test"]
+
+
+@pytest.fixture
+def upstream():
+    stand_in = StandInRegistry()
+    registry.registry_upstream.client = httpx.AsyncClient(base_url="https://registry.test", transport=httpx.MockTransport(stand_in))
+    registry.manifest_tags.clear()
+    registry.tokens.tokens.clear()
+    yield stand_in
+    registry.registry_upstream.client = None
+
+
+@pytest.fixture
+def store(tmp_path):
+    registry._blob_store = BlobStore(str(tmp_path), max_size=1024)
+    yield registry._blob_store
+    registry._blob_store = None
+
+
+@pytest.fixture
+def client(upstream, store):
+    app = FastAPI()
+    registry.add_registry_routes(app)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def add_manifest(upstream, tag: str = "latest") -> bytes:
+    manifest = json.dumps({"schemaVersion": 2, "mediaType": MANIFEST_TYPE, "tag": tag}).encode()
+    upstream.manifests[tag] = manifest
+    upstream.manifests[digest_of(manifest)] = manifest
+    return manifest
+
+
+def test_manifest_by_tag_is_cached(client, upstream):
+    manifest = add_manifest(upstream)
+
+    first = client.get("/v2/library/redis/manifests/latest")
+    second = client.get("/v2/library/redis/manifests/latest")
+    by_digest = client.get(f"/v2/library/redis/manifests/{digest_of(manifest)}")
+
+    assert (first.headers["x-cache"], second.headers["x-cache"], by_digest.headers["x-cache"]) == ("MISS", "HIT", "HIT")
+    assert first.content == second.content == by_digest.content == manifest
+    assert second.headers["docker-content-digest"] == digest_of(manifest)
+    assert second.headers["content-type"] == MANIFEST_TYPE
+    assert upstream.paths() == ["/v2/library/redis/manifests/latest"]
+
+
+def test_anonymous_token_is_fetched_once(client, upstream):
+    add_manifest(upstream)
+    add_manifest(upstream, "7")
+    upstream.require_token = True
+
+    assert client.get("/v2/library/redis/manifests/latest").status_code == 200
+    assert client.get("/v2/library/redis/manifests/7").status_code == 200
+    assert sum(1 for request in upstream.requests if request.url.host == "auth.test") == 1
+
+
+def test_stale_manifest_served_when_upstream_fails(client, upstream):
+    manifest = add_manifest(upstream)
+    client.get("/v2/library/redis/manifests/latest")
+    # Let the tag resolution expire so the upstream is asked again
+    for key, (digest, _) in list(registry.manifest_tags.items()):
+        registry.manifest_tags[key] = (digest, 0)
+
+    upstream.status = 503
+    response = client.get("/v2/library/redis/manifests/latest")
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "STALE"
+    assert response.content == manifest
+
+
+def test_stale_manifest_served_when_upstream_unreachable(client, upstream):
+    manifest = add_manifest(upstream)
+    client.get("/v2/library/redis/manifests/latest")
+    for key, (digest, _) in list(registry.manifest_tags.items()):
+        registry.manifest_tags[key] = (digest, 0)
+
+    upstream.unreachable = True
+    response = client.get("/v2/library/redis/manifests/latest")
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "STALE"
+    assert response.content == manifest
+
+
+def test_unreachable_upstream_without_cache_is_502(client, upstream):
+    upstream.unreachable = True
+    response = client.get("/v2/library/redis/manifests/latest")
+    assert response.status_code == 502
+    assert response.json()["errors"][0]["code"] == "UNAVAILABLE"
+
+
+def test_upstream_error_without_cache_is_passed_through(client, upstream):
+    response = client.get("/v2/library/redis/manifests/missing")
+    assert response.status_code == 404
+    assert response.json()["errors"][0]["code"] == "MANIFEST_UNKNOWN"
+
+
+def test_blob_is_stored_then_served_from_disk(client, upstream, store):
+    content = os.urandom(300)
+    digest = digest_of(content)
+    upstream.blobs[digest] = content
+
+    first = client.get(f"/v2/library/redis/blobs/{digest}")
+    second = client.get(f"/v2/library/redis/blobs/{digest}")
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert first.content == second.content == content
+    assert store.has(digest)
+    assert upstream.paths() == [f"/v2/library/redis/blobs/{digest}"]
+
+
+def test_blob_with_wrong_digest_is_not_stored(client, upstream, store):
+    digest = digest_of(b"expected")
+    upstream.blobs[digest] = b"something else"
+
+    client.get(f"/v2/library/redis/blobs/{digest}")
+    assert not store.has(digest)
+    assert os.listdir(store.temp_folder) == []
+
+
+def test_blob_range_requests(client, upstream, store):
+    content = bytes(range(200))
+    digest = digest_of(content)
+    store.put(digest, content)
+
+    partial = client.get(f"/v2/library/redis/blobs/{digest}", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == content[10:20]
+    assert partial.headers["content-range"] == "bytes 10-19/200"
+    assert partial.headers["content-length"] == "10"
+
+    suffix = client.get(f"/v2/library/redis/blobs/{digest}", headers={"Range": "bytes=-5"})
+    assert suffix.status_code == 206
+    assert suffix.content == content[-5:]
+
+    open_ended = client.get(f"/v2/library/redis/blobs/{digest}", headers={"Range": "bytes=195-"})
+    assert open_ended.content == content[195:]
+
+    invalid = client.get(f"/v2/library/redis/blobs/{digest}", headers={"Range": "bytes=500-600"})
+    assert invalid.status_code == 416
+    assert invalid.headers["content-range"] == "bytes */200"
+    assert upstream.paths() == []
+
+
+def test_uncached_range_request_is_passed_through(client, upstream, store):
+    content = bytes(range(100))
+    digest = digest_of(content)
+    upstream.blobs[digest] = content
+
+    response = client.get(f"/v2/library/redis/blobs/{digest}", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["x-cache"] == "BYPASS"
+    assert response.content == content[:10]
+    assert not store.has(digest)
+
+
+def test_least_recently_used_blob_is_evicted_and_refetched(client, upstream, store):
+    blobs = [os.urandom(400) for _ in range(3)]
+    digests = [digest_of(content) for content in blobs]
+    for digest, content in zip(digests, blobs):
+        upstream.blobs[digest] = content
+
+    client.get(f"/v2/library/redis/blobs/{digests[0]}")
+    client.get(f"/v2/library/redis/blobs/{digests[1]}")
+    # Touch the first so the second is the least recently used
+    assert client.get(f"/v2/library/redis/blobs/{digests[0]}").headers["x-cache"] == "HIT"
+    client.get(f"/v2/library/redis/blobs/{digests[2]}")
+
+    assert store.has(digests[0]) and store.has(digests[2])
+    assert not store.has(digests[1])
+    assert store.stats()["size"] <= store.max_size
+
+    refetched = client.get(f"/v2/library/redis/blobs/{digests[1]}")
+    assert refetched.headers["x-cache"] == "MISS"
+    assert refetched.content == blobs[1]
+
+
+def test_blob_removed_from_disk_is_forgotten(client, upstream, store):
+    content = os.urandom(100)
+    digest = digest_of(content)
+    store.put(digest, content)
+    upstream.blobs[digest] = content
+    os.remove(store.path(digest))
+
+    assert store.open(digest) is None
+    assert not store.has(digest)
+    assert store.stats()["size"] == 0
+    assert client.get(f"/v2/library/redis/blobs/{digest}").headers["x-cache"] == "MISS"
+
+
+def test_blob_evicted_while_being_served_is_sent_in_full(client, upstream, store):
+    content = os.urandom(500)
+    digest = digest_of(content)
+    store.put(digest, content)
+
+    request = type("StubRequest", (), {"headers": {}})()
+    response = registry.BlobResponse(store.open(digest), request, {})
+    os.remove(store.path(digest))
+
+    app = FastAPI()
+    app.add_api_route("/blob", lambda: response)
+    with TestClient(app) as evicted_client:
+        assert evicted_client.get("/blob").content == content